@@ -2,6 +2,8 @@ import sys
 sys.path.append(".")
 
 from app.agents.prompts import DECISION_AGENT_PROMPT
+from app.api.ai_service_tool import REASONING
+from app.api.llm_call import invoke_llm
 
 
 class DecisionAgent:
@@ -15,9 +17,7 @@ class DecisionAgent:
             {"role": "user", "content": f"Email: {email}"},
             {"role": "user", "content": f"Context: {context}"},
         ]
-        result =  self.llm.invoke(
-            input = messages,
-        )
+        result = invoke_llm(self.llm, messages, role=REASONING)
         return result.content
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+"""
+Bounded email representation for LLM prompts.
+
+bounded_email() is what the agents and compose embed instead of the raw
+email dict:
+- HTML bodies are converted to text
+- quoted reply history and signatures are stripped
+- attachments are reduced to their name, type and size
+- headers are dropped (the preclassifier reads them from the raw email)
+- the body is truncated to the model's token budget
+
+Token counts are a local estimate (~4 characters per token). The budget is
+EMAIL_TOKEN_BUDGET (default 2000), overridden per model by
+EMAIL_TOKEN_BUDGETS, JSON mapping a model name to tokens, e.g.
+'{"llama-3.1-8b-instant": 1000}'.
+
+Results are cached per message and budget, so reason, structure and
+compose share the work for one email.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+EMAIL_TOKEN_BUDGET = int(os.getenv("EMAIL_TOKEN_BUDGET", "2000"))
+EMAIL_TOKEN_BUDGETS: Dict[str, int] = {
+    model: int(tokens) for model, tokens in json.loads(os.getenv("EMAIL_TOKEN_BUDGETS", "{}")).items()
+}
+EMAIL_CONTEXT_CACHE_SIZE = int(os.getenv("EMAIL_CONTEXT_CACHE_SIZE", "4096"))
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... truncated]"
+
+# Kept as-is; everything else but body and attachments is dropped
+_FIELDS = ("message_id", "thread_id", "from", "to", "cc", "date", "subject")
+
+_HTML = re.compile(r"<\s*(html|body|div|p|br|table|span|a)\b[^>]*>", re.I)
+_REPLY_HEADER = re.compile(r"^\s*On\b.{0,300}\bwrote:\s*$", re.I | re.S)
+_ORIGINAL_MESSAGE = re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.I)
+_OUTLOOK_HEADER = re.compile(r"^\s*From:\s", re.I)
+_OUTLOOK_FIELDS = re.compile(r"^\s*(Sent|Date|To|Subject):\s", re.I)
+_SIGNATURE = re.compile(r"^(--|__+)\s*$")
+_MOBILE_SIGNATURE = re.compile(r"^\s*Sent from my \w+", re.I)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def token_budget(model: Optional[str] = None) -> int:
+    return EMAIL_TOKEN_BUDGETS.get(model, EMAIL_TOKEN_BUDGET) if model else EMAIL_TOKEN_BUDGET
+
+
+# ─────────────────────────────
+# Body normalization
+# ─────────────────────────────
+class _TextExtractor(HTMLParser):
+    _BLOCKS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "table"}
+    _SKIPPED = {"script", "style", "head"}
+    _VOID = {"br", "img", "hr", "meta", "link", "input", "wbr", "col", "area", "base", "source"}
+    # Gmail and Outlook wrap quoted history in these
+    _QUOTE_CLASSES = {"gmail_quote", "gmail_extra", "OutlookMessageHeader"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        # (tag, hidden) for every open element
+        self._open: List[Tuple[str, bool]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._BLOCKS:
+            self.parts.append("\n")
+        if tag in self._VOID:
+            return
+        hidden = (
+            tag in self._SKIPPED
+            or tag == "blockquote"
+            or bool(set((dict(attrs).get("class") or "").split()) & self._QUOTE_CLASSES)
+        )
+        self._open.append((tag, hidden))
+
+    def handle_endtag(self, tag):
+        if tag in self._BLOCKS:
+            self.parts.append("\n")
+        # Closes the nearest open `tag` and anything left unclosed inside it
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                del self._open[i:]
+                break
+
+    def handle_data(self, data):
+        if not any(hidden for _, hidden in self._open):
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = "".join(parser.parts)
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def strip_quotes(text: str) -> str:
+    """
+    Drops quoted reply history ("On ... wrote:", Outlook headers,
+    "> " lines) and signatures. Text that is nothing but quotes is
+    returned unchanged.
+    """
+    lines = text.splitlines()
+    kept = []
+
+    for i, line in enumerate(lines):
+        two_lines = line + " " + lines[i + 1] if i + 1 < len(lines) else line
+        if (
+            _REPLY_HEADER.match(line)
+            or _REPLY_HEADER.match(two_lines)
+            or _ORIGINAL_MESSAGE.match(line)
+            or (_OUTLOOK_HEADER.match(line) and any(_OUTLOOK_FIELDS.match(l) for l in lines[i + 1:i + 4]))
+            or _SIGNATURE.match(line)
+        ):
+            break
+        if line.lstrip().startswith(">") or _MOBILE_SIGNATURE.match(line):
+            continue
+        kept.append(line)
+
+    stripped = "\n".join(kept).strip()
+    return stripped or text.strip()
+
+
+def truncate(text: str, tokens: int) -> Tuple[str, bool]:
+    """`text` cut to about `tokens` tokens at a word boundary, and whether it was cut."""
+    limit = max(0, tokens) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text, False
+
+    cut = text[:limit]
+    boundary = cut.rfind(" ")
+    if boundary > limit // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRUNCATION_MARKER, True
+
+
+def _body(email: Dict[str, Any]) -> str:
+    body = email.get("body") or ""
+    html = email.get("body_html") or email.get("html")
+    if html and not body.strip():
+        body = html
+    if _HTML.search(body):
+        body = html_to_text(body)
+    return strip_quotes(body)
+
+
+def _attachments(email: Dict[str, Any]) -> List[Dict[str, Any]]:
+    summaries = []
+    for attachment in email.get("attachments") or []:
+        if not isinstance(attachment, dict):
+            summaries.append({"filename": str(attachment)})
+            continue
+        summaries.append({
+            key: attachment[key]
+            for key in ("filename", "name", "mime_type", "content_type", "size")
+            if attachment.get(key) is not None
+        })
+    return summaries
+
+
+# ─────────────────────────────
+# Cached entry point
+# ─────────────────────────────
+class _BoundedEmailCache:
+    """LRU of bounded emails by (message key, budget)."""
+
+    def __init__(self, capacity: int = EMAIL_CONTEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[str, int], value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+
+_cache = _BoundedEmailCache()
+
+
+def bounded_email(email: Dict[str, Any], model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The prompt representation of `email` within `model`'s token budget.
+    The returned dict is shared through the cache; do not mutate it.
+    """
+    budget = token_budget(model)
+    key = (_message_key(email), budget)
+
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    bounded = {field: email[field] for field in _FIELDS if email.get(field) is not None}
+    attachments = _attachments(email)
+    if attachments:
+        bounded["attachments"] = attachments
+
+    # Whatever the other fields leave of the budget goes to the body
+    remaining = budget - estimate_tokens(json.dumps(bounded, default=str))
+    body, truncated = truncate(_body(email), remaining)
+    bounded["body"] = body
+    if truncated:
+        bounded["body_truncated"] = True
+
+    _cache.set(key, bounded)
+    return bounded
+
+
+def _message_key(email: Dict[str, Any]) -> str:
+    # A message id names immutable content; otherwise hash the content
+    if email.get("message_id"):
+        return f"id:{email['message_id']}"
+    canonical = json.dumps(email, sort_keys=True, default=str)
+    return "sha1:" + hashlib.sha1(canonical.encode()).hexdigest()
@@ -0,0 +1,50 @@
+from typing import Any, Dict
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.agents.email_context import bounded_email
+from app.agents.payload import json_payload
+from app.agents.prompts import FUSED_DECISION_PROMPT
+from app.agents.schema_agent import SchemaAgent
+from app.agents.schemas import UniversalDecisionSchemaV1
+from app.policy.summarizer import PolicySummary
+
+
+class FusedDecisionAgent(SchemaAgent):
+    """
+    Produces a UniversalDecisionSchemaV1 in a single structured-output call,
+    skipping the separate free-form reasoning step.
+
+    Same guarantees as SchemaAgent: well-formed output only, policy
+    correctness is still the validator's job.
+    """
+
+    def decide(
+        self,
+        policy_summary: PolicySummary | Dict[str, Any],
+        email: Dict[str, Any],
+        context: Dict[str, Any] | None = None,
+    ) -> UniversalDecisionSchemaV1:
+        return self._invoke_structured(
+            self._decision_messages(policy_summary, email, context)
+        )
+
+    async def adecide(
+        self,
+        policy_summary: PolicySummary | Dict[str, Any],
+        email: Dict[str, Any],
+        context: Dict[str, Any] | None = None,
+    ) -> UniversalDecisionSchemaV1:
+        return await self._ainvoke_structured(
+            self._decision_messages(policy_summary, email, context)
+        )
+
+    def _decision_messages(self, policy_summary, email, context):
+        return [
+            SystemMessage(content=FUSED_DECISION_PROMPT),
+            HumanMessage(content=json_payload(
+                policy=policy_summary,
+                email=bounded_email(email, self.model_name),
+                context=context or {},
+            )),
+        ]
@@ -0,0 +1,22 @@
+import json
+from typing import Any
+
+from app.policy.summarizer import PolicySummary
+
+
+def json_payload(**fields: Any) -> str:
+    """
+    Serializes keyword fields into a JSON object string.
+
+    PolicySummary values are spliced in from their pre-serialized form
+    instead of being re-encoded; the output is byte-identical to
+    json.dumps() of the equivalent dict.
+    """
+    parts = []
+    for key, value in fields.items():
+        if isinstance(value, PolicySummary):
+            encoded = value.serialized
+        else:
+            encoded = json.dumps(value)
+        parts.append(f"{json.dumps(key)}: {encoded}")
+    return "{" + ", ".join(parts) + "}"
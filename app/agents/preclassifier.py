@@ -0,0 +1,175 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.agents.schemas import ProposedAction, UniversalDecisionSchemaV1
+from app.policy.cache import get_policy_cache
+from app.policy.models import CompiledPolicy
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    name: str
+    config: Dict[str, Any]
+    headers: Tuple[str, ...]
+    header_values: Dict[str, Tuple[str, ...]]
+    sender_domains: Tuple[str, ...]
+    sender_patterns: Tuple[re.Pattern, ...]
+    subject_patterns: Tuple[re.Pattern, ...]
+    body_patterns: Tuple[re.Pattern, ...]
+
+
+class PreClassifier:
+    """
+    Deterministic, rule- and feature-based classifier for obvious mail
+    (newsletters, automated notifications) configured per domain in
+    preclassifier.yaml.
+
+    Each matched signal contributes its weight; a rule's score is
+    1 - prod(1 - weight). Only a rule scoring at least `min_confidence`
+    produces a decision. Output still goes through DecisionValidator.
+    """
+
+    def __init__(self, policy: CompiledPolicy):
+        config = policy.preclassifier or {}
+
+        self.domain = policy.domain
+        self.enabled = bool(config.get("enabled", False))
+        self.min_confidence = float(config.get("min_confidence", 0.9))
+        self.rules = [
+            self._compile_rule(name, rule)
+            for name, rule in config.get("rules", {}).items()
+        ]
+
+    def classify(self, email: Dict[str, Any]) -> Optional[UniversalDecisionSchemaV1]:
+        """
+        Returns a decision for the best rule scoring at or above
+        min_confidence, or None to defer to the LLM path.
+        """
+        if not self.enabled or not self.rules:
+            return None
+
+        features = self._features(email)
+
+        best = None
+        for rule in self.rules:
+            score, matched = self._score(rule, features)
+            if score >= self.min_confidence and (best is None or score > best[0]):
+                best = (score, rule, matched)
+
+        if best is None:
+            return None
+
+        score, rule, matched = best
+        return self._decision(rule, score, matched)
+
+    # ─────────────────────────────
+    # Features / scoring
+    # ─────────────────────────────
+    def _features(self, email: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {
+            str(k).lower(): str(v).strip().lower()
+            for k, v in (email.get("headers") or {}).items()
+        }
+
+        sender = (email.get("from") or "").lower()
+        match = re.search(r"<([^>]+)>", sender)
+        address = (match.group(1) if match else sender).strip()
+        sender_domain = address.rsplit("@", 1)[-1] if "@" in address else ""
+
+        return {
+            "headers": headers,
+            "address": address,
+            "sender_domain": sender_domain,
+            "subject": email.get("subject") or "",
+            "body": email.get("body") or "",
+        }
+
+    def _score(self, rule: _CompiledRule, features: Dict[str, Any]) -> Tuple[float, List[str]]:
+        signals = rule.config.get("signals", {})
+        matched = []
+
+        headers = features["headers"]
+        if any(h in headers for h in rule.headers) or any(
+            headers.get(h) in values for h, values in rule.header_values.items()
+        ):
+            matched.append("list_headers")
+
+        domain = features["sender_domain"]
+        if domain and any(
+            domain == d or domain.endswith("." + d) for d in rule.sender_domains
+        ):
+            matched.append("sender_domains")
+
+        if any(p.search(features["address"]) for p in rule.sender_patterns):
+            matched.append("sender_patterns")
+
+        if any(p.search(features["subject"]) for p in rule.subject_patterns):
+            matched.append("subject_patterns")
+
+        if any(p.search(features["body"]) for p in rule.body_patterns):
+            matched.append("body_patterns")
+
+        miss = 1.0
+        for signal in matched:
+            miss *= 1.0 - float(signals[signal].get("weight", 0.0))
+
+        return 1.0 - miss, matched
+
+    def _decision(self, rule: _CompiledRule, score: float, matched: List[str]) -> UniversalDecisionSchemaV1:
+        config = rule.config
+        actions = [
+            ProposedAction(action_type=action, description=f"Pre-classifier rule '{rule.name}'")
+            for action in config.get("proposed_actions", [])
+        ]
+
+        return UniversalDecisionSchemaV1(
+            domain=self.domain,
+            intent=config.get("description", rule.name),
+            category=config["category"],
+            urgency=config.get("urgency", "can_wait"),
+            risk_level=config.get("risk_level", "low"),
+            action=actions[0].action_type if actions else "",
+            decision=config["decision"],
+            proposed_actions=actions,
+            needs_confirmation=bool(config.get("needs_confirmation", False)),
+            confidence=round(score, 4),
+            reasoning_summary=(
+                f"Pre-classified by rule '{rule.name}' "
+                f"(matched: {', '.join(matched)})."
+            ),
+        )
+
+    # ─────────────────────────────
+    # Rule compilation
+    # ─────────────────────────────
+    def _compile_rule(self, name: str, rule: Dict[str, Any]) -> _CompiledRule:
+        signals = rule.get("signals", {})
+
+        def patterns(signal):
+            return tuple(
+                re.compile(p, re.IGNORECASE)
+                for p in signals.get(signal, {}).get("patterns", [])
+            )
+
+        list_headers = signals.get("list_headers", {})
+        return _CompiledRule(
+            name=name,
+            config=rule,
+            headers=tuple(h.lower() for h in list_headers.get("headers", [])),
+            header_values={
+                h.lower(): tuple(str(v).lower() for v in values)
+                for h, values in list_headers.get("values", {}).items()
+            },
+            sender_domains=tuple(
+                d.lower() for d in signals.get("sender_domains", {}).get("domains", [])
+            ),
+            sender_patterns=patterns("sender_patterns"),
+            subject_patterns=patterns("subject_patterns"),
+            body_patterns=patterns("body_patterns"),
+        )
+
+
+def get_preclassifier(policy: CompiledPolicy) -> PreClassifier:
+    """Returns the PreClassifier for a policy version, compiling it once."""
+    return get_policy_cache().derived(policy, "preclassifier", PreClassifier)
@@ -1,5 +1,10 @@
 import json
 from app.agents.prompts import REASONING_AGENT_PROMPT
+from app.agents.email_context import bounded_email
+from app.agents.payload import json_payload
+from app.api.ai_service_tool import REASONING
+from app.api.llm_call import ainvoke_llm, invoke_llm
+from app.api.llm_cache import cache_key, model_name
 
 
 class ReasoningAgent:
@@ -7,20 +12,57 @@ class ReasoningAgent:
     Produces a semantic (loosely structured) decision.
     """
 
-    def __init__(self, llm):
+    def __init__(self, llm, cache=None):
         self.llm = llm
+        # Optional LLMResponseCache; None bypasses caching
+        self.cache = cache
 
     def reason(self, policy_summary, email, context):
-        message = [
+        messages = self._messages(policy_summary, email, context)
+        key = self._cache_key(messages)
+
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            return self._parsed(cached)
+
+        raw = invoke_llm(self.llm, messages, role=REASONING)
+
+        return self._store(key, raw.content, self._parsed(raw.content))
+
+    async def areason(self, policy_summary, email, context):
+        messages = self._messages(policy_summary, email, context)
+        key = self._cache_key(messages)
+
+        cached = await self.cache.aget(key) if self.cache else None
+        if cached is not None:
+            return self._parsed(cached)
+
+        raw = await ainvoke_llm(self.llm, messages, role=REASONING)
+
+        semantic = self._parsed(raw.content)
+        if self.cache:
+            await self.cache.aset(key, raw.content)
+        return semantic
+
+    def _cache_key(self, messages):
+        return cache_key(model_name(self.llm), messages, namespace="reasoning")
+
+    @staticmethod
+    def _parsed(content):
+        # Raises before anything is cached: only well-formed responses are
+        return json.loads(content)
+
+    def _store(self, key, content, semantic):
+        if self.cache:
+            self.cache.set(key, content)
+        return semantic
+
+    def _messages(self, policy_summary, email, context):
+        return [
             {"role": "system", "content": REASONING_AGENT_PROMPT},
-            {"role": "user", "content": json.dumps({
-                "policy": policy_summary,
-                "email": email,
-                "context": context,
-            })}
+            {"role": "user", "content": json_payload(
+                policy=policy_summary,
+                email=bounded_email(email, model_name(self.llm)),
+                context=context,
+            )}
         ]
-        raw = self.llm.invoke(
-            input=message,
-        )
-
-        return json.loads(raw.content)
@@ -1,9 +1,14 @@
 from typing import Any, Dict
-import json
 from langchain_core.messages import HumanMessage
 import sys
 sys.path.append(".")
 from app.agents.schemas import UniversalDecisionSchemaV1
+from app.agents.email_context import bounded_email
+from app.agents.payload import json_payload
+from app.policy.summarizer import PolicySummary
+from app.api.ai_service_tool import STRUCTURED
+from app.api.llm_call import ainvoke_llm, invoke_llm
+from app.api.llm_cache import cache_key, model_name
 
 
 class SchemaAgent:
@@ -22,17 +27,20 @@ class SchemaAgent:
     - Valid decision (validator handles that)
     """
 
-    def __init__(self, llm):
+    def __init__(self, llm, cache=None):
         # Wrap the LLM with structured output
         self.structured_llm = llm.with_structured_output(
             UniversalDecisionSchemaV1,
             include_raw=True,   # important for debugging
         )
+        self.model_name = model_name(llm)
+        # Optional LLMResponseCache; None bypasses caching
+        self.cache = cache
 
     def structure(
         self,
         semantic_decision: Dict[str, Any],
-        policy_summary: Dict[str, Any],
+        policy_summary: PolicySummary | Dict[str, Any],
         email: Dict[str, Any],
         context: Dict[str, Any] | None = None,
     ) -> UniversalDecisionSchemaV1:
@@ -40,18 +48,82 @@ class SchemaAgent:
         Returns a UniversalDecisionSchemaV1 Pydantic object.
         Raises if structured parsing fails.
         """
-        messages = HumanMessage(content=json.dumps({
-                "semantic_decision": semantic_decision,
-                "policy": policy_summary,
-                "email": email,
-                "context": context or {},
-            }))
-        
+        messages = self._messages(semantic_decision, policy_summary, email, context)
+
+        return self._invoke_structured([messages])
+
+    async def astructure(
+        self,
+        semantic_decision: Dict[str, Any],
+        policy_summary: PolicySummary | Dict[str, Any],
+        email: Dict[str, Any],
+        context: Dict[str, Any] | None = None,
+    ) -> UniversalDecisionSchemaV1:
+        """
+        Async variant of structure().
+        """
+        messages = self._messages(semantic_decision, policy_summary, email, context)
+
+        return await self._ainvoke_structured([messages])
+
+    def _invoke_structured(self, messages) -> UniversalDecisionSchemaV1:
+        key = self._cache_key(messages)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
         # Invoke the structured LLM
-        result = self.structured_llm.invoke( 
-            [messages]
+        result = invoke_llm(
+            self.structured_llm, messages, role=STRUCTURED, model=self.model_name
         )
 
+        return self._store(key, self._parsed(result))
+
+    async def _ainvoke_structured(self, messages) -> UniversalDecisionSchemaV1:
+        key = self._cache_key(messages)
+        cached = self._decoded(await self.cache.aget(key) if self.cache else None)
+        if cached is not None:
+            return cached
+
+        result = await ainvoke_llm(
+            self.structured_llm, messages, role=STRUCTURED, model=self.model_name
+        )
+
+        parsed = self._parsed(result)
+        if self.cache:
+            await self.cache.aset(key, parsed.model_dump_json())
+        return parsed
+
+    def _cache_key(self, messages) -> str:
+        return cache_key(
+            self.model_name,
+            messages,
+            namespace=f"structured:{UniversalDecisionSchemaV1.__name__}",
+        )
+
+    def _cached(self, key: str) -> UniversalDecisionSchemaV1 | None:
+        return self._decoded(self.cache.get(key) if self.cache else None)
+
+    @staticmethod
+    def _decoded(cached: str | None) -> UniversalDecisionSchemaV1 | None:
+        if cached is None:
+            return None
+        return UniversalDecisionSchemaV1.model_validate_json(cached)
+
+    def _store(self, key: str, parsed: UniversalDecisionSchemaV1) -> UniversalDecisionSchemaV1:
+        if self.cache:
+            self.cache.set(key, parsed.model_dump_json())
+        return parsed
+
+    def _messages(self, semantic_decision, policy_summary, email, context):
+        return HumanMessage(content=json_payload(
+                semantic_decision=semantic_decision,
+                policy=policy_summary,
+                email=bounded_email(email, self.model_name),
+                context=context or {},
+            ))
+
+    def _parsed(self, result) -> UniversalDecisionSchemaV1:
         # LangChain always returns a dict when include_raw=True
         parsing_error = result.get("parsing_error")
         parsed = result.get("parsed")
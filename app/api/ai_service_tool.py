@@ -1,17 +1,210 @@
-from langchain_groq import ChatGroq
+import asyncio
 import os
-from dotenv import load_dotenv
-load_dotenv()
-def get_llm():
-    model=ChatGroq(
-        model = "openai/gpt-oss-120b",
-        api_key = os.getenv("GROQ_REASON_API_KEY"),
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_groq import ChatGroq
+
+REASONING = "reasoning"
+STRUCTURED = "structured"
+
+
+@dataclass(frozen=True)
+class LLMSettings:
+    model: str
+    api_key: Optional[str]
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    request_timeout: float
+    # Extra SDK retries; 429s and transient errors are already retried by
+    # the rate limiter (app/api/rate_limit.py)
+    max_retries: int
+
+
+def load_llm_settings() -> Dict[str, LLMSettings]:
+    """
+    Per-role model and connection settings, configurable via env
+    (including a .env file, read on first call rather than at import).
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    shared = dict(
+        api_key=os.getenv("GROQ_REASON_API_KEY"),
+        max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30")),
+        request_timeout=float(os.getenv("GROQ_REQUEST_TIMEOUT", "60")),
+        max_retries=int(os.getenv("GROQ_MAX_RETRIES", "0")),
     )
-    return model
+    return {
+        REASONING: LLMSettings(
+            model=os.getenv("GROQ_REASON_MODEL", "openai/gpt-oss-120b"),
+            **shared,
+        ),
+        STRUCTURED: LLMSettings(
+            model=os.getenv(
+                "GROQ_STRUCTURED_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct"
+            ),
+            **shared,
+        ),
+    }
+
+
+class LLMClientRegistry:
+    """
+    Thread-safe registry holding one configured chat client per role.
+
+    Sync callers share one client (and one pooled httpx.Client) per role.
+    Async HTTP connections are bound to an event loop, so callers inside a
+    running loop get a client with its own httpx.AsyncClient per loop.
+    Those are closed by aclose_loop() (await it before the loop shuts
+    down) or reset().
+    """
+
+    def __init__(self, settings: Optional[Dict[str, LLMSettings]] = None):
+        self.settings = settings or load_llm_settings()
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Any] = {}
+        self._http_clients: Dict[str, "httpx.Client"] = {}
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._loop_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List[httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._overrides: Dict[str, Any] = {}
+
+    def get(self, role: str) -> Any:
+        if role in self._overrides:
+            return self._overrides[role]
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            if loop is None:
+                if role not in self._clients:
+                    self._clients[role] = self._build(role)
+                return self._clients[role]
+
+            per_loop = self._loop_clients.setdefault(loop, {})
+            if role not in per_loop:
+                per_loop[role] = self._build(role, loop=loop)
+            return per_loop[role]
+
+    def register(self, role: str, client: Any) -> None:
+        """Overrides the client for a role (fakes, benchmarks)."""
+        with self._lock:
+            self._overrides[role] = client
+
+    async def aclose_loop(self) -> None:
+        """Closes the async clients of the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._loop_clients.pop(loop, None)
+            http_clients = self._loop_http_clients.pop(loop, [])
+        for http_client in http_clients:
+            await http_client.aclose()
+
+    def reset(self) -> None:
+        """Drops every cached client and override."""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            for loop, http_clients in self._loop_http_clients.items():
+                for http_client in http_clients:
+                    _aclose_on(loop, http_client)
+            self._clients.clear()
+            self._http_clients.clear()
+            self._loop_clients.clear()
+            self._loop_http_clients.clear()
+            self._overrides.clear()
+
+    def _build(self, role: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> "ChatGroq":
+        # Heavy; only imported once a real client is needed
+        import httpx
+        from langchain_groq import ChatGroq
+
+        settings = self.settings[role]
+        limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+
+        if role not in self._http_clients:
+            self._http_clients[role] = httpx.Client(
+                limits=limits, timeout=settings.request_timeout
+            )
+
+        kwargs = {}
+        if loop is not None:
+            kwargs["http_async_client"] = httpx.AsyncClient(
+                limits=limits, timeout=settings.request_timeout
+            )
+            self._loop_http_clients.setdefault(loop, []).append(kwargs["http_async_client"])
+
+        return ChatGroq(
+            model=settings.model,
+            api_key=settings.api_key,
+            request_timeout=settings.request_timeout,
+            max_retries=settings.max_retries,
+            http_client=self._http_clients[role],
+            **kwargs,
+        )
+
+
+def _aclose_on(loop: asyncio.AbstractEventLoop, http_client: "httpx.AsyncClient") -> None:
+    # Connections belong to the loop that opened them; a closed loop has
+    # already dropped its transports
+    if loop.is_closed():
+        return
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(http_client.aclose(), loop)
+    else:
+        loop.run_until_complete(http_client.aclose())
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """Returns the process-wide LLMClientRegistry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+    return _registry
+
+
+def get_llm():
+    return get_llm_registry().get(REASONING)
+
 
 def get_structured_llm():
-    model=ChatGroq(
-        model = "meta-llama/llama-4-maverick-17b-128e-instruct",
-        api_key = os.getenv("GROQ_REASON_API_KEY"),
-    )
-    return model
+    return get_llm_registry().get(STRUCTURED)
+
+
+async def aclose_llm_clients() -> None:
+    """Closes the running loop's LLM HTTP clients, if any were created."""
+    if _registry is not None:
+        await _registry.aclose_loop()
+
+
+async def closing_llm_clients(coro):
+    """Awaits `coro`, then closes the loop's LLM HTTP clients (for asyncio.run)."""
+    try:
+        return await coro
+    finally:
+        await aclose_llm_clients()
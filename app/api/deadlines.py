@@ -0,0 +1,509 @@
+"""
+Per-stage deadlines and request hedging for LLM calls.
+
+The stage is the graph node making the call (reason, structure,
+fused_decide, compose). LLM calls of a stage with a policy are:
+- bounded by the stage deadline: StageDeadlineExceeded is raised instead
+  of waiting longer, and the node routes the email to safe_fallback
+- hedged, if enabled for the stage: when no response arrived after the
+  p95 latency of (model, stage), one duplicate request is sent and the
+  first valid response wins. Streams are not hedged.
+
+The deadline measures a StageClock that only runs while some attempt of
+the call holds a rate limiter lease: waiting for a lease (rpm/tpm pacing,
+concurrency slots) and for a worker thread doesn't count, provider time
+and 429/transient backoff do. A backoff that would not fit in the time
+left fails the stage at once instead of sleeping past its deadline.
+
+LatencyTracker keeps a window of recent request latencies (lease to
+response) per (model, stage), so hedging thresholds follow the provider.
+Every request that completes is sampled, winner or not; one still running
+at the deadline is sampled at its elapsed time (a lower bound). Hedges are
+skipped until enough samples exist, and while the model's rate limiter is
+saturated.
+
+Sync calls run on a shared worker pool. Runners size the pool to their
+concurrency with reserve_workers().
+
+LLM_STAGE_DEADLINES is JSON mapping a stage to seconds, e.g.
+'{"reason": 20, "compose": 40}'; other stages get LLM_STAGE_DEADLINE
+(default 60, 0 disables). LLM_HEDGED_STAGES lists the stages to hedge,
+e.g. "reason,structure".
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, Generator, Iterator, List, Optional, Set, Tuple
+
+from app.metrics import get_metrics
+
+LLM_STAGE_DEADLINE = float(os.getenv("LLM_STAGE_DEADLINE", "60"))
+LLM_STAGE_DEADLINES: Dict[str, float] = json.loads(os.getenv("LLM_STAGE_DEADLINES", "{}"))
+LLM_HEDGED_STAGES = {s.strip() for s in os.getenv("LLM_HEDGED_STAGES", "").split(",") if s.strip()}
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Minimum pool size; reserve_workers() grows it
+LLM_DEADLINE_WORKERS = int(os.getenv("LLM_DEADLINE_WORKERS", "64"))
+
+# Graph nodes that call an LLM
+LLM_STAGES = ("reason", "structure", "fused_decide", "compose")
+
+
+class StageDeadlineExceeded(TimeoutError):
+    """An LLM stage ran past its deadline."""
+
+    def __init__(self, stage: str, deadline: float):
+        super().__init__(f"{stage} exceeded its {deadline:g}s deadline")
+        self.stage = stage
+        self.deadline = deadline
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per key, with cached quantiles."""
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._sorted: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Tuple[str, str], seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=self.window))
+            samples.append(seconds)
+            self._sorted.pop(key, None)
+
+    def quantile(self, key: Tuple[str, str], q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = self._sorted.get(key)
+            if ordered is None:
+                ordered = self._sorted[key] = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_latencies = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    return _latencies
+
+
+@dataclass(frozen=True)
+class StagePolicy:
+    stage: str
+    deadline: Optional[float]
+    hedge: bool
+
+    def hedge_after(self, model: str) -> Optional[float]:
+        if not self.hedge:
+            return None
+        # Duplicates would only queue behind the limiter (or cause 429s)
+        from app.api.rate_limit import get_rate_limiter
+
+        if get_rate_limiter(model).saturated():
+            return None
+        return _latencies.quantile((model, self.stage), LLM_HEDGE_QUANTILE, LLM_HEDGE_MIN_SAMPLES)
+
+
+def stage_policy(stage: Optional[str]) -> Optional[StagePolicy]:
+    """The policy of a graph node, or None when its calls run unbounded."""
+    if stage not in LLM_STAGES:
+        return None
+    deadline = LLM_STAGE_DEADLINES.get(stage, LLM_STAGE_DEADLINE) or None
+    hedge = stage in LLM_HEDGED_STAGES
+    if deadline is None and not hedge:
+        return None
+    return StagePolicy(stage, deadline, hedge)
+
+
+# ─────────────────────────────
+# Stage clock
+# ─────────────────────────────
+class StageClock:
+    """
+    Seconds a call has spent with at least one attempt holding a lease.
+    Stopped while every attempt waits for the rate limiter.
+    """
+
+    def __init__(self):
+        self._spent = 0.0
+        self._since = 0.0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._active:
+                self._since = time.perf_counter()
+            self._active += 1
+
+    def stop(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if not self._active:
+                self._spent += time.perf_counter() - self._since
+
+    def elapsed(self) -> float:
+        with self._lock:
+            if self._active:
+                return self._spent + time.perf_counter() - self._since
+            return self._spent
+
+
+class AttemptTimer:
+    """
+    Passed to one attempt's limiter/retry loop, which reports when it holds
+    a lease and asks before sleeping for a backoff. Without a policy it only
+    times requests.
+    """
+
+    def __init__(self, policy: Optional[StagePolicy] = None, clock: Optional[StageClock] = None):
+        self.policy = policy
+        self.clock = clock
+        self.request_started: Optional[float] = None
+        self.request_seconds: Optional[float] = None
+
+    @contextmanager
+    def leased(self) -> Iterator[None]:
+        """Wraps one request and its backoff, from lease to release."""
+        self.request_started = time.perf_counter()
+        self.request_seconds = None
+        if self.clock is not None:
+            self.clock.start()
+        try:
+            yield
+        finally:
+            if self.clock is not None:
+                self.clock.stop()
+            self.request_seconds = time.perf_counter() - self.request_started
+            self.request_started = None
+
+    def backoff(self, delay: float) -> None:
+        """Raises StageDeadlineExceeded if sleeping `delay` would run past the deadline."""
+        if self.clock is None or not self.policy.deadline:
+            return
+        if self.clock.elapsed() + delay >= self.policy.deadline:
+            raise StageDeadlineExceeded(self.policy.stage, self.policy.deadline)
+
+    def running_for(self) -> Optional[float]:
+        """Seconds the current request has been running, if one is."""
+        started = self.request_started
+        return None if started is None else time.perf_counter() - started
+
+
+UNTIMED = AttemptTimer()
+
+
+# ─────────────────────────────
+# Bounded calls
+# ─────────────────────────────
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_size = LLM_DEADLINE_WORKERS
+_executor_lock = threading.Lock()
+
+
+def _workers() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_executor_size,
+                    thread_name_prefix="llm-deadline",
+                )
+    return _executor
+
+
+def reserve_workers(concurrency: int) -> None:
+    """
+    Makes room for `concurrency` sync calls at once, each with a hedge, so
+    calls don't queue for a worker (or behind losing attempts still running).
+    """
+    global _executor, _executor_size
+    with _executor_lock:
+        if 2 * concurrency <= _executor_size:
+            return
+        _executor_size = 2 * concurrency
+        # Running attempts finish on the old pool; new ones use a larger pool
+        previous, _executor = _executor, None
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+class _Attempt:
+    """
+    One run of fn(timer) on a worker, with its own copy of the caller's
+    context (metrics labels). The request that answered is sampled when it
+    completes, unless it was already sampled as censored at the deadline.
+    """
+
+    def __init__(self, fn: Callable[[AttemptTimer], Any], policy: StagePolicy, model: str, clock: StageClock):
+        self.key = (model, policy.stage)
+        self.timer = AttemptTimer(policy, clock)
+        self._sampled = False
+        self._lock = threading.Lock()
+        self.future = _workers().submit(copy_context().run, self._run, fn)
+
+    def _run(self, fn: Callable[[AttemptTimer], Any]) -> Any:
+        response = fn(self.timer)
+        self._sample(self.timer.request_seconds)
+        return response
+
+    def censor(self) -> None:
+        """Samples a still running request at its elapsed time, a lower bound."""
+        self._sample(self.timer.running_for())
+
+    def _sample(self, seconds: Optional[float]) -> None:
+        if seconds is None:
+            return
+        with self._lock:
+            if self._sampled:
+                return
+            self._sampled = True
+        _latencies.record(self.key, seconds)
+
+
+def _next_timeout(policy: StagePolicy, elapsed: float, hedge_after: Optional[float]) -> Optional[float]:
+    # The clock stops while attempts wait for the limiter, so waiting this
+    # long never overshoots; on waking the clock is read again
+    timeouts = [policy.deadline - elapsed] if policy.deadline else []
+    if hedge_after is not None:
+        timeouts.append(hedge_after - elapsed)
+    return max(0.0, min(timeouts)) if timeouts else None
+
+
+def call(
+    policy: StagePolicy,
+    model: str,
+    fn: Callable[[AttemptTimer], Any],
+    valid: Callable[[Any], bool],
+) -> Any:
+    """
+    fn(timer) within the stage deadline, hedged with a second fn(timer) if
+    enabled. Sync calls can't be interrupted: losing attempts finish on a
+    worker thread and are discarded.
+    """
+    hedge_after = policy.hedge_after(model)
+    clock = StageClock()
+
+    first = _Attempt(fn, policy, model, clock)
+    attempts = {first.future: first}
+    pending = {first.future}
+    hedged = False
+    last_error: Optional[BaseException] = None
+    result = _NONE = object()
+
+    while pending:
+        timeout = _next_timeout(policy, clock.elapsed(), None if hedged else hedge_after)
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            if valid(response):
+                _hedge_outcome(policy, model, hedged, hedge_won=future is not first.future)
+                return response
+            result = response
+
+        if not done:
+            elapsed = clock.elapsed()
+            if policy.deadline and elapsed >= policy.deadline:
+                for future in pending:
+                    attempts[future].censor()
+                _deadline_exceeded(policy, model)
+            if hedge_after is not None and not hedged and elapsed >= hedge_after:
+                hedged = True
+                get_metrics().inc("llm_hedges_total", model=model, stage=policy.stage)
+                hedge = _Attempt(fn, policy, model, clock)
+                attempts[hedge.future] = hedge
+                pending.add(hedge.future)
+
+    # Every attempt finished without a valid response
+    if result is not _NONE:
+        return result
+    _raise(policy, model, last_error)
+
+
+async def acall(
+    policy: StagePolicy,
+    model: str,
+    fn: Callable[[AttemptTimer], Awaitable[Any]],
+    valid: Callable[[Any], bool],
+) -> Any:
+    """Async variant of call(); losing attempts are cancelled."""
+    hedge_after = policy.hedge_after(model)
+    key = (model, policy.stage)
+    clock = StageClock()
+    timers: Dict[asyncio.Future, AttemptTimer] = {}
+
+    async def attempt(timer: AttemptTimer):
+        response = await fn(timer)
+        if timer.request_seconds is not None:
+            _latencies.record(key, timer.request_seconds)
+        return response
+
+    def start() -> asyncio.Future:
+        timer = AttemptTimer(policy, clock)
+        task = asyncio.ensure_future(attempt(timer))
+        timers[task] = timer
+        return task
+
+    first = start()
+    pending: Set[asyncio.Future] = {first}
+    hedged = False
+    last_error: Optional[BaseException] = None
+    result = _NONE = object()
+
+    try:
+        while pending:
+            timeout = _next_timeout(policy, clock.elapsed(), None if hedged else hedge_after)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    response = task.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if valid(response):
+                    _hedge_outcome(policy, model, hedged, hedge_won=task is not first)
+                    return response
+                result = response
+
+            if not done:
+                elapsed = clock.elapsed()
+                if policy.deadline and elapsed >= policy.deadline:
+                    # Still running: sampled at their elapsed time, a lower bound
+                    for task in pending:
+                        seconds = timers[task].running_for()
+                        if seconds is not None:
+                            _latencies.record(key, seconds)
+                    _deadline_exceeded(policy, model)
+                if hedge_after is not None and not hedged and elapsed >= hedge_after:
+                    hedged = True
+                    get_metrics().inc("llm_hedges_total", model=model, stage=policy.stage)
+                    pending.add(start())
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if result is not _NONE:
+        return result
+    _raise(policy, model, last_error)
+
+
+def stream(
+    policy: StagePolicy,
+    model: str,
+    start: Callable[[AttemptTimer], Generator[Any, None, None]],
+) -> Iterator[Any]:
+    """Yields the chunks of start(timer) until the stage deadline; read on a worker thread."""
+    if not policy.deadline:
+        yield from start(UNTIMED)
+        return
+
+    clock = StageClock()
+    chunks = start(AttemptTimer(policy, clock))
+    items: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if stopped.is_set():
+                    break
+                items.put(("chunk", chunk))
+        except BaseException as e:
+            items.put(("error", e))
+        else:
+            items.put(("done", None))
+        finally:
+            chunks.close()
+
+    _workers().submit(copy_context().run, produce)
+    try:
+        while True:
+            try:
+                kind, value = items.get(timeout=_next_timeout(policy, clock.elapsed(), None))
+            except queue.Empty:
+                if clock.elapsed() >= policy.deadline:
+                    _deadline_exceeded(policy, model)
+                continue
+            if kind == "done":
+                return
+            if kind == "error":
+                _raise(policy, model, value)
+            yield value
+    finally:
+        # Timed out or closed by the consumer: the producer stops at its next chunk
+        stopped.set()
+
+
+async def astream(
+    policy: StagePolicy,
+    model: str,
+    start: Callable[[AttemptTimer], AsyncGenerator[Any, None]],
+) -> AsyncIterator[Any]:
+    """Async variant of stream()."""
+    if not policy.deadline:
+        async for chunk in start(UNTIMED):
+            yield chunk
+        return
+
+    clock = StageClock()
+    chunks = start(AttemptTimer(policy, clock))
+    iterator = chunks.__aiter__()
+    try:
+        while True:
+            # Not wait_for(): a timeout while the clock is stopped must not
+            # cancel the pending chunk
+            next_chunk = asyncio.ensure_future(iterator.__anext__())
+            try:
+                while not next_chunk.done():
+                    await asyncio.wait({next_chunk}, timeout=_next_timeout(policy, clock.elapsed(), None))
+                    if not next_chunk.done() and clock.elapsed() >= policy.deadline:
+                        _deadline_exceeded(policy, model)
+            finally:
+                if not next_chunk.done():
+                    # Let the generator unwind before aclose()
+                    next_chunk.cancel()
+                    await asyncio.wait({next_chunk})
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                return
+            except StageDeadlineExceeded as e:
+                _raise(policy, model, e)
+            yield chunk
+    finally:
+        await chunks.aclose()
+
+
+def _hedge_outcome(policy: StagePolicy, model: str, hedged: bool, hedge_won: bool) -> None:
+    if hedged:
+        get_metrics().inc("llm_hedges_won_total" if hedge_won else "llm_hedges_lost_total", model=model, stage=policy.stage)
+
+
+def _deadline_exceeded(policy: StagePolicy, model: str) -> None:
+    get_metrics().inc("llm_deadline_exceeded_total", model=model, stage=policy.stage)
+    raise StageDeadlineExceeded(policy.stage, policy.deadline)
+
+
+def _raise(policy: StagePolicy, model: str, error: BaseException) -> None:
+    # A backoff that wouldn't fit (AttemptTimer.backoff) is counted here
+    if isinstance(error, StageDeadlineExceeded):
+        get_metrics().inc("llm_deadline_exceeded_total", model=model, stage=policy.stage)
+    raise error
@@ -0,0 +1,230 @@
+"""
+Content-addressed cache for LLM responses.
+
+Keys are sha256 hashes over the model name and the fully rendered prompt
+messages (system prompt, serialized policy summary, email, context), so a
+hit means the exact same request was already answered. Entries live in an
+in-memory LRU in front of a SQLite file, with TTL and size-based eviction.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+
+def model_name(llm: Any) -> str:
+    """Best-effort model identifier for cache keys and metrics."""
+    return (
+        getattr(llm, "model_name", None)
+        or getattr(llm, "model", None)
+        or type(llm).__name__
+    )
+
+
+def cache_key(model: str, messages: Iterable[Any], namespace: str = "") -> str:
+    """
+    Hashes a model name plus rendered messages (dicts or LangChain
+    messages). `namespace` separates e.g. plain and structured output.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{namespace}\0{model}\0".encode())
+
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role"), message.get("content")
+        else:
+            role, content = getattr(message, "type", None), getattr(message, "content", message)
+        digest.update(f"{role}\0".encode())
+        digest.update(json.dumps(content, sort_keys=True).encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM response strings.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        self._db = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            value = self._from_memory(key, now)
+            if value is not None:
+                return value
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at < self.ttl_seconds:
+                        self._db.execute(
+                            "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, value, created_at)
+                        self.hits += 1
+                        return value
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._db.commit()
+
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 256:
+                    self._evict(now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers: SQLite lookups run off the event loop."""
+        if self._db is None:
+            return self.get(key)
+        with self._lock:
+            value = self._from_memory(key, time.time())
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        if self._db is None:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            disk = (
+                self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                if self._db is not None else 0
+            )
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk,
+            }
+
+    def _from_memory(self, key: str, now: float) -> Optional[str]:
+        # Called with the lock held
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if now - created_at < self.ttl_seconds:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return value
+        del self._memory[key]
+        return None
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        # Drop expired rows, then least recently used rows beyond max_entries
+        self._writes_since_evict = 0
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_seconds,)
+        )
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Returns the process-wide LLMResponseCache, or None when disabled
+    via LLM_CACHE_ENABLED=0.
+    """
+    global _default_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = LLMResponseCache()
+    return _default_cache
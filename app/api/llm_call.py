@@ -0,0 +1,360 @@
+"""
+Instrumented chat model calls.
+
+Agents and nodes call invoke_llm()/ainvoke_llm() instead of llm.invoke()
+so every call records, labelled by role (reasoning / structured), model
+and the graph node it ran in:
+- llm_call_seconds (histogram), llm_calls_total, llm_errors_total
+- llm_first_token_seconds (histogram), for stream_llm()/astream_llm()
+- llm_prompt_tokens_total / llm_completion_tokens_total
+- llm_cost_usd_total, for models priced in LLM_PRICING
+
+Each call is paced by its model's RateLimiter (app/api/rate_limit.py),
+which also retries rate-limited (429) and transiently failed calls. Calls
+made by an LLM stage of the graph are bounded by the stage deadline and
+optionally hedged (app/api/deadlines.py); time spent waiting for the
+limiter doesn't count against the deadline, backoff sleeps do.
+
+LLM_PRICING is JSON mapping a model name to USD per million
+[prompt, completion] tokens, e.g. '{"openai/gpt-oss-120b": [0.15, 0.75]}'.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from app.api import deadlines
+from app.api.deadlines import UNTIMED, AttemptTimer
+from app.api.llm_cache import model_name
+from app.api.rate_limit import get_rate_limiter
+from app.metrics import current_node, get_metrics
+
+LLM_PRICING: Dict[str, Tuple[float, float]] = {
+    model: tuple(prices) for model, prices in json.loads(os.getenv("LLM_PRICING", "{}")).items()
+}
+
+
+def invoke_llm(llm: Any, input: Any, role: str, model: Optional[str] = None) -> Any:
+    """
+    llm.invoke(input), recorded under `role` and paced by the model's
+    RateLimiter, which retries 429s. `model` names wrapped (structured) LLMs.
+    Raises StageDeadlineExceeded when the calling stage runs out of time.
+    """
+    model = model or model_name(llm)
+    policy = deadlines.stage_policy(current_node.get())
+    if policy is None:
+        return _limited_invoke(llm, input, role, model)
+    return deadlines.call(policy, model, lambda timer: _limited_invoke(llm, input, role, model, timer), _valid)
+
+
+async def ainvoke_llm(llm: Any, input: Any, role: str, model: Optional[str] = None) -> Any:
+    """Async variant of invoke_llm()."""
+    model = model or model_name(llm)
+    policy = deadlines.stage_policy(current_node.get())
+    if policy is None:
+        return await _alimited_invoke(llm, input, role, model)
+    return await deadlines.acall(
+        policy, model, lambda timer: _alimited_invoke(llm, input, role, model, timer), _valid
+    )
+
+
+def stream_llm(llm: Any, input: Any, role: str, model: Optional[str] = None) -> Iterator[Any]:
+    """
+    llm.stream(input), recorded like invoke_llm() plus time to first chunk.
+    A 429 is only retried before the first chunk was yielded. Streams are
+    bounded by the stage deadline but not hedged.
+    """
+    model = model or model_name(llm)
+    policy = deadlines.stage_policy(current_node.get())
+    if policy is None:
+        return _limited_stream(llm, input, role, model)
+    return deadlines.stream(policy, model, lambda timer: _limited_stream(llm, input, role, model, timer))
+
+
+def astream_llm(llm: Any, input: Any, role: str, model: Optional[str] = None) -> AsyncIterator[Any]:
+    """Async variant of stream_llm()."""
+    model = model or model_name(llm)
+    policy = deadlines.stage_policy(current_node.get())
+    if policy is None:
+        return _alimited_stream(llm, input, role, model)
+    return deadlines.astream(policy, model, lambda timer: _alimited_stream(llm, input, role, model, timer))
+
+
+def _valid(response: Any) -> bool:
+    # A structured result that failed to parse loses to a hedge that didn't
+    return not (isinstance(response, dict) and response.get("parsing_error") is not None)
+
+
+# ─────────────────────────────
+# Rate-limited calls, with retries
+# ─────────────────────────────
+# The timer sees each request and its backoff, from lease to release, and
+# fails the stage instead of sleeping past its deadline
+def _limited_invoke(
+    llm: Any, input: Any, role: str, model: str, timer: AttemptTimer = UNTIMED
+) -> Any:
+    limiter = get_rate_limiter(model)
+
+    attempt = 0
+    while True:
+        lease = limiter.acquire(input)
+        with timer.leased():
+            try:
+                response = _invoke(llm, input, role, model)
+            except Exception as e:
+                delay = lease.failed(e, attempt)
+                if delay is None:
+                    raise
+                timer.backoff(delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            lease.succeeded(*usage_of(response))
+        return response
+
+
+async def _alimited_invoke(
+    llm: Any, input: Any, role: str, model: str, timer: AttemptTimer = UNTIMED
+) -> Any:
+    limiter = get_rate_limiter(model)
+
+    attempt = 0
+    while True:
+        lease = await limiter.aacquire(input)
+        with timer.leased():
+            try:
+                response = await _ainvoke(llm, input, role, model)
+            except Exception as e:
+                delay = lease.failed(e, attempt)
+                if delay is None:
+                    raise
+                timer.backoff(delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled
+                lease.release()
+                raise
+            lease.succeeded(*usage_of(response))
+        return response
+
+
+def _limited_stream(
+    llm: Any, input: Any, role: str, model: str, timer: AttemptTimer = UNTIMED
+) -> Iterator[Any]:
+    limiter = get_rate_limiter(model)
+
+    attempt = 0
+    while True:
+        lease = limiter.acquire(input)
+        usage = _Usage()
+        with timer.leased():
+            try:
+                for chunk in _stream(llm, input, role, model):
+                    usage.add(chunk)
+                    yield chunk
+            except Exception as e:
+                delay = lease.failed(e, attempt, can_retry=not usage.chunks)
+                if delay is None:
+                    raise
+                timer.backoff(delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # The consumer stopped early (GeneratorExit)
+                lease.release()
+                raise
+            lease.succeeded(usage.prompt_tokens, usage.completion_tokens)
+        return
+
+
+async def _alimited_stream(
+    llm: Any, input: Any, role: str, model: str, timer: AttemptTimer = UNTIMED
+) -> AsyncIterator[Any]:
+    limiter = get_rate_limiter(model)
+
+    attempt = 0
+    while True:
+        lease = await limiter.aacquire(input)
+        usage = _Usage()
+        with timer.leased():
+            try:
+                async for chunk in _astream(llm, input, role, model):
+                    usage.add(chunk)
+                    yield chunk
+            except Exception as e:
+                delay = lease.failed(e, attempt, can_retry=not usage.chunks)
+                if delay is None:
+                    raise
+                timer.backoff(delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                lease.release()
+                raise
+            lease.succeeded(usage.prompt_tokens, usage.completion_tokens)
+        return
+
+
+# ─────────────────────────────
+# Single attempts, with metrics
+# ─────────────────────────────
+def _invoke(llm: Any, input: Any, role: str, model: str) -> Any:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return llm.invoke(input)
+
+    started = time.perf_counter()
+    try:
+        response = llm.invoke(input)
+    except Exception as e:
+        record_llm_error(role, model, e)
+        raise
+    record_llm_call(role, model, response, time.perf_counter() - started)
+    return response
+
+
+async def _ainvoke(llm: Any, input: Any, role: str, model: str) -> Any:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return await llm.ainvoke(input)
+
+    started = time.perf_counter()
+    try:
+        response = await llm.ainvoke(input)
+    except Exception as e:
+        record_llm_error(role, model, e)
+        raise
+    record_llm_call(role, model, response, time.perf_counter() - started)
+    return response
+
+
+def _stream(llm: Any, input: Any, role: str, model: str) -> Iterator[Any]:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        yield from llm.stream(input)
+        return
+
+    stream = _StreamStats(role, model, time.perf_counter())
+    try:
+        for chunk in llm.stream(input):
+            stream.add(chunk)
+            yield chunk
+    except Exception as e:
+        record_llm_error(role, model, e)
+        raise
+    stream.finish()
+
+
+async def _astream(llm: Any, input: Any, role: str, model: str) -> AsyncIterator[Any]:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        async for chunk in llm.astream(input):
+            yield chunk
+        return
+
+    stream = _StreamStats(role, model, time.perf_counter())
+    try:
+        async for chunk in llm.astream(input):
+            stream.add(chunk)
+            yield chunk
+    except Exception as e:
+        record_llm_error(role, model, e)
+        raise
+    stream.finish()
+
+
+class _Usage:
+    """Chunks and tokens of one streamed attempt."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, chunk: Any) -> None:
+        prompt_tokens, completion_tokens = usage_of(chunk)
+        self.chunks += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+
+class _StreamStats(_Usage):
+    """Sums usage over a streamed response so it is recorded as one call."""
+
+    def __init__(self, role: str, model: str, started: float):
+        super().__init__()
+        self.role = role
+        self.model = model
+        self.started = started
+
+    def add(self, chunk: Any) -> None:
+        if not self.chunks:
+            get_metrics().observe(
+                "llm_first_token_seconds",
+                time.perf_counter() - self.started,
+                role=self.role,
+                model=self.model,
+                node=current_node.get(),
+            )
+        super().add(chunk)
+
+    def finish(self) -> None:
+        record_llm_usage(
+            self.role,
+            self.model,
+            time.perf_counter() - self.started,
+            self.prompt_tokens,
+            self.completion_tokens,
+        )
+
+
+def usage_of(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens of an AIMessage or an include_raw structured result."""
+    if isinstance(response, dict):
+        response = response.get("raw")
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def record_llm_call(role: str, model: str, response: Any, seconds: float) -> None:
+    record_llm_usage(role, model, seconds, *usage_of(response))
+
+
+def record_llm_usage(
+    role: str,
+    model: str,
+    seconds: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+) -> None:
+    metrics = get_metrics()
+    labels = {"role": role, "model": model, "node": current_node.get()}
+
+    metrics.inc("llm_calls_total", **labels)
+    metrics.observe("llm_call_seconds", seconds, **labels)
+
+    if prompt_tokens:
+        metrics.inc("llm_prompt_tokens_total", prompt_tokens, **labels)
+    if completion_tokens:
+        metrics.inc("llm_completion_tokens_total", completion_tokens, **labels)
+
+    prices = LLM_PRICING.get(model)
+    if prices and (prompt_tokens or completion_tokens):
+        cost = (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+        metrics.inc("llm_cost_usd_total", cost, **labels)
+
+
+def record_llm_error(role: str, model: str, error: BaseException) -> None:
+    get_metrics().inc(
+        "llm_errors_total",
+        role=role,
+        model=model,
+        node=current_node.get(),
+        error=type(error).__name__,
+    )
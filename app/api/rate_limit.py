@@ -0,0 +1,416 @@
+"""
+Client-side rate limiting and adaptive concurrency for LLM calls.
+
+Every call made through app/api/llm_call.py first takes a lease from its
+model's RateLimiter, which:
+- paces requests and tokens per minute with two token buckets, when the
+  model has limits in LLM_RATE_LIMITS
+- caps calls in flight with an AIMD limit: +1 per limit's worth of
+  successes, halved on a 429 (once per burst: only calls sent after the
+  last decrease can trigger another). Until a model's first 429 the
+  limit is unbounded, unless LLM_CONCURRENCY_INITIAL or the model's
+  max_concurrency sets one; the first 429 halves the calls then in flight
+- queues callers FIFO (threads and coroutines alike) once the limit is hit
+- retries 429s with exponential backoff, honouring Retry-After, and
+  transient errors (5xx, timeouts, dropped connections) with backoff, up
+  to LLM_TRANSIENT_MAX_RETRIES times. The SDK's own retries stay off, as
+  they would resend 429s past the limiter
+
+LLM_RATE_LIMITS is JSON mapping a model name to its provider limits, e.g.
+'{"openai/gpt-oss-120b": {"rpm": 30, "tpm": 8000, "max_concurrency": 16}}'.
+Models without an entry are only concurrency-limited.
+
+Token costs are estimated before the call (~4 prompt characters per token
+plus the model's average completion) and corrected from usage afterwards.
+
+Metrics, labelled by model: llm_limiter_wait_seconds, llm_limiter_queued
+(queue depth seen on arrival), llm_concurrency_limit, llm_rate_limited_total,
+llm_retries_total (labelled reason="rate_limited" or "transient").
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+from app.metrics import get_metrics
+
+LLM_RATE_LIMITS: Dict[str, Dict[str, float]] = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+# 0: unbounded until the first 429
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "0"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "64"))
+LLM_RATE_LIMIT_MAX_RETRIES = int(os.getenv("LLM_RATE_LIMIT_MAX_RETRIES", "5"))
+LLM_RATE_LIMIT_MAX_BACKOFF = float(os.getenv("LLM_RATE_LIMIT_MAX_BACKOFF", "60"))
+LLM_TRANSIENT_MAX_RETRIES = int(os.getenv("LLM_TRANSIENT_MAX_RETRIES", "2"))
+
+CHARS_PER_TOKEN = 4
+_INITIAL_COMPLETION_TOKENS = 256
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    # None: unbounded until the first 429
+    initial_concurrency: Optional[int] = LLM_CONCURRENCY_INITIAL or None
+    min_concurrency: int = LLM_CONCURRENCY_MIN
+    max_concurrency: int = LLM_CONCURRENCY_MAX
+
+    @classmethod
+    def for_model(cls, model: str) -> "RateLimits":
+        config = LLM_RATE_LIMITS.get(model) or {}
+        max_concurrency = int(config.get("max_concurrency", LLM_CONCURRENCY_MAX))
+        initial = LLM_CONCURRENCY_INITIAL or None
+        if "max_concurrency" in config:
+            initial = min(initial or max_concurrency, max_concurrency)
+        return cls(
+            rpm=config.get("rpm"),
+            tpm=config.get("tpm"),
+            initial_concurrency=initial,
+            max_concurrency=max_concurrency,
+        )
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to one minute's worth.
+    reserve() debits immediately (possibly into debt) and returns how long
+    the caller must wait, so reservations are served in order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._level = per_minute
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self._level -= min(amount, self.capacity)
+        return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Credits (positive) or debits (negative) a correction."""
+        self._refill(now)
+        self._level = min(self.capacity, self._level + amount)
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class _Waiter:
+    """A queued caller; a slot is handed to it by wake()."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Lease:
+    """One call's slot and token reservation; released exactly once."""
+
+    def __init__(self, limiter: "RateLimiter", tokens: float, started: float):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.started = started
+        self._released = False
+
+    def succeeded(self, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.limiter._release(self, success=True, usage=(prompt_tokens, completion_tokens))
+
+    def failed(self, error: BaseException, attempt: int, can_retry: bool = True) -> Optional[float]:
+        """
+        Releases the lease after `error`. Returns the delay before the next
+        attempt if the call was rate limited or failed transiently and may
+        be retried, else None.
+        """
+        retry_after = rate_limit_retry_after(error)
+        if not self._released:
+            self._released = True
+            self.limiter._release(self, success=False, retry_after=retry_after)
+
+        if not can_retry:
+            return None
+        if retry_after is not None:
+            if attempt >= LLM_RATE_LIMIT_MAX_RETRIES:
+                return None
+            get_metrics().inc("llm_retries_total", model=self.limiter.model, reason="rate_limited")
+            return backoff(attempt, retry_after)
+        if transient_error(error) and attempt < LLM_TRANSIENT_MAX_RETRIES:
+            get_metrics().inc("llm_retries_total", model=self.limiter.model, reason="transient")
+            return backoff(attempt)
+        return None
+
+    def release(self) -> None:
+        """Releases without feedback (e.g. the caller stopped consuming a stream)."""
+        if not self._released:
+            self._released = True
+            self.limiter._release(self, success=None)
+
+
+class RateLimiter:
+    """Per-model limiter shared by every thread and event loop of the process."""
+
+    def __init__(self, model: str, limits: Optional[RateLimits] = None):
+        self.model = model
+        self.limits = limits or RateLimits.for_model(model)
+
+        initial = self.limits.initial_concurrency
+        self.limit = float(initial) if initial else math.inf
+        self.in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+        self._requests = TokenBucket(self.limits.rpm) if self.limits.rpm else None
+        self._tokens = TokenBucket(self.limits.tpm) if self.limits.tpm else None
+        self._paused_until = 0.0
+        self._decreased_at = 0.0
+        self._completion_tokens = float(_INITIAL_COMPLETION_TOKENS)
+
+    # ─────────────────────────────
+    # Acquire
+    # ─────────────────────────────
+    def acquire(self, input: Any) -> Lease:
+        started = time.perf_counter()
+        waiter = self._take_slot()
+        if waiter is not None:
+            waiter.event.wait()
+
+        lease, delay = self._reserve(input)
+        if delay > 0:
+            time.sleep(delay)
+        self._waited(started)
+        return lease
+
+    async def aacquire(self, input: Any) -> Lease:
+        started = time.perf_counter()
+        waiter = self._take_slot(asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+
+        lease, delay = self._reserve(input)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                lease.release()
+                raise
+        self._waited(started)
+        return lease
+
+    def _take_slot(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Waiter]:
+        with self._lock:
+            if not self._waiters and self.in_flight < self._capacity():
+                self.in_flight += 1
+                return None
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            queued = len(self._waiters)
+        get_metrics().observe("llm_limiter_queued", queued, model=self.model)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return
+        # The slot was already handed over
+        self._release(None, success=None)
+
+    def _reserve(self, input: Any) -> Tuple[Lease, float]:
+        tokens = estimate_tokens(input) + self._completion_tokens
+        now = time.monotonic()
+        with self._lock:
+            delay = max(0.0, self._paused_until - now)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+        return Lease(self, tokens, now + delay), delay
+
+    def _waited(self, started: float) -> None:
+        get_metrics().observe("llm_limiter_wait_seconds", time.perf_counter() - started, model=self.model)
+
+    # ─────────────────────────────
+    # Release and feedback
+    # ─────────────────────────────
+    def _release(
+        self,
+        lease: Optional[Lease],
+        success: Optional[bool],
+        usage: Tuple[int, int] = (0, 0),
+        retry_after: Optional[float] = None,
+    ) -> None:
+        now = time.monotonic()
+        limit_changed = False
+
+        with self._lock:
+            self.in_flight -= 1
+
+            if success and lease is not None:
+                prompt_tokens, completion_tokens = usage
+                if completion_tokens:
+                    self._completion_tokens += 0.1 * (completion_tokens - self._completion_tokens)
+                if self._tokens is not None and (prompt_tokens or completion_tokens):
+                    self._tokens.adjust(lease.tokens - prompt_tokens - completion_tokens, now)
+                if self.limit < self.limits.max_concurrency:
+                    self.limit = min(self.limits.max_concurrency, self.limit + 1.0 / self.limit)
+                    limit_changed = True
+
+            elif retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+                # Calls sent before the last decrease saw the old limit:
+                # their 429s are part of the burst it already answered
+                if lease is not None and lease.started >= self._decreased_at:
+                    limit = self.limit
+                    if math.isinf(limit):
+                        # Unbounded so far: halve what was actually in flight
+                        limit = min(self.in_flight + 1.0, float(self.limits.max_concurrency))
+                    self.limit = max(float(self.limits.min_concurrency), limit / 2)
+                    self._decreased_at = now
+                    limit_changed = True
+
+            self._wake()
+            limit = self.limit
+
+        metrics = get_metrics()
+        if retry_after is not None:
+            metrics.inc("llm_rate_limited_total", model=self.model)
+        if limit_changed:
+            metrics.observe("llm_concurrency_limit", limit, model=self.model)
+
+    def _wake(self) -> None:
+        # Called with the lock held; hands free slots to waiters in order
+        while self._waiters and self.in_flight < self._capacity():
+            self.in_flight += 1
+            self._waiters.popleft().wake()
+
+    def _capacity(self) -> float:
+        return self.limit if math.isinf(self.limit) else max(1, int(self.limit))
+
+    def saturated(self) -> bool:
+        """Whether a new call would have to wait for a slot."""
+        with self._lock:
+            return bool(self._waiters) or self.in_flight >= self._capacity()
+
+
+# ─────────────────────────────
+# Helpers
+# ─────────────────────────────
+def estimate_tokens(input: Any) -> int:
+    return math.ceil(_text_length(input) / CHARS_PER_TOKEN)
+
+
+def _text_length(input: Any) -> int:
+    if isinstance(input, str):
+        return len(input)
+    if isinstance(input, dict):
+        return _text_length(input.get("content", ""))
+    if isinstance(input, (list, tuple)):
+        return sum(_text_length(item) for item in input)
+    content = getattr(input, "content", None)
+    return _text_length(content) if content is not None else len(str(input))
+
+
+def rate_limit_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Seconds to wait if `error` is a 429 (0 when the provider didn't say),
+    else None.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        seconds = _duration(headers.get(header))
+        if seconds is not None:
+            return seconds
+    return 0.0
+
+
+def transient_error(error: BaseException) -> bool:
+    """Whether `error` is a server error, timeout or dropped connection worth retrying."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    # groq/openai SDK and httpx transport errors carry no status
+    return any(
+        cls.__name__ in ("APIConnectionError", "APITimeoutError", "TransportError")
+        for cls in type(error).__mro__
+    )
+
+
+def _duration(value: Optional[str]) -> Optional[float]:
+    # "7", "7.66s", "2m59.56s", "120ms"
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def backoff(attempt: int, retry_after: float = 0.0) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    exponential = min(LLM_RATE_LIMIT_MAX_BACKOFF, 0.5 * 2 ** attempt)
+    return min(LLM_RATE_LIMIT_MAX_BACKOFF, max(retry_after, random.uniform(0, exponential)))
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Returns the process-wide RateLimiter of `model`."""
+    limiter = _limiters.get(model)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(model, RateLimiter(model))
+    return limiter
+
+
+def configure_rate_limits(model: str, limits: Union[RateLimits, Dict[str, Any]]) -> RateLimiter:
+    """Replaces the limiter of `model` (e.g. limits learned at startup, benchmarks)."""
+    if isinstance(limits, dict):
+        limits = RateLimits(**limits)
+    with _limiters_lock:
+        _limiters[model] = RateLimiter(model, limits)
+        return _limiters[model]
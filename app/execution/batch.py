@@ -0,0 +1,461 @@
+"""
+Batch inbox processing.
+
+Streams emails from a JSONL file (or stdin) through the decision graph with
+bounded concurrency and writes one JSONL result per email as it completes.
+
+Each input line is either a bare email dict or an envelope:
+    {"email": {...}, "domain": "founder_inbox", "thread_id": "..."}
+
+With --coalesce-window, duplicate message ids are skipped and bursts on
+one mail thread run once, over the newest message (app/execution/coalesce.py).
+
+With --priority, waiting emails are dispatched by pre-scored priority
+class instead of in input order (app/execution/scheduler.py).
+
+Usage:
+    python -m app.execution.batch emails.jsonl -o results.jsonl -c 16
+    python -m app.execution.batch emails.jsonl -o results.jsonl -c 256 --async
+    python -m app.execution.batch emails.jsonl --checkpoint-db .cache/checkpoints.sqlite
+    python -m app.execution.batch emails.jsonl --coalesce-window 5
+    python -m app.execution.batch emails.jsonl -c 16 --priority
+    cat emails.jsonl | python -m app.execution.batch - -o -
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, Iterator, Optional, Tuple
+
+sys.path.append(".")
+
+from app.api.deadlines import reserve_workers
+from app.execution.coalesce import ThreadCoalescer, cancel_superseded
+from app.execution.scheduler import PriorityScheduler
+from app.graph.approvals import get_approval_store
+
+DEFAULT_DOMAIN = "founder_inbox"
+
+# Dispatched checkpoint thread ids remembered to tell repeats apart
+THREAD_ID_MEMORY = 100_000
+
+
+def iter_emails(
+    stream: IO[str],
+    on_error: Optional[Callable[[int, Exception], None]] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yields (line_number, envelope) for every non-empty line.
+    Malformed lines raise, or are passed to on_error(line_no, error)
+    and skipped.
+    """
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+            if "email" not in record:
+                record = {"email": record}
+            if not isinstance(record["email"], dict):
+                raise ValueError("'email' must be a JSON object")
+        except ValueError as e:
+            if on_error is None:
+                raise
+            on_error(line_no, e)
+            continue
+        yield line_no, record
+
+
+def checkpoint_thread_id(envelope: Dict[str, Any], run_id: str, line_no: int) -> str:
+    """
+    Checkpoint thread ids must be unique per email, not per mail thread,
+    so several messages of one conversation never share a checkpoint.
+    BatchRunner suffixes an id repeated within a run with run and line.
+    """
+    if envelope.get("thread_id"):
+        return str(envelope["thread_id"])
+
+    email = envelope["email"]
+    message_id = email.get("message_id") or email.get("id")
+    if message_id:
+        return f"msg-{message_id}"
+
+    return f"batch-{run_id}-{line_no}"
+
+
+def result_record(thread_id: str, line_no: int, state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Projects a final graph state into a JSON-safe result line.
+    """
+    interrupts = state.get("__interrupt__") or []
+    validation = state.get("validation_result")
+    decision_output = state.get("decision_output")
+
+    if decision_output is not None and hasattr(decision_output, "model_dump"):
+        decision_output = decision_output.model_dump()
+
+    return {
+        "thread_id": thread_id,
+        "line": line_no,
+        "status": "awaiting_confirmation" if interrupts else "completed",
+        "decision_output": decision_output,
+        "decision_path": state.get("decision_path"),
+        "validation": {
+            "status": validation.status,
+            "violations": validation.violations,
+            "notes": validation.notes,
+        } if validation is not None else None,
+        "final_decision": state.get("final_decision"),
+        "interrupt": interrupts[0].value if interrupts else None,
+    }
+
+
+class BatchRunner:
+    """
+    Runs the decision graph over a stream of emails.
+
+    At most `concurrency` emails are in flight; input is read lazily so
+    memory stays bounded regardless of backlog size. Checkpoints of runs
+    that complete without a pending confirmation are dropped immediately.
+
+    run() drives a sync graph from a thread pool; arun() drives an async
+    graph (build_graph(use_async=True)) with all runs on one event loop.
+
+    With coalesce_window set (0 only deduplicates), input goes through a
+    ThreadCoalescer: duplicates and superseded messages get a result line
+    of their own, and a finished run cancels the older runs of its mail
+    thread still awaiting confirmation.
+
+    With priority=True, a PriorityScheduler picks the next email whenever
+    a slot frees up; result lines then carry its priority and the seconds
+    it queued.
+    """
+
+    def __init__(
+        self,
+        graph=None,
+        concurrency: int = 8,
+        domain: str = DEFAULT_DOMAIN,
+        use_async: bool = False,
+        decision_mode: str = "two_stage",
+        llm_cache: bool = True,
+        speculative_compose: Optional[bool] = None,
+        coalesce_window: Optional[float] = None,
+        priority: bool = False,
+        checkpointer=None,
+    ):
+        if graph is None:
+            from app.graph.dag import build_graph
+            graph = build_graph(
+                use_async=use_async,
+                decision_mode=decision_mode,
+                checkpointer=checkpointer,
+            )
+
+        self.graph = graph
+        self.concurrency = concurrency
+        self.domain = domain
+        self.llm_cache = llm_cache
+        # None leaves it to EMAIL_AGENT_SPECULATIVE_COMPOSE
+        self.speculative_compose = speculative_compose
+
+        self._slots = threading.BoundedSemaphore(concurrency)
+        reserve_workers(concurrency)
+        self._sink_lock = threading.Lock()
+        self.counts = {"completed": 0, "awaiting_confirmation": 0, "error": 0}
+
+        self.coalescer = None
+        if coalesce_window is not None:
+            self.coalescer = ThreadCoalescer(coalesce_window)
+            self.counts.update({"duplicate": 0, "superseded": 0, "cancelled": 0})
+        # mail thread -> checkpoint thread id of its newest run
+        self._latest_runs: Dict[str, str] = {}
+        # Checkpoint thread ids dispatched recently, to keep repeats apart
+        self._thread_ids: "OrderedDict[str, None]" = OrderedDict()
+
+        self.scheduler = PriorityScheduler(domain) if priority else None
+
+    def run(self, source: IO[str], sink: IO[str]) -> Dict[str, int]:
+        run_id = uuid.uuid4().hex[:8]
+
+        items = self._scheduled(self._ingest(source, sink, run_id))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                # Take the slot first, so the scheduler picks among
+                # everything read while all slots were busy
+                self._slots.acquire()
+                item = next(items, None)
+                if item is None:
+                    self._slots.release()
+                    break
+                line_no, envelope, scheduling = item
+
+                thread_id = self._dispatched(envelope, run_id, line_no)
+                future = pool.submit(self._process, thread_id, line_no, envelope)
+                future.add_done_callback(
+                    lambda f, scheduling=scheduling: self._write_and_release(sink, {**f.result(), **scheduling})
+                )
+
+        return dict(self.counts)
+
+    async def arun(self, source: IO[str], sink: IO[str]) -> Dict[str, int]:
+        run_id = uuid.uuid4().hex[:8]
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+
+        async def process(thread_id, line_no, envelope, scheduling):
+            try:
+                record = await self._aprocess(thread_id, line_no, envelope)
+                self._write(sink, {**record, **scheduling})
+            finally:
+                slots.release()
+
+        loop = asyncio.get_running_loop()
+        items = self._scheduled(self._ingest(source, sink, run_id))
+
+        while True:
+            await slots.acquire()
+            # Reading (coalescing, scheduling) blocks, so it stays off the loop
+            item = await loop.run_in_executor(None, next, items, None)
+            if item is None:
+                slots.release()
+                break
+            line_no, envelope, scheduling = item
+
+            thread_id = self._dispatched(envelope, run_id, line_no)
+            task = asyncio.create_task(process(thread_id, line_no, envelope, scheduling))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        await asyncio.gather(*in_flight)
+        return dict(self.counts)
+
+    def _ingest(self, source: IO[str], sink: IO[str], run_id: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(line_no, envelope) to run; skipped and malformed lines are written to `sink` directly."""
+        def malformed(line_no: int, error: Exception):
+            self._write(sink, self._error_record(f"batch-{run_id}-{line_no}", line_no, error))
+
+        emails = iter_emails(source, on_error=malformed)
+        if self.coalescer is None:
+            yield from emails
+            return
+
+        for item in self.coalescer.coalesce(emails):
+            if item.duplicate:
+                self._write(sink, self._skipped_record(item.envelope, run_id, item.line_no, "duplicate"))
+                continue
+
+            newest = checkpoint_thread_id(item.envelope, run_id, item.line_no)
+            for line_no, envelope in item.superseded:
+                record = self._skipped_record(envelope, run_id, line_no, "superseded")
+                record["superseded_by"] = newest
+                self._write(sink, record)
+
+            yield item.line_no, item.envelope
+
+    def _scheduled(self, items: Iterator[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """(line_no, envelope, fields added to its result line) in dispatch order."""
+        if self.scheduler is None:
+            for line_no, envelope in items:
+                yield line_no, envelope, {}
+            return
+
+        for item in self.scheduler.schedule(items):
+            yield item.line_no, item.envelope, {
+                "priority": item.priority,
+                "queued_s": round(item.waited, 4),
+            }
+
+    def _dispatched(self, envelope: Dict[str, Any], run_id: str, line_no: int) -> str:
+        thread_id = checkpoint_thread_id(envelope, run_id, line_no)
+        if thread_id in self._thread_ids:
+            # A repeated message or thread id must not share a checkpoint
+            thread_id = f"{thread_id}-{run_id}-{line_no}"
+        self._thread_ids[thread_id] = None
+        while len(self._thread_ids) > THREAD_ID_MEMORY:
+            self._thread_ids.popitem(last=False)
+
+        email_thread_id = envelope["email"].get("thread_id")
+        if self.coalescer is not None and email_thread_id:
+            self._latest_runs[email_thread_id] = thread_id
+        return thread_id
+
+    def _cancel_superseded(self, envelope: Dict[str, Any], record: Dict[str, Any]) -> None:
+        if self.coalescer is None or record["status"] == "error":
+            return
+
+        email_thread_id = envelope["email"].get("thread_id")
+        latest = self._latest_runs.get(email_thread_id, record["thread_id"])
+        cancelled = cancel_superseded(
+            get_approval_store(),
+            self.graph.checkpointer,
+            email_thread_id,
+            keep=latest,
+        )
+
+        # A newer run of the thread was dispatched while this one ran
+        if record["thread_id"] in cancelled:
+            cancelled.remove(record["thread_id"])
+            record["status"] = "superseded"
+            record["superseded_by"] = latest
+        if cancelled:
+            record["cancelled"] = cancelled
+
+    def _process(self, thread_id: str, line_no: int, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+
+        try:
+            state = self.graph.invoke(
+                self._input(envelope),
+                config=self._config(thread_id),
+            )
+            record = result_record(thread_id, line_no, state)
+
+            if record["status"] == "completed" and self.graph.checkpointer:
+                self.graph.checkpointer.delete_thread(thread_id)
+            self._cancel_superseded(envelope, record)
+
+        except Exception as e:
+            record = self._error_record(thread_id, line_no, e)
+
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        return record
+
+    async def _aprocess(self, thread_id: str, line_no: int, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+
+        try:
+            state = await self.graph.ainvoke(
+                self._input(envelope),
+                config=self._config(thread_id),
+            )
+            record = result_record(thread_id, line_no, state)
+
+            if record["status"] == "completed" and self.graph.checkpointer:
+                await self.graph.checkpointer.adelete_thread(thread_id)
+            if self.coalescer is not None:
+                # Approval store and checkpoint deletes are blocking SQLite
+                await asyncio.to_thread(self._cancel_superseded, envelope, record)
+
+        except Exception as e:
+            record = self._error_record(thread_id, line_no, e)
+
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        return record
+
+    def _config(self, thread_id: str) -> Dict[str, Any]:
+        configurable = {"thread_id": thread_id, "llm_cache": self.llm_cache}
+        if self.speculative_compose is not None:
+            configurable["speculative_compose"] = self.speculative_compose
+        return {"configurable": configurable}
+
+    def _input(self, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "email": envelope["email"],
+            "domain": envelope.get("domain", self.domain),
+        }
+
+    @staticmethod
+    def _error_record(thread_id: str, line_no: int, error: Exception) -> Dict[str, Any]:
+        return {
+            "thread_id": thread_id,
+            "line": line_no,
+            "status": "error",
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+    @staticmethod
+    def _skipped_record(envelope: Dict[str, Any], run_id: str, line_no: int, status: str) -> Dict[str, Any]:
+        return {
+            "thread_id": checkpoint_thread_id(envelope, run_id, line_no),
+            "line": line_no,
+            "status": status,
+        }
+
+    def _write(self, sink: IO[str], record: Dict[str, Any]):
+        with self._sink_lock:
+            sink.write(json.dumps(record, default=str) + "\n")
+            sink.flush()
+            self.counts[record["status"]] += 1
+            if record.get("cancelled"):
+                self.counts["cancelled"] += len(record["cancelled"])
+
+    def _write_and_release(self, sink: IO[str], record: Dict[str, Any]):
+        try:
+            self._write(sink, record)
+        finally:
+            self._slots.release()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Process a JSONL backlog of emails.")
+    parser.add_argument("source", help="JSONL file of emails, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL result sink, or '-' for stdout")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run every email on one event loop using the async graph")
+    parser.add_argument("--decision-mode", choices=["two_stage", "fused"], default="two_stage",
+                        help="'fused' decides in one structured LLM call, falling back to two_stage")
+    parser.add_argument("--no-llm-cache", dest="llm_cache", action="store_false",
+                        help="Bypass the LLM response cache for this run")
+    parser.add_argument("--speculative-compose", action="store_true", default=None,
+                        help="Start drafting replies while decisions are validated")
+    parser.add_argument("--coalesce-window", type=float, default=None, metavar="SECONDS",
+                        help="Skip duplicate message ids and run each mail thread once per window, "
+                             "over its newest message")
+    parser.add_argument("--priority", action="store_true",
+                        help="Dispatch waiting emails by priority class (scheduling.yaml) instead of in order")
+    parser.add_argument("--checkpoint-db", default=None,
+                        help="SQLite file for checkpoints, so pending confirmations survive restarts")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.source == "-" else open(args.source, "r", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+
+    checkpointer = None
+    if args.checkpoint_db:
+        from app.graph.approvals import configure_approval_store
+        from app.graph.checkpoint import SqliteCheckpointSaver
+        checkpointer = SqliteCheckpointSaver(args.checkpoint_db)
+        configure_approval_store(args.checkpoint_db)
+
+    try:
+        runner = BatchRunner(
+            concurrency=args.concurrency,
+            domain=args.domain,
+            use_async=args.use_async,
+            decision_mode=args.decision_mode,
+            llm_cache=args.llm_cache,
+            speculative_compose=args.speculative_compose,
+            coalesce_window=args.coalesce_window,
+            priority=args.priority,
+            checkpointer=checkpointer,
+        )
+        if args.use_async:
+            from app.api.ai_service_tool import closing_llm_clients
+
+            counts = asyncio.run(closing_llm_clients(runner.arun(source, sink)))
+        else:
+            counts = runner.run(source, sink)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(json.dumps(counts), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Thread-aware ingestion for batch runs.
+
+- A message whose message_id was already seen is dropped as a duplicate.
+- Messages on the same mail thread (email["thread_id"]) that arrive within
+  `window` seconds of its first message are coalesced into one run over
+  the newest; the older ones are reported as superseded.
+- When a run on a mail thread finishes, the thread's other runs still
+  paused at confirm_interrupt are cancelled (cancel_superseded).
+
+The window bounds the added latency: a thread's run starts at most
+`window` seconds after its first message arrived, however busy it is.
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.graph.approvals import ApprovalStore
+from app.metrics import get_metrics
+
+Envelope = Dict[str, Any]
+
+_EOF = object()
+
+
+@dataclass
+class Ingested:
+    line_no: int
+    envelope: Envelope
+
+    # Already seen; not to be run
+    duplicate: bool = False
+
+    # Older (line_no, envelope) of the same mail thread this run replaces
+    superseded: List[Tuple[int, Envelope]] = field(default_factory=list)
+
+
+class ThreadCoalescer:
+    """
+    Dedupes and coalesces (line_no, envelope) pairs as read by iter_emails().
+    With window=0 messages are only deduplicated.
+    """
+
+    def __init__(self, window: float = 0.0, seen_capacity: int = 100_000):
+        self.window = window
+        self.seen_capacity = seen_capacity
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def coalesce(self, items: Iterable[Tuple[int, Envelope]]) -> Iterator[Ingested]:
+        if self.window <= 0:
+            for line_no, envelope in items:
+                yield self._ingested(line_no, envelope)
+            return
+
+        # A reader thread feeds arrivals, so held threads are released
+        # on time even while the source (e.g. stdin) is idle
+        arrivals: "queue.Queue[Any]" = queue.Queue(maxsize=1024)
+        reader = threading.Thread(target=_read, args=(items, arrivals), daemon=True)
+        reader.start()
+
+        # email thread -> (deadline, held run)
+        held: "OrderedDict[str, Tuple[float, Ingested]]" = OrderedDict()
+
+        while True:
+            timeout = None
+            if held:
+                timeout = max(0.0, next(iter(held.values()))[0] - time.monotonic())
+            try:
+                item = arrivals.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _EOF:
+                for _, run in held.values():
+                    yield run
+                return
+            if isinstance(item, BaseException):
+                raise item
+
+            if item is not None:
+                ingested = self._ingested(*item)
+                key = _mail_thread(ingested.envelope)
+                if ingested.duplicate or key is None:
+                    yield ingested
+                elif key in held:
+                    deadline, previous = held[key]
+                    ingested.superseded = previous.superseded + [(previous.line_no, previous.envelope)]
+                    held[key] = (deadline, ingested)
+                    get_metrics().inc("ingest_messages_total", outcome="superseded")
+                else:
+                    held[key] = (time.monotonic() + self.window, ingested)
+
+            now = time.monotonic()
+            while held and next(iter(held.values()))[0] <= now:
+                _, (_, run) = held.popitem(last=False)
+                yield run
+
+    def _ingested(self, line_no: int, envelope: Envelope) -> Ingested:
+        message_id = envelope["email"].get("message_id")
+        if message_id:
+            if message_id in self._seen:
+                get_metrics().inc("ingest_messages_total", outcome="duplicate")
+                return Ingested(line_no, envelope, duplicate=True)
+            self._seen[message_id] = None
+            while len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
+
+        get_metrics().inc("ingest_messages_total", outcome="accepted")
+        return Ingested(line_no, envelope)
+
+
+def _read(items: Iterable[Tuple[int, Envelope]], arrivals: queue.Queue) -> None:
+    try:
+        for item in items:
+            arrivals.put(item)
+    except BaseException as e:
+        arrivals.put(e)
+        return
+    arrivals.put(_EOF)
+
+
+def _mail_thread(envelope: Envelope) -> Optional[str]:
+    return envelope["email"].get("thread_id")
+
+
+def cancel_superseded(
+    approvals: ApprovalStore,
+    checkpointer,
+    email_thread_id: Optional[str],
+    keep: str,
+) -> List[str]:
+    """
+    Cancels the runs of `email_thread_id` paused at confirm_interrupt,
+    other than `keep`: their pending approval and checkpoint are dropped
+    without resuming. Returns the cancelled checkpoint thread ids.
+    """
+    if not email_thread_id:
+        return []
+
+    cancelled = [
+        pending.thread_id
+        for pending in approvals.query(email_thread_id=email_thread_id)
+        if pending.thread_id != keep
+    ]
+    if not cancelled:
+        return []
+
+    if checkpointer is not None:
+        for thread_id in cancelled:
+            checkpointer.delete_thread(thread_id)
+    approvals.delete(cancelled)
+
+    from app.policy.cache import get_policy_cache
+
+    cache = get_policy_cache()
+    for thread_id in cancelled:
+        cache.unpin(thread_id)
+
+    get_metrics().inc("superseded_runs_cancelled_total", len(cancelled))
+    return cancelled
@@ -0,0 +1,247 @@
+"""
+Policy change impact replay.
+
+Streams a log of past decisions (batch result JSONL, or bare
+decision_output dicts) and validates every decision against both the
+current policy and a candidate policy directory, then reports how
+statuses and violations would change. Deterministic only: the policy
+compiler and validator, never the LLM.
+
+Usage:
+    python -m app.execution.replay results.jsonl --candidate /tmp/policies -j 8
+    python -m app.execution.replay results.jsonl --baseline policies --candidate ../next/policies -o impact.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+sys.path.append(".")
+
+from app.policy.cache import PolicyCache
+from app.policy.loader import PolicyLoader
+from app.validator.compiled import CompiledValidator
+
+DEFAULT_DOMAIN = "founder_inbox"
+CHUNK_SIZE = 2000
+MAX_EXAMPLES = 20
+
+
+@dataclass
+class ReplayReport:
+    """Mergeable counters over a replayed decision log."""
+    records: int = 0
+    skipped: int = 0
+    changed: int = 0
+
+    # "approved -> rejected": count
+    transitions: Counter = field(default_factory=Counter)
+    # category -> {"approved -> rejected": count}, changed records only
+    by_category: Dict[str, Counter] = field(default_factory=dict)
+    # Violation codes raised only by the candidate / only by the baseline
+    introduced: Counter = field(default_factory=Counter)
+    resolved: Counter = field(default_factory=Counter)
+
+    examples: List[Dict[str, Any]] = field(default_factory=list)
+
+    def merge(self, other: "ReplayReport") -> "ReplayReport":
+        self.records += other.records
+        self.skipped += other.skipped
+        self.changed += other.changed
+        self.transitions.update(other.transitions)
+        for category, counts in other.by_category.items():
+            self.by_category.setdefault(category, Counter()).update(counts)
+        self.introduced.update(other.introduced)
+        self.resolved.update(other.resolved)
+        self.examples.extend(other.examples[: MAX_EXAMPLES - len(self.examples)])
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "skipped": self.skipped,
+            "changed": self.changed,
+            "transitions": dict(self.transitions.most_common()),
+            "by_category": {
+                category: dict(counts.most_common())
+                for category, counts in sorted(self.by_category.items())
+            },
+            "violations_introduced": dict(self.introduced.most_common()),
+            "violations_resolved": dict(self.resolved.most_common()),
+            "examples": self.examples,
+        }
+
+
+def load_validator(policy_root: str, domain: str) -> CompiledValidator:
+    """Compiles the policy under `policy_root` for `domain`."""
+    policy = PolicyCache(loader=PolicyLoader(policy_root)).get(domain)
+    return CompiledValidator(policy)
+
+
+def decision_of(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The decision_output of a batch result line, or the line itself."""
+    if "decision_output" in record or "status" in record:
+        return record.get("decision_output")
+    return record
+
+
+def replay_lines(
+    lines: Iterable[str],
+    baseline: CompiledValidator,
+    candidate: CompiledValidator,
+) -> ReplayReport:
+    report = ReplayReport()
+    decisions, records = [], []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # One corrupt line must not end a replay over millions
+            report.skipped += 1
+            continue
+        if not isinstance(record, dict):
+            report.skipped += 1
+            continue
+        decision = decision_of(record)
+        if not isinstance(decision, dict) or decision.get("domain") != candidate.domain:
+            report.skipped += 1
+            continue
+        decisions.append(decision)
+        records.append(record)
+
+    before = baseline.validate_many(decisions)
+    after = candidate.validate_many(decisions)
+
+    for record, decision, old, new in zip(records, decisions, before, after):
+        report.records += 1
+        transition = f"{old.status} -> {new.status}"
+        report.transitions[transition] += 1
+
+        old_codes, new_codes = set(old.violations), set(new.violations)
+        report.introduced.update(new_codes - old_codes)
+        report.resolved.update(old_codes - new_codes)
+
+        if old.status == new.status and old_codes == new_codes:
+            continue
+
+        report.changed += 1
+        report.by_category.setdefault(str(decision.get("category")), Counter())[transition] += 1
+        if len(report.examples) < MAX_EXAMPLES:
+            report.examples.append({
+                "thread_id": record.get("thread_id"),
+                "category": decision.get("category"),
+                "decision": decision.get("decision"),
+                "before": {"status": old.status, "violations": old.violations},
+                "after": {"status": new.status, "violations": new.violations},
+            })
+
+    return report
+
+
+# ─────────────────────────────
+# Multiprocessing
+# ─────────────────────────────
+_baseline: Optional[CompiledValidator] = None
+_candidate: Optional[CompiledValidator] = None
+
+
+def _init_worker(baseline_root: str, candidate_root: str, domain: str):
+    # Each worker compiles both policies once
+    global _baseline, _candidate
+    _baseline = load_validator(baseline_root, domain)
+    _candidate = load_validator(candidate_root, domain)
+
+
+def _replay_chunk(lines: List[str]) -> ReplayReport:
+    return replay_lines(lines, _baseline, _candidate)
+
+
+def _chunks(stream: IO[str], size: int) -> Iterator[List[str]]:
+    while True:
+        chunk = list(itertools.islice(stream, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay(
+    stream: IO[str],
+    candidate_root: str,
+    baseline_root: str = "policies",
+    domain: str = DEFAULT_DOMAIN,
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+) -> ReplayReport:
+    """
+    Replays a decision log with `workers` processes (0 = one per CPU,
+    1 = in-process). Input is read lazily in chunks.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    report = ReplayReport()
+
+    if workers == 1:
+        _init_worker(baseline_root, candidate_root, domain)
+        for chunk in _chunks(stream, chunk_size):
+            report.merge(_replay_chunk(chunk))
+        return report
+
+    with multiprocessing.Pool(
+        workers,
+        initializer=_init_worker,
+        initargs=(baseline_root, candidate_root, domain),
+    ) as pool:
+        for partial in pool.imap_unordered(_replay_chunk, _chunks(stream, chunk_size)):
+            report.merge(partial)
+
+    return report
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Replay past decisions against a candidate policy.")
+    parser.add_argument("source", help="JSONL decision log, or '-' for stdin")
+    parser.add_argument("--candidate", required=True, help="Policy root of the candidate policy")
+    parser.add_argument("--baseline", default="policies", help="Policy root to compare against")
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN)
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Processes (0 = CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("-o", "--output", default="-", help="JSON report, or '-' for stdout")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.source == "-" else open(args.source, "r", encoding="utf-8")
+    try:
+        report = replay(
+            source,
+            candidate_root=args.candidate,
+            baseline_root=args.baseline,
+            domain=args.domain,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    output = json.dumps(report.to_dict(), indent=2)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    print(
+        f"{report.records} replayed, {report.changed} changed, {report.skipped} skipped",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Bulk resume of runs paused at confirm_interrupt.
+
+Pending confirmations are read from the ApprovalStore and resumed
+concurrently with one approval decision. Needs the durable checkpointer
+the runs were paused with.
+
+Usage:
+    python -m app.execution.resume --checkpoint-db .cache/checkpoints.sqlite list --urgency same_day
+    python -m app.execution.resume --checkpoint-db .cache/checkpoints.sqlite approve --risk low --comment "LGTM" -c 32
+    python -m app.execution.resume --checkpoint-db .cache/checkpoints.sqlite reject msg-1 msg-2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+sys.path.append(".")
+
+from app.api.deadlines import reserve_workers
+from app.execution.batch import result_record
+from app.graph.approvals import ApprovalStore, get_approval_store
+
+if TYPE_CHECKING:
+    from langgraph.types import Command
+
+
+def approval_command(approval: str, comment: Optional[str] = None) -> "Command":
+    """The resume value confirm_interrupt expects (see resume_contract)."""
+    from langgraph.types import Command
+
+    if approval not in ("approved", "rejected"):
+        raise ValueError(f"Unknown approval: {approval}")
+
+    return Command(resume={
+        "context": {
+            "human_approval": {"approval": approval, "comment": comment}
+        }
+    })
+
+
+class BulkResumer:
+    """
+    Resumes many paused runs with bounded concurrency.
+
+    Each thread is only resumed if it is still pending and, when an
+    expected decision_hash is given, the reviewer saw the same snapshot.
+    Checkpoints of runs that complete are dropped, as in BatchRunner.
+    """
+
+    def __init__(
+        self,
+        graph=None,
+        concurrency: int = 8,
+        use_async: bool = False,
+        checkpointer=None,
+        approvals: Optional[ApprovalStore] = None,
+    ):
+        if graph is None:
+            from app.graph.dag import build_graph
+            graph = build_graph(use_async=use_async, checkpointer=checkpointer)
+
+        self.graph = graph
+        self.concurrency = concurrency
+        self.approvals = approvals or get_approval_store()
+        reserve_workers(concurrency)
+
+    def resume(
+        self,
+        thread_ids: Iterable[str],
+        approval: str,
+        comment: Optional[str] = None,
+        expected_hashes: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        command = approval_command(approval, comment)
+        thread_ids = list(dict.fromkeys(thread_ids))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(
+                lambda thread_id: self._resume(thread_id, command, expected_hashes),
+                thread_ids,
+            ))
+
+    async def aresume(
+        self,
+        thread_ids: Iterable[str],
+        approval: str,
+        comment: Optional[str] = None,
+        expected_hashes: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        command = approval_command(approval, comment)
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def resume(thread_id):
+            async with slots:
+                return await self._aresume(thread_id, command, expected_hashes)
+
+        return await asyncio.gather(*(
+            resume(thread_id) for thread_id in dict.fromkeys(thread_ids)
+        ))
+
+    def _resume(self, thread_id: str, command: "Command", expected_hashes) -> Dict[str, Any]:
+        started = time.perf_counter()
+
+        record = self._precheck(thread_id, expected_hashes)
+        if record is None:
+            try:
+                state = self.graph.invoke(command, config=self._config(thread_id))
+                record = self._record(thread_id, state)
+                if record["status"] == "completed" and self.graph.checkpointer:
+                    self.graph.checkpointer.delete_thread(thread_id)
+            except Exception as e:
+                record = self._error_record(thread_id, e)
+
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        return record
+
+    async def _aresume(self, thread_id: str, command: "Command", expected_hashes) -> Dict[str, Any]:
+        started = time.perf_counter()
+
+        record = self._precheck(thread_id, expected_hashes)
+        if record is None:
+            try:
+                state = await self.graph.ainvoke(command, config=self._config(thread_id))
+                record = self._record(thread_id, state)
+                if record["status"] == "completed" and self.graph.checkpointer:
+                    await self.graph.checkpointer.adelete_thread(thread_id)
+            except Exception as e:
+                record = self._error_record(thread_id, e)
+
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        return record
+
+    def _precheck(self, thread_id: str, expected_hashes) -> Optional[Dict[str, Any]]:
+        pending = self.approvals.get(thread_id)
+        if pending is None:
+            return {"thread_id": thread_id, "status": "not_pending"}
+
+        expected = (expected_hashes or {}).get(thread_id)
+        if expected and expected != pending.decision_hash:
+            return {
+                "thread_id": thread_id,
+                "status": "stale",
+                "error": "decision_hash changed since it was reviewed",
+            }
+        return None
+
+    @staticmethod
+    def _config(thread_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": thread_id}}
+
+    @staticmethod
+    def _record(thread_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        record = result_record(thread_id, None, state)
+        record.pop("line")
+        return record
+
+    @staticmethod
+    def _error_record(thread_id: str, error: Exception) -> Dict[str, Any]:
+        return {
+            "thread_id": thread_id,
+            "status": "error",
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+
+def _filters(args) -> Dict[str, Any]:
+    return {
+        "urgency": args.urgency,
+        "risk_level": args.risk,
+        "sender": args.sender,
+        "domain": args.domain,
+        "older_than": args.older_than,
+        "limit": args.limit,
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="List and bulk-resolve pending confirmations.")
+    parser.add_argument("--checkpoint-db", required=True,
+                        help="SQLite checkpoint file the runs were paused with")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("list", "approve", "reject"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("thread_ids", nargs="*", help="Explicit threads; otherwise filters apply")
+        cmd.add_argument("--urgency", action="append")
+        cmd.add_argument("--risk", action="append")
+        cmd.add_argument("--sender", help="Address, or @domain")
+        cmd.add_argument("--domain")
+        cmd.add_argument("--older-than", type=float, help="Minimum age in seconds")
+        cmd.add_argument("--limit", type=int)
+        if name != "list":
+            cmd.add_argument("--comment")
+            cmd.add_argument("-c", "--concurrency", type=int, default=8)
+            cmd.add_argument("--async", dest="use_async", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    from app.graph.approvals import configure_approval_store
+
+    approvals = configure_approval_store(args.checkpoint_db)
+
+    if args.thread_ids:
+        pending = [p for p in map(approvals.get, args.thread_ids) if p is not None]
+    else:
+        pending = approvals.query(**_filters(args))
+
+    if args.command == "list":
+        for p in pending:
+            print(json.dumps({
+                "thread_id": p.thread_id,
+                "decision": p.decision,
+                "urgency": p.urgency,
+                "risk_level": p.risk_level,
+                "sender": p.sender,
+                "subject": p.subject,
+                "age_s": round(p.age_seconds),
+                "decision_hash": p.decision_hash,
+            }))
+        return
+
+    # Only resuming needs LangGraph
+    from app.graph.checkpoint import SqliteCheckpointSaver
+
+    resumer = BulkResumer(
+        concurrency=args.concurrency,
+        use_async=args.use_async,
+        checkpointer=SqliteCheckpointSaver(args.checkpoint_db),
+        approvals=approvals,
+    )
+    approval = "approved" if args.command == "approve" else "rejected"
+    thread_ids = [p.thread_id for p in pending]
+    expected = {p.thread_id: p.decision_hash for p in pending}
+
+    if args.use_async:
+        from app.api.ai_service_tool import closing_llm_clients
+
+        records = asyncio.run(closing_llm_clients(resumer.aresume(thread_ids, approval, args.comment, expected)))
+    else:
+        records = resumer.resume(thread_ids, approval, args.comment, expected)
+
+    counts: Dict[str, int] = {}
+    for record in records:
+        print(json.dumps(record, default=str))
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    print(json.dumps(counts), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
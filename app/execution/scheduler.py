@@ -0,0 +1,329 @@
+"""
+Priority scheduling for batch runs.
+
+Without it a batch is FIFO, so an urgent investor email waits behind every
+newsletter read before it. With a PriorityScheduler between ingestion and
+dispatch:
+- each email gets a cheap pre-score from PriorityScorer, computed from
+  sender allowlists, category keyword hints, bulk-mail headers and
+  activity on its mail thread, as configured per domain in scheduling.yaml
+- the score picks a priority class, and each class has its own queue
+- queues are served by weighted fair queuing over the class weights, so
+  lower classes still progress under load
+- an email that has waited its class's max_wait_s is dispatched next
+  (starvation protection)
+
+Input is read ahead on a thread, into at most `max_pending` waiting emails.
+
+Metrics, labelled by priority:
+- scheduler_enqueued_total, scheduler_dispatched_total
+- scheduler_aged_total (dispatched by starvation protection)
+- scheduler_wait_seconds (histogram): time from read to dispatch
+- scheduler_queue_depth (histogram): queue length, at every change
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.metrics import get_metrics
+from app.policy.models import CompiledPolicy
+
+Envelope = Dict[str, Any]
+
+SCHEDULER_MAX_PENDING = int(os.getenv("SCHEDULER_MAX_PENDING", "10000"))
+
+# Used when the domain has no scheduling.yaml: one FIFO class
+DEFAULT_CLASSES = {"normal": {"weight": 1, "min_score": 0.0, "max_wait_s": 3600}}
+
+# Only the start of long bodies is matched against category hints
+_SCORED_BODY_CHARS = 2000
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    name: str
+    weight: float
+    min_score: float
+    max_wait_s: float
+
+
+def priority_classes(policy: CompiledPolicy) -> List[PriorityClass]:
+    """The policy's priority classes, highest min_score first."""
+    classes = (policy.scheduling or {}).get("classes") or DEFAULT_CLASSES
+    return sorted(
+        (
+            PriorityClass(
+                name=name,
+                weight=float(cfg.get("weight", 1)),
+                min_score=float(cfg.get("min_score", 0.0)),
+                max_wait_s=float(cfg.get("max_wait_s", 3600)),
+            )
+            for name, cfg in classes.items()
+        ),
+        key=lambda c: c.min_score,
+        reverse=True,
+    )
+
+
+# ─────────────────────────────
+# Pre-score
+# ─────────────────────────────
+class PriorityScorer:
+    """
+    Scores an email in [0, 1]: base_score plus the score of every
+    matched signal of scheduling.yaml. Negative scores demote.
+    """
+
+    def __init__(self, policy: CompiledPolicy):
+        config = policy.scheduling or {}
+        signals = config.get("signals") or {}
+
+        self.base_score = float(config.get("base_score", 0.5))
+
+        vip = signals.get("vip_senders") or {}
+        self.vip_score = float(vip.get("score", 0.0))
+        self.vip_addresses = {a.lower() for a in vip.get("addresses") or []}
+        self.vip_domains = {d.lower() for d in vip.get("domains") or []}
+
+        self.hints = [
+            (name, float(hint.get("score", 0.0)), _patterns(hint))
+            for name, hint in (signals.get("category_hints") or {}).items()
+        ]
+
+        bulk = signals.get("bulk_mail") or {}
+        self.bulk_score = float(bulk.get("score", 0.0))
+        self.bulk_headers = {h.lower() for h in bulk.get("headers") or []}
+        self.bulk_values = {
+            h.lower(): {str(v).lower() for v in values}
+            for h, values in (bulk.get("values") or {}).items()
+        }
+        self.bulk_senders = tuple(re.compile(p, re.I) for p in bulk.get("sender_patterns") or [])
+
+        activity = signals.get("thread_activity") or {}
+        self.activity_score = float(activity.get("score", 0.0))
+        self.activity_max = float(activity.get("max", 0.0))
+
+    def score(self, email: Dict[str, Any], thread_messages: int = 0) -> Tuple[float, List[str]]:
+        """(score, matched signals); `thread_messages` counts earlier messages of its mail thread."""
+        score = self.base_score
+        matched = []
+
+        address = _sender_address(email)
+        domain = address.rsplit("@", 1)[-1] if "@" in address else ""
+        if address in self.vip_addresses or any(
+            domain == d or domain.endswith("." + d) for d in self.vip_domains
+        ):
+            score += self.vip_score
+            matched.append("vip_sender")
+
+        text = f"{email.get('subject') or ''}\n{(email.get('body') or '')[:_SCORED_BODY_CHARS]}"
+        for name, hint_score, patterns in self.hints:
+            if any(p.search(text) for p in patterns):
+                score += hint_score
+                matched.append(name)
+
+        if self._bulk(email, address):
+            score += self.bulk_score
+            matched.append("bulk_mail")
+
+        if thread_messages and self.activity_score:
+            score += min(self.activity_max, thread_messages * self.activity_score)
+            matched.append("thread_activity")
+
+        return min(1.0, max(0.0, score)), matched
+
+    def _bulk(self, email: Dict[str, Any], address: str) -> bool:
+        headers = {str(k).lower(): str(v).strip().lower() for k, v in (email.get("headers") or {}).items()}
+        if self.bulk_headers & headers.keys():
+            return True
+        if any(headers.get(h) in values for h, values in self.bulk_values.items()):
+            return True
+        return any(p.search(address) for p in self.bulk_senders)
+
+
+def _patterns(hint: Dict[str, Any]) -> Tuple[re.Pattern, ...]:
+    return tuple(re.compile(p, re.I) for p in hint.get("patterns") or [])
+
+
+def _sender_address(email: Dict[str, Any]) -> str:
+    sender = (email.get("from") or "").lower()
+    match = re.search(r"<([^>]+)>", sender)
+    return (match.group(1) if match else sender).strip()
+
+
+def get_priority_scorer(policy: CompiledPolicy) -> PriorityScorer:
+    """Returns the PriorityScorer for a policy version, compiling it once."""
+    from app.policy.cache import get_policy_cache
+
+    return get_policy_cache().derived(policy, "priority_scorer", PriorityScorer)
+
+
+# ─────────────────────────────
+# Queues
+# ─────────────────────────────
+@dataclass
+class Scheduled:
+    line_no: int
+    envelope: Envelope
+    priority: str
+    score: float
+    signals: List[str] = field(default_factory=list)
+
+    # time.monotonic() when read, and seconds waited until dispatch
+    enqueued: float = 0.0
+    waited: float = 0.0
+
+
+class PriorityScheduler:
+    """
+    Orders (line_no, envelope) pairs, as read by iter_emails(), by
+    priority. Each email is tagged start = max(virtual time, finish of
+    its class's previous email) and finish = start + 1 / weight; the
+    waiting email with the smallest finish tag goes next, unless one
+    has waited past its class's max_wait_s.
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        max_pending: int = SCHEDULER_MAX_PENDING,
+        thread_capacity: int = 100_000,
+    ):
+        from app.policy.cache import get_policy_cache
+
+        self.domain = domain
+        self.max_pending = max_pending
+        self.thread_capacity = thread_capacity
+        self.classes = priority_classes(get_policy_cache().get(domain))
+        self._by_name = {c.name: c for c in self.classes}
+
+        # class -> (start tag, finish tag, email)
+        self._queues: Dict[str, Deque[Tuple[float, float, Scheduled]]] = {c.name: deque() for c in self.classes}
+        self._last_finish = {c.name: 0.0 for c in self.classes}
+        self._vtime = 0.0
+        self._pending = 0
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+        # mail thread -> messages read so far
+        self._thread_messages: "OrderedDict[str, int]" = OrderedDict()
+
+    def schedule(self, items: Iterable[Tuple[int, Envelope]]) -> Iterator[Scheduled]:
+        """
+        Emails in dispatch order. Pull the next one only when it can run:
+        everything read in the meantime competes for the slot.
+        """
+        reader = threading.Thread(target=self._read, args=(items,), daemon=True)
+        reader.start()
+
+        while True:
+            item = self._pop()
+            if item is None:
+                return
+            yield item
+
+    # ─────────────────────────────
+    # Reader side
+    # ─────────────────────────────
+    def _read(self, items: Iterable[Tuple[int, Envelope]]) -> None:
+        try:
+            for line_no, envelope in items:
+                self._push(self._scored(line_no, envelope))
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def _scored(self, line_no: int, envelope: Envelope) -> Scheduled:
+        from app.policy.cache import get_policy_cache
+
+        email = envelope["email"]
+        policy = get_policy_cache().get(envelope.get("domain", self.domain))
+        score, signals = get_priority_scorer(policy).score(email, self._seen_on_thread(email))
+
+        priority = next((c for c in self.classes if score >= c.min_score), self.classes[-1])
+        return Scheduled(line_no, envelope, priority.name, score, signals)
+
+    def _seen_on_thread(self, email: Dict[str, Any]) -> int:
+        thread_id = email.get("thread_id")
+        if not thread_id:
+            return 0
+        seen = self._thread_messages.pop(thread_id, 0)
+        self._thread_messages[thread_id] = seen + 1
+        while len(self._thread_messages) > self.thread_capacity:
+            self._thread_messages.popitem(last=False)
+        return seen
+
+    def _push(self, item: Scheduled) -> None:
+        priority = self._by_name[item.priority]
+        with self._cond:
+            while self._pending >= self.max_pending:
+                self._cond.wait()
+
+            start = max(self._vtime, self._last_finish[priority.name])
+            finish = start + 1.0 / priority.weight
+            self._last_finish[priority.name] = finish
+
+            item.enqueued = time.monotonic()
+            queue = self._queues[priority.name]
+            queue.append((start, finish, item))
+            self._pending += 1
+            depth = len(queue)
+            self._cond.notify_all()
+
+        metrics = get_metrics()
+        metrics.inc("scheduler_enqueued_total", priority=item.priority)
+        metrics.observe("scheduler_queue_depth", depth, priority=item.priority)
+
+    # ─────────────────────────────
+    # Dispatch side
+    # ─────────────────────────────
+    def _pop(self) -> Optional[Scheduled]:
+        with self._cond:
+            while not self._pending and not self._done and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            if not self._pending:
+                return None
+
+            name, aged = self._next_class(time.monotonic())
+            queue = self._queues[name]
+            start, _, item = queue.popleft()
+            self._vtime = max(self._vtime, start)
+            self._pending -= 1
+            depth = len(queue)
+            self._cond.notify_all()
+
+        item.waited = time.monotonic() - item.enqueued
+
+        metrics = get_metrics()
+        metrics.inc("scheduler_dispatched_total", priority=name)
+        metrics.observe("scheduler_wait_seconds", item.waited, priority=name)
+        metrics.observe("scheduler_queue_depth", depth, priority=name)
+        if aged:
+            metrics.inc("scheduler_aged_total", priority=name)
+        return item
+
+    def _next_class(self, now: float) -> Tuple[str, bool]:
+        # Called with the lock held and at least one email waiting
+        heads = [(name, queue[0]) for name, queue in self._queues.items() if queue]
+
+        # Starvation protection: the most overdue email goes first
+        overdue = [
+            (now - item.enqueued - self._by_name[name].max_wait_s, name)
+            for name, (_, _, item) in heads
+        ]
+        late, name = max(overdue)
+        if late >= 0:
+            return name, True
+
+        return min(heads, key=lambda head: head[1][1])[0], False
@@ -0,0 +1,323 @@
+"""
+Pending-approval index.
+
+confirm_interrupt records every run it pauses here (public_context,
+decision_snapshot, decision_hash) and removes it once the run is resumed,
+so reviewers can list and bulk-resolve what is waiting without knowing
+thread ids up front. Urgency, risk level, sender, age, decision hash and
+mail thread are indexed columns; the full interrupt payload is kept as JSON.
+
+The compose node publishes the reply draft while it is still streaming
+(publish_draft), so a reviewer can read it before the run pauses.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+APPROVAL_DB_ENV = "EMAIL_AGENT_APPROVAL_DB"
+
+_COLUMNS = (
+    "thread_id, domain, decision, urgency, risk_level, sender, subject,"
+    " email_thread_id, decision_hash, created_at, updated_at, payload"
+)
+_SELECT = (
+    f"SELECT {_COLUMNS}, draft, complete"
+    " FROM pending_approvals LEFT JOIN draft_previews USING (thread_id)"
+)
+
+
+@dataclass(frozen=True)
+class PendingApproval:
+    thread_id: str
+    domain: Optional[str]
+    decision: Optional[str]
+    urgency: Optional[str]
+    risk_level: Optional[str]
+    sender: Optional[str]
+    subject: Optional[str]
+    email_thread_id: Optional[str]
+    decision_hash: Optional[str]
+    created_at: float
+    updated_at: float
+
+    # The full confirm_interrupt payload
+    payload: Dict[str, Any]
+
+    # Reply draft published by compose; partial while still streaming
+    draft: Optional[str] = None
+    draft_complete: bool = False
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.created_at
+
+
+class ApprovalStore:
+    """
+    SQLite-backed index of runs paused at confirm_interrupt.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending_approvals ("
+            " thread_id TEXT PRIMARY KEY,"
+            " domain TEXT,"
+            " decision TEXT,"
+            " urgency TEXT,"
+            " risk_level TEXT,"
+            " sender TEXT,"
+            " subject TEXT,"
+            " email_thread_id TEXT,"
+            " decision_hash TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS draft_previews ("
+            " thread_id TEXT PRIMARY KEY,"
+            " draft TEXT NOT NULL,"
+            " complete INTEGER NOT NULL,"
+            " draft_updated_at REAL NOT NULL)"
+        )
+        for column in ("urgency", "risk_level", "sender", "created_at", "decision_hash", "email_thread_id"):
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS pending_approvals_{column}"
+                f" ON pending_approvals ({column})"
+            )
+        self._db.commit()
+
+    # ─────────────────────────────
+    # Writes (called from confirm_interrupt)
+    # ─────────────────────────────
+    def upsert(self, thread_id: str, payload: Dict[str, Any], email: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Records (or refreshes) the pending confirmation of a run. A node
+        re-executed on resume keeps the original created_at.
+        """
+        public = payload.get("public_context") or {}
+        snapshot = payload.get("decision_snapshot") or {}
+        email = email or {}
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO pending_approvals ({_COLUMNS})"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(thread_id) DO UPDATE SET"
+                " domain = excluded.domain, decision = excluded.decision,"
+                " urgency = excluded.urgency, risk_level = excluded.risk_level,"
+                " sender = excluded.sender, subject = excluded.subject,"
+                " email_thread_id = excluded.email_thread_id,"
+                " decision_hash = excluded.decision_hash,"
+                " updated_at = excluded.updated_at, payload = excluded.payload",
+                (
+                    thread_id,
+                    (snapshot.get("policy_ref") or {}).get("domain"),
+                    public.get("decision"),
+                    public.get("urgency"),
+                    public.get("risk_level"),
+                    _sender_address(public.get("email_from")),
+                    public.get("email_subject"),
+                    email.get("thread_id"),
+                    snapshot.get("decision_hash"),
+                    now,
+                    now,
+                    json.dumps(payload, default=str),
+                ),
+            )
+            self._db.commit()
+
+    def publish_draft(self, thread_id: str, draft: str, complete: bool = False) -> None:
+        """
+        Stores the (partial) reply draft of a run. It can be published
+        before confirm_interrupt records the run, and is read via get_draft()
+        or PendingApproval.draft.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO draft_previews (thread_id, draft, complete, draft_updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (thread_id, draft, int(complete), time.time()),
+            )
+            self._db.commit()
+
+    def discard_draft(self, thread_id: str) -> None:
+        """Drops the draft preview of a run whose compose failed midway."""
+        with self._lock:
+            self._db.execute("DELETE FROM draft_previews WHERE thread_id = ?", (thread_id,))
+            self._db.commit()
+
+    def resolve(self, thread_id: str) -> None:
+        """Removes a run that has been resumed (approved or rejected)."""
+        self.delete([thread_id])
+
+    def delete(self, thread_ids: Iterable[str]) -> None:
+        params = [(thread_id,) for thread_id in thread_ids]
+        with self._lock:
+            for table in ("pending_approvals", "draft_previews"):
+                self._db.executemany(f"DELETE FROM {table} WHERE thread_id = ?", params)
+            self._db.commit()
+
+    # ─────────────────────────────
+    # Queries
+    # ─────────────────────────────
+    def get(self, thread_id: str) -> Optional[PendingApproval]:
+        with self._lock:
+            row = self._db.execute(
+                f"{_SELECT} WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return _approval(row) if row is not None else None
+
+    def get_draft(self, thread_id: str) -> Optional[Tuple[str, bool]]:
+        """(draft, complete) published for a run, paused or not."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT draft, complete FROM draft_previews WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        return (row[0], bool(row[1])) if row is not None else None
+
+    def query(
+        self,
+        urgency: Union[str, Iterable[str], None] = None,
+        risk_level: Union[str, Iterable[str], None] = None,
+        sender: Optional[str] = None,
+        domain: Optional[str] = None,
+        email_thread_id: Optional[str] = None,
+        older_than: Optional[float] = None,
+        newer_than: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[PendingApproval]:
+        """
+        Lists pending approvals, oldest first.
+
+        `sender` matches an address exactly or, when it starts with "@",
+        a whole domain. `older_than` / `newer_than` are ages in seconds.
+        """
+        clauses, params = [], []
+
+        for column, value in (("urgency", urgency), ("risk_level", risk_level)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+
+        if sender:
+            if sender.startswith("@"):
+                clauses.append("sender LIKE ?")
+                params.append("%" + sender.lower())
+            else:
+                clauses.append("sender = ?")
+                params.append(sender.lower())
+
+        for column, value in (("domain", domain), ("email_thread_id", email_thread_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        now = time.time()
+        if older_than is not None:
+            clauses.append("created_at <= ?")
+            params.append(now - older_than)
+        if newer_than is not None:
+            clauses.append("created_at >= ?")
+            params.append(now - newer_than)
+
+        query = _SELECT
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [_approval(row) for row in rows]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Pending approvals grouped by urgency and by risk level."""
+        with self._lock:
+            return {
+                column: dict(
+                    self._db.execute(
+                        f"SELECT COALESCE({column}, ''), COUNT(*) FROM pending_approvals"
+                        f" GROUP BY {column}"
+                    ).fetchall()
+                )
+                for column in ("urgency", "risk_level")
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _sender_address(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    value = value.strip().lower()
+    if "<" in value and value.endswith(">"):
+        value = value[value.rindex("<") + 1:-1]
+    return value
+
+
+def _approval(row) -> PendingApproval:
+    *columns, payload, draft, complete = row
+    return PendingApproval(
+        *columns,
+        payload=json.loads(payload),
+        draft=draft,
+        draft_complete=bool(complete),
+    )
+
+
+_default_store: Optional[ApprovalStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_approval_store() -> ApprovalStore:
+    """
+    Returns the process-wide ApprovalStore.
+
+    Stored in EMAIL_AGENT_APPROVAL_DB, else next to the checkpoints in
+    EMAIL_AGENT_CHECKPOINT_DB, else in memory (matching MemorySaver,
+    whose paused runs do not outlive the process either).
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                # Imported here so listing approvals doesn't load LangGraph
+                from app.graph.checkpoint import CHECKPOINT_DB_ENV
+
+                path = os.getenv(APPROVAL_DB_ENV) or os.getenv(CHECKPOINT_DB_ENV) or ":memory:"
+                _default_store = ApprovalStore(path)
+    return _default_store
+
+
+def configure_approval_store(path: str) -> ApprovalStore:
+    """Points the process-wide ApprovalStore at `path` (e.g. the batch checkpoint DB)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = ApprovalStore(path)
+    return _default_store
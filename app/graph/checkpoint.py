@@ -0,0 +1,511 @@
+"""
+Durable SQLite checkpointer.
+
+Runs paused at confirm_interrupt must survive a restart, so checkpoints are
+persisted to a SQLite file (WAL mode) instead of process memory.
+
+- Channel values are stored as versioned blobs and only channels listed in
+  `new_versions` are written per superstep, so unchanged state (email,
+  policy, summary) is stored once per thread rather than once per step
+- Each put()/put_writes() is one transaction with batched inserts
+- With keep_history=False (default) superseded checkpoints, their writes
+  and unreferenced blobs are dropped as new ones land, so a thread never
+  holds more than its latest checkpoint
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+CHECKPOINT_DB_ENV = "EMAIL_AGENT_CHECKPOINT_DB"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " checkpoint_id TEXT NOT NULL,"
+    " parent_checkpoint_id TEXT,"
+    " type TEXT,"
+    " checkpoint BLOB,"
+    " metadata_type TEXT,"
+    " metadata BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " channel TEXT NOT NULL,"
+    " version TEXT NOT NULL,"
+    " type TEXT NOT NULL,"
+    " blob BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL DEFAULT '',"
+    " checkpoint_id TEXT NOT NULL,"
+    " task_id TEXT NOT NULL,"
+    " idx INTEGER NOT NULL,"
+    " channel TEXT NOT NULL,"
+    " type TEXT,"
+    " blob BLOB,"
+    " task_path TEXT NOT NULL DEFAULT '',"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    File-backed LangGraph checkpointer for the decision graph.
+
+    One connection is shared between threads behind a lock; the async
+    methods run the same statements on a worker thread (asyncio.to_thread).
+    """
+
+    def __init__(self, path: str, keep_history: bool = False, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self.keep_history = keep_history
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction() as cur:
+            for statement in _SCHEMA:
+                cur.execute(statement)
+
+    @classmethod
+    def from_env(cls) -> Optional["SqliteCheckpointSaver"]:
+        """Builds a saver from EMAIL_AGENT_CHECKPOINT_DB, or None if unset."""
+        path = os.getenv(CHECKPOINT_DB_ENV)
+        return cls(path) if path else None
+
+    # ─────────────────────────────
+    # Read
+    # ─────────────────────────────
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata"
+            " FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple[Any, ...] = (thread_id, checkpoint_ns)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._db.execute(query, params).fetchone()
+            return self._tuple(row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+            " type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+
+            metadata = self.serde.loads_typed((row[6], row[7]))
+            if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                continue
+
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                item = self._tuple(row)
+            yield item
+
+    # ─────────────────────────────
+    # Write
+    # ─────────────────────────────
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        c = checkpoint.copy()
+        values: Dict[str, Any] = c.pop("channel_values")
+
+        # Only channels that changed in this superstep get a new blob
+        blobs = []
+        for channel, version in new_versions.items():
+            type_, blob = (
+                self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            )
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), type_, blob))
+
+        type_, serialized = self.serde.dumps_typed(c)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+
+        with self._transaction() as cur:
+            cur.executemany(
+                "INSERT OR REPLACE INTO blobs"
+                " (thread_id, checkpoint_ns, channel, version, type, blob)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                blobs,
+            )
+            cur.execute(
+                "INSERT OR REPLACE INTO checkpoints"
+                " (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+                " type, checkpoint, metadata_type, metadata)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                    type_, serialized, metadata_type, serialized_metadata,
+                ),
+            )
+            if not self.keep_history:
+                self._compact(cur, thread_id, checkpoint_ns, checkpoint["id"], c["channel_versions"])
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # Special writes (errors, interrupts, resume values) overwrite;
+        # regular writes are idempotent per (task, idx)
+        replace, ignore = [], []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, blob = self.serde.dumps_typed(value)
+            row = (
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                write_idx, channel, type_, blob, task_path,
+            )
+            (replace if write_idx < 0 else ignore).append(row)
+
+        columns = (
+            " INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id,"
+            " idx, channel, type, blob, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        with self._transaction() as cur:
+            if not self.keep_history and cur.execute(
+                "SELECT 1 FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                " AND checkpoint_id > ? LIMIT 1",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone():
+                # Late writes for a checkpoint that was already compacted away
+                return
+            if replace:
+                cur.executemany("INSERT OR REPLACE" + columns, replace)
+            if ignore:
+                cur.executemany("INSERT OR IGNORE" + columns, ignore)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._transaction() as cur:
+            for table in ("checkpoints", "blobs", "writes"):
+                cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    # ─────────────────────────────
+    # Maintenance
+    # ─────────────────────────────
+    def prune(self, thread_ids: Optional[Sequence[str]] = None) -> None:
+        """
+        Drops everything but the latest checkpoint of each thread (all
+        threads by default). Only needed for stores written with
+        keep_history=True.
+        """
+        with self._lock:
+            if thread_ids is None:
+                thread_ids = [
+                    r[0] for r in self._db.execute("SELECT DISTINCT thread_id FROM checkpoints")
+                ]
+
+        for thread_id in thread_ids:
+            with self._transaction() as cur:
+                latest = cur.execute(
+                    "SELECT checkpoint_ns, MAX(checkpoint_id) FROM checkpoints"
+                    " WHERE thread_id = ? GROUP BY checkpoint_ns",
+                    (thread_id,),
+                ).fetchall()
+                for checkpoint_ns, checkpoint_id in latest:
+                    type_, serialized = cur.execute(
+                        "SELECT type, checkpoint FROM checkpoints"
+                        " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                        (thread_id, checkpoint_ns, checkpoint_id),
+                    ).fetchone()
+                    versions = self.serde.loads_typed((type_, serialized))["channel_versions"]
+                    self._compact(cur, thread_id, checkpoint_ns, checkpoint_id, versions)
+
+    def vacuum(self) -> None:
+        """Folds the WAL into the main file and reclaims free pages."""
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.execute("VACUUM")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {
+                table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("checkpoints", "blobs", "writes")
+            }
+            stats["threads"] = self._db.execute(
+                "SELECT COUNT(DISTINCT thread_id) FROM checkpoints"
+            ).fetchone()[0]
+            return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ─────────────────────────────
+    # Async: statements run on a worker thread, so a slow commit
+    # never blocks the event loop
+    # ─────────────────────────────
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Zero-padded so versions sort correctly as TEXT
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ─────────────────────────────
+    # Internals
+    # ─────────────────────────────
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            cur = self._db.cursor()
+            cur.execute("BEGIN")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+
+    def _compact(
+        self,
+        cur: sqlite3.Cursor,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        channel_versions: ChannelVersions,
+    ) -> None:
+        # Older checkpoints are never resumed from once a newer one exists
+        cur.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+            " AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        cur.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ?"
+            " AND checkpoint_id < ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+        # Keep exactly the blob versions the surviving checkpoint points at
+        cur.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?"
+            " AND channel = ? AND version != ?",
+            [
+                (thread_id, checkpoint_ns, channel, str(version))
+                for channel, version in channel_versions.items()
+            ],
+        )
+        placeholders = ", ".join("?" for _ in channel_versions)
+        cur.execute(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?"
+            f" AND channel NOT IN ({placeholders})",
+            (thread_id, checkpoint_ns, *channel_versions),
+        )
+
+    def _tuple(self, row: Tuple[Any, ...]) -> CheckpointTuple:
+        (
+            thread_id, checkpoint_ns, checkpoint_id, parent_id,
+            type_, serialized, metadata_type, metadata,
+        ) = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, serialized))
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def _load_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        if not versions:
+            return {}
+
+        rows = self._db.execute(
+            "SELECT channel, version, type, blob FROM blobs"
+            " WHERE thread_id = ? AND checkpoint_ns = ?"
+            f" AND channel IN ({', '.join('?' for _ in versions)})",
+            (thread_id, checkpoint_ns, *versions),
+        ).fetchall()
+
+        wanted = {channel: str(version) for channel, version in versions.items()}
+        return {
+            channel: self.serde.loads_typed((type_, blob))
+            for channel, version, type_, blob in rows
+            if wanted[channel] == version and type_ != "empty"
+        }
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self._db.execute(
+            "SELECT task_id, channel, type, blob FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+            " ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [
+            (task_id, channel, self.serde.loads_typed((type_, blob)))
+            for task_id, channel, type_, blob in rows
+        ]
+
+
+def default_checkpointer() -> BaseCheckpointSaver:
+    """
+    SqliteCheckpointSaver when EMAIL_AGENT_CHECKPOINT_DB is set,
+    otherwise an in-process MemorySaver.
+    """
+    saver = SqliteCheckpointSaver.from_env()
+    if saver is not None:
+        return saver
+
+    from langgraph.checkpoint.memory import MemorySaver
+    return MemorySaver()
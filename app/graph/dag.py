@@ -1,37 +1,126 @@
 import sys
 sys.path.append(".")
-from langgraph.types import RetryPolicy
 from langgraph.graph import StateGraph, END
 from app.graph.state import GraphState
 from app.graph import nodes
-from app.graph.routing import route_after_confirmation_gate
-from IPython.display import Image, display
-from langchain_core.runnables.graph import CurveStyle, MermaidDrawMethod, NodeStyles 
-from langgraph.checkpoint.memory import MemorySaver
-def build_graph():
+from app.graph.routing import (
+    route_after_confirmation_gate,
+    route_after_fused_decision,
+    route_after_preclassify,
+    route_after_reasoning,
+    route_after_structuring,
+)
+from app.graph.checkpoint import default_checkpointer
+from app.metrics import instrument_node
+def build_graph(
+    use_async: bool = False,
+    parallel_prefetch: bool = True,
+    decision_mode: str = "two_stage",
+    checkpointer=None,
+):
+    """
+    Builds the decision graph.
+
+    With use_async=True the LLM and MCP nodes are native coroutines and the
+    graph must be driven with ainvoke()/astream(); the sync variant keeps
+    working with invoke()/stream().
+
+    With parallel_prefetch=True (default) context enrichment and policy
+    loading run as parallel branches after ingest and join before reason;
+    False keeps the original linear chain (used for benchmarking).
+
+    decision_mode="fused" tries a single structured-output LLM call before
+    the two-stage reason -> structure path, which it falls back to when the
+    fused decision fails parsing or validation. The path taken is recorded
+    in state["decision_path"].
+
+    Before any LLM call, the preclassify node applies the domain's
+    preclassifier.yaml rules; confident matches go straight to validate.
+
+    An LLM stage that runs past its deadline (app/api/deadlines.py) ends
+    the run in fallback with a DEADLINE_EXCEEDED violation.
+
+    Without an explicit checkpointer, runs are checkpointed to the SQLite
+    file named by EMAIL_AGENT_CHECKPOINT_DB (so pending confirmations
+    survive restarts), or kept in memory when it is unset.
+    """
+    if decision_mode not in ("two_stage", "fused"):
+        raise ValueError(f"Unknown decision_mode: {decision_mode}")
+    decide_entry = "fused_decide" if decision_mode == "fused" else "reason"
+
     graph = StateGraph(GraphState)
 
-    graph.add_node("ingest", nodes.ingest_email)
-    graph.add_node("enrich", nodes.enrich_context)
-    graph.add_node("load_policy", nodes.load_policy)
-    graph.add_node("summarize_policy", nodes.summarize_policy)
-    graph.add_node("reason", nodes.reasoning_node)
-    graph.add_node("structure", nodes.structure_node)
-    graph.add_node("validate", nodes.validate_decision)
-    graph.add_node("confirm_gate", nodes.confirmation_gate)
-    graph.add_node("execute", nodes.execute_action)
-    graph.add_node("fallback", nodes.safe_fallback)
-    graph.add_node("compose", nodes.compose_reply_content)
-    graph.add_node("confirm_interrupt", nodes.confirm_interrupt)
+    def add_node(name, fn):
+        # Wall/CPU time, attempts and failures per node (see app/metrics)
+        graph.add_node(name, instrument_node(name, fn))
+
+    add_node("ingest", nodes.ingest_email)
+    add_node("enrich", nodes.enrich_context)
+    add_node("load_policy", nodes.load_policy)
+    add_node("summarize_policy", nodes.summarize_policy)
+    add_node("preclassify", nodes.preclassify_node)
+    add_node("reason", nodes.areasoning_node if use_async else nodes.reasoning_node)
+    add_node("structure", nodes.astructure_node if use_async else nodes.structure_node)
+    if decision_mode == "fused":
+        add_node("fused_decide", nodes.afused_decision_node if use_async else nodes.fused_decision_node)
+    add_node("validate", nodes.validate_decision)
+    add_node("confirm_gate", nodes.confirmation_gate)
+    add_node("execute", nodes.aexecute_action if use_async else nodes.execute_action)
+    add_node("fallback", nodes.safe_fallback)
+    add_node("compose", nodes.acompose_reply_content if use_async else nodes.compose_reply_content)
+    add_node("confirm_interrupt", nodes.confirm_interrupt)
 
     graph.set_entry_point("ingest")
 
-    graph.add_edge("ingest", "enrich")
-    graph.add_edge("enrich", "load_policy")
-    graph.add_edge("load_policy", "summarize_policy")
-    graph.add_edge("summarize_policy", "reason")
-    graph.add_edge("reason", "structure")
-    graph.add_edge("structure", "validate")
+    if parallel_prefetch:
+        # enrich and load_policy/summarize_policy share no data
+        graph.add_edge("ingest", "enrich")
+        graph.add_edge("ingest", "load_policy")
+        graph.add_edge("load_policy", "summarize_policy")
+        graph.add_edge(["enrich", "summarize_policy"], "preclassify")
+    else:
+        graph.add_edge("ingest", "enrich")
+        graph.add_edge("enrich", "load_policy")
+        graph.add_edge("load_policy", "summarize_policy")
+        graph.add_edge("summarize_policy", "preclassify")
+
+    graph.add_conditional_edges(
+        "preclassify",
+        route_after_preclassify,
+        {
+            "validate": "validate",
+            "decide": decide_entry,
+        },
+    )
+
+    if decision_mode == "fused":
+        graph.add_conditional_edges(
+            "fused_decide",
+            route_after_fused_decision,
+            {
+                "validate": "validate",
+                "reason": "reason",
+                "fallback": "fallback",
+            },
+        )
+    # LLM stages that run past their deadline end in fallback
+    # (compose reaches it through confirm_gate)
+    graph.add_conditional_edges(
+        "reason",
+        route_after_reasoning,
+        {
+            "structure": "structure",
+            "fallback": "fallback",
+        },
+    )
+    graph.add_conditional_edges(
+        "structure",
+        route_after_structuring,
+        {
+            "validate": "validate",
+            "fallback": "fallback",
+        },
+    )
     graph.add_edge("validate", "compose")
     graph.add_edge("compose", "confirm_gate")
     graph.add_conditional_edges(
@@ -59,7 +148,7 @@ def build_graph():
 
 
 
-    return graph.compile(checkpointer=MemorySaver())
+    return graph.compile(checkpointer=checkpointer or default_checkpointer())
 
 if __name__ == "__main__":
     graph = build_graph()
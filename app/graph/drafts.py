@@ -0,0 +1,120 @@
+"""
+Incremental delivery of the reply draft while compose streams it.
+
+Every chunk is written to the graph's custom stream
+(graph.stream(..., stream_mode="custom")):
+    {"type": "draft_delta", "delta": "..."}
+    {"type": "draft_complete", "draft": "..."}
+
+Runs that will pause for confirmation also publish the accumulated
+draft to the ApprovalStore, at most every COMPOSE_DRAFT_PUBLISH_INTERVAL_MS,
+so reviewers polling the approval index see it before the run pauses.
+If the stream fails (e.g. StageDeadlineExceeded, which ends the run in
+fallback), the partial preview is discarded rather than left behind.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import ExitStack
+from contextvars import Context
+from typing import Any, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import set_config_context
+
+from app.graph.approvals import get_approval_store
+
+DRAFT_PUBLISH_INTERVAL = float(os.getenv("COMPOSE_DRAFT_PUBLISH_INTERVAL_MS", "250")) / 1000
+
+
+class DraftPublisher:
+    """
+    Collects streamed chunks of one draft and publishes them as they arrive.
+    Used as a context manager around the stream (`async with` in async
+    nodes): the custom stream writer reads the run config from a contextvar
+    that Python < 3.11 does not propagate into async nodes, so writes run
+    in a context that has it.
+    """
+
+    def __init__(self, config: Optional[RunnableConfig], publish: bool):
+        self.config = config
+        self.thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        self.publish = publish and self.thread_id is not None
+
+        self._parts: List[str] = []
+        self._published_at = 0.0
+        self._published = False
+        self._context = ExitStack()
+        self._ctx: Optional[Context] = None
+
+    def __enter__(self) -> "DraftPublisher":
+        if self.config:
+            self._ctx = self._context.enter_context(set_config_context(self.config))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._context.close()
+        self._ctx = None
+        if exc_type is not None and self._published:
+            get_approval_store().discard_draft(self.thread_id)
+
+    async def __aenter__(self) -> "DraftPublisher":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._context.close()
+        self._ctx = None
+        if exc_type is not None and self._published:
+            await asyncio.to_thread(get_approval_store().discard_draft, self.thread_id)
+
+    def add(self, chunk: Any) -> None:
+        if self._added(chunk):
+            get_approval_store().publish_draft(self.thread_id, "".join(self._parts))
+
+    async def aadd(self, chunk: Any) -> None:
+        # The approval store is SQLite; publish off the event loop
+        if self._added(chunk):
+            await asyncio.to_thread(get_approval_store().publish_draft, self.thread_id, "".join(self._parts))
+
+    def finish(self) -> str:
+        draft = "".join(self._parts)
+        if self.publish:
+            get_approval_store().publish_draft(self.thread_id, draft, complete=True)
+        self._write({"type": "draft_complete", "draft": draft})
+        return draft
+
+    async def afinish(self) -> str:
+        draft = "".join(self._parts)
+        if self.publish:
+            await asyncio.to_thread(get_approval_store().publish_draft, self.thread_id, draft, complete=True)
+        self._write({"type": "draft_complete", "draft": draft})
+        return draft
+
+    def _added(self, chunk: Any) -> bool:
+        """Records a chunk; returns whether the draft is due for publishing."""
+        delta = chunk.content if hasattr(chunk, "content") else str(chunk)
+        if not delta:
+            return False
+
+        self._parts.append(delta)
+        self._write({"type": "draft_delta", "delta": delta})
+
+        # First chunk goes out immediately, then throttled
+        now = time.monotonic()
+        if self.publish and now - self._published_at >= DRAFT_PUBLISH_INTERVAL:
+            self._published_at = now
+            self._published = True
+            return True
+        return False
+
+    def _write(self, chunk: Dict[str, Any]) -> None:
+        # A no-op unless the caller streams "custom"
+        if self._ctx is not None:
+            self._ctx.run(_write_custom, chunk)
+
+
+def _write_custom(chunk: Dict[str, Any]) -> None:
+    from langgraph.config import get_stream_writer
+
+    get_stream_writer()(chunk)
@@ -1,26 +1,178 @@
-from app.policy.summarizer import PolicySummarizer
+from app.policy.summarizer import get_policy_summary
 from app.validator.validator import DecisionValidator
 from app.graph.state import GraphState
-from app.policy.loader import PolicyLoader
-from app.policy.compiler import PolicyCompiler
-from app.agents.decision_agent import DecisionAgent
-from app.api.ai_service_tool import get_llm, get_structured_llm
-from app.agents.schema_agent import SchemaAgent
-from app.agents.reasoning_agent import ReasoningAgent
-from langgraph.types import interrupt, Command, RetryPolicy
+from app.policy.cache import get_policy_cache
+from app.api.ai_service_tool import REASONING, get_llm, get_structured_llm
+from app.api.deadlines import StageDeadlineExceeded
+from app.api.llm_call import astream_llm, stream_llm
+from app.api.llm_cache import get_llm_cache, model_name
+from app.agents.email_context import bounded_email
+from app.graph.approvals import get_approval_store
+from app.graph.speculation import get_speculative_drafts, speculative_compose_enabled
+from app.validator.compiled import get_compiled_validator
+from app.validator.result import ValidationResult
+from langgraph.types import interrupt
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import set_config_context
 from datetime import datetime, timezone
 import json
 import hashlib
 
-def structure_node(state):
-    schema_agent = SchemaAgent(get_structured_llm())
-    decision = schema_agent.structure(
-        semantic_decision=state["semantic_decision"],
-        policy_summary=state["policy_summary"],
-        email=state["email"],
-        context=state["context"],
-    )
+def structure_node(state, config: RunnableConfig = None):
+    from app.agents.schema_agent import SchemaAgent
 
+    schema_agent = SchemaAgent(get_structured_llm(), cache=_llm_cache(config))
+    try:
+        decision = _with_primary_action(schema_agent.structure(
+            semantic_decision=state["semantic_decision"],
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        ))
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    _speculate_draft(state, config, _proposes_compose(decision))
+
+    return {
+        "decision_output": decision,
+        "decision_path": state.get("decision_path") or "two_stage",
+    }
+
+
+async def astructure_node(state, config: RunnableConfig = None):
+    from app.agents.schema_agent import SchemaAgent
+
+    schema_agent = SchemaAgent(get_structured_llm(), cache=_llm_cache(config))
+    try:
+        decision = _with_primary_action(await schema_agent.astructure(
+            semantic_decision=state["semantic_decision"],
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        ))
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    _speculate_draft(state, config, _proposes_compose(decision), use_async=True)
+
+    return {
+        "decision_output": decision,
+        "decision_path": state.get("decision_path") or "two_stage",
+    }
+
+
+def _speculate_draft(state, config, compose: bool, use_async: bool = False):
+    # Start (or drop) the reply ahead of compose; see app/graph/speculation.py
+    thread_id = _thread_id(config)
+    if thread_id is None or not speculative_compose_enabled(config):
+        return
+
+    drafts = get_speculative_drafts()
+    if not compose:
+        drafts.discard(thread_id)
+        return
+
+    start = drafts.astart if use_async else drafts.start
+    start(thread_id, _compose_prompt(state))
+
+
+def _proposes_compose(decision) -> bool:
+    return any(action.action_type == "compose_email" for action in decision.proposed_actions or [])
+
+
+def preclassify_node(state):
+    """
+    Deterministic short-circuit for obvious mail (newsletters,
+    notifications). Confident matches skip both LLM calls but are
+    still validated downstream.
+    """
+    from app.agents.preclassifier import get_preclassifier
+
+    decision = get_preclassifier(_policy(state)).classify(state["email"])
+    if decision is None:
+        return {}
+
+    return {
+        "decision_output": _with_primary_action(decision),
+        "decision_path": "preclassified",
+    }
+
+
+def fused_decision_node(state, config: RunnableConfig = None):
+    """
+    Single-call reasoning + structuring.
+    Falls back to the two-stage path if the output fails parsing or
+    is rejected by the validator.
+    """
+    from app.agents.fused_agent import FusedDecisionAgent
+
+    agent = FusedDecisionAgent(get_structured_llm(), cache=_llm_cache(config))
+    try:
+        decision = agent.decide(
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        )
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    except ValueError:
+        return {"decision_path": "fused_fallback"}
+
+    return _fused_result(state, decision)
+
+
+async def afused_decision_node(state, config: RunnableConfig = None):
+    from app.agents.fused_agent import FusedDecisionAgent
+
+    agent = FusedDecisionAgent(get_structured_llm(), cache=_llm_cache(config))
+    try:
+        decision = await agent.adecide(
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        )
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    except ValueError:
+        return {"decision_path": "fused_fallback"}
+
+    return _fused_result(state, decision)
+
+
+def _fused_result(state, decision):
+    decision = _with_primary_action(decision)
+
+    result = DecisionValidator().validate(decision, _policy(state))
+    if result.status == "rejected":
+        return {"decision_path": "fused_fallback"}
+
+    return {"decision_output": decision, "decision_path": "fused"}
+
+
+def _deadline_exceeded(state, config, error: StageDeadlineExceeded):
+    """
+    Rejects the email with the policy's fallback decision when an LLM
+    stage runs out of time; the graph routes it to safe_fallback.
+    """
+    get_speculative_drafts().discard(_thread_id(config))
+    return {
+        "validation_result": ValidationResult(
+            status="rejected",
+            final_decision=get_compiled_validator(_policy(state)).fallback(),
+            violations=["DEADLINE_EXCEEDED"],
+            notes=str(error),
+        ),
+        "deadline_exceeded": error.stage,
+    }
+
+
+def _llm_cache(config):
+    # Per-run bypass: config={"configurable": {"llm_cache": False}}
+    if ((config or {}).get("configurable") or {}).get("llm_cache", True) is False:
+        return None
+    return get_llm_cache()
+
+
+def _with_primary_action(decision):
     proposed_actions = getattr(decision, "proposed_actions", None)
 
     if not proposed_actions:
@@ -36,7 +188,7 @@ def structure_node(state):
 
         decision.action = action_type
 
-    return {"decision_output": decision}
+    return decision
 
 
 def ingest_email(state: GraphState):
@@ -58,20 +210,28 @@ def enrich_context(state: GraphState):
 
 
 def load_policy(state: GraphState):
-    loader = PolicyLoader()
-    compiler = PolicyCompiler()
-    policy = compiler.compile(loader.load_domain_policy(state["domain"]))
-    return {"policy": policy}
+    policy = get_policy_cache().get(state["domain"])
+    return {"policy_ref": policy.ref}
 
 
 def summarize_policy(state: GraphState):
-    summary = PolicySummarizer().summarize(state["policy"])
-    return {"policy_summary": summary}
+    # Warms the shared summary; nodes resolve it from policy_ref
+    get_policy_summary(_policy(state))
+    return {}
+
+
+def _policy(state):
+    # State carries only a PolicyRef; the compiled policy is shared in-process
+    return get_policy_cache().resolve(state["policy_ref"])
+
+
+def _policy_summary(state):
+    return get_policy_summary(_policy(state))
 
 
 def validate_decision(state: GraphState):
     validator = DecisionValidator()
-    result = validator.validate(state["decision_output"], state["policy"])    
+    result = validator.validate(state["decision_output"], _policy(state))    
     return {"validation_result": result}
 
 
@@ -81,26 +241,25 @@ def confirmation_gate(state):
     before execution.
     """
 
-    validation = state["validation_result"]
-    decision = validation.final_decision
-    policy = state["policy"]
-
     # 1. Hard rejection
-    if validation.status == "rejected":
+    if state["validation_result"].status == "rejected":
         return {"route": "fallback"}
 
-    # 2. Policy-level mandatory confirmation
-    if policy.autonomy.level == "manual_only":
-        return {"route": "confirm"}
-
-    # 3. Decision-level confirmation
-    if decision.get("needs_confirmation"):
+    # 2. Policy- or decision-level confirmation
+    if _requires_confirmation(state):
         return {"route": "confirm"}
 
-    # 4. Safe to execute
+    # 3. Safe to execute
     return {"route": "execute"}
 
 
+def _requires_confirmation(state) -> bool:
+    # Policy-level mandatory confirmation, then decision-level
+    if _policy(state).autonomy.level == "manual_only":
+        return True
+    return bool(state["validation_result"].final_decision.get("needs_confirmation"))
+
+
 def human_confirmation(state):
     """
     Placeholder for human-in-the-loop confirmation.
@@ -118,8 +277,48 @@ def execute_action(state):
     Executes the action using MCP (Model Context Protocol).
     Reads action from final_decision, maps to MCP tool, and invokes.
     """
-    decision = state["final_decision"]
-    policy = state["policy"]
+    plan = _plan_execution(state)
+    if "final_decision" in plan:
+        return plan
+
+    tool_name, mcp_args = plan["tool"], plan["arguments"]
+
+    # Invoke MCP tool
+    try:
+        result = _invoke_mcp_tool(tool_name, mcp_args)
+    except Exception as e:
+        return _mcp_execution_error(state, tool_name, mcp_args, e)
+
+    return _mcp_execution_result(state, tool_name, mcp_args, result)
+
+
+async def aexecute_action(state):
+    """
+    Async variant of execute_action(); awaits the pooled MCP session directly.
+    """
+    plan = _plan_execution(state)
+    if "final_decision" in plan:
+        return plan
+
+    tool_name, mcp_args = plan["tool"], plan["arguments"]
+
+    try:
+        result = await _ainvoke_mcp_tool(tool_name, mcp_args)
+    except Exception as e:
+        return _mcp_execution_error(state, tool_name, mcp_args, e)
+
+    return _mcp_execution_result(state, tool_name, mcp_args, result)
+
+
+def _plan_execution(state):
+    """
+    Resolves the MCP tool call for final_decision.
+
+    Returns either {"tool", "arguments"} to invoke, or a finished
+    {"final_decision": ...} update when there is nothing to call.
+    """
+    decision = _final_decision(state)
+    policy = _policy(state)
     
     # Extract the action to execute
     action = decision.get("action")
@@ -178,38 +377,46 @@ def execute_action(state):
         value = _resolve_path(state, path)
         if value is not None:
             mcp_args[arg_name] = value
-    
-    # Invoke MCP tool
-    try:
-        result = _invoke_mcp_tool(tool_name, mcp_args)
-        
-        return {
-            "final_decision": {
-                **decision,
-                "execution_result": {
-                    "status": "executed",
-                    "mode": "mcp",
-                    "tool": tool_name,
-                    "arguments": mcp_args,
-                    "result": result,
-                    "executed_at": datetime.now(timezone.utc).isoformat()
-                }
+
+    return {"tool": tool_name, "arguments": mcp_args}
+
+
+def _final_decision(state):
+    # Only compose sets final_decision; auto-executed decisions without a
+    # draft come straight from validation
+    return state.get("final_decision") or state["validation_result"].final_decision
+
+
+def _mcp_execution_result(state, tool_name, mcp_args, result):
+    return {
+        "final_decision": {
+            **_final_decision(state),
+            "execution_result": {
+                "status": "executed",
+                "mode": "mcp",
+                "tool": tool_name,
+                "arguments": mcp_args,
+                "result": result,
+                "executed_at": datetime.now(timezone.utc).isoformat()
             }
         }
-    except Exception as e:
-        return {
-            "final_decision": {
-                **decision,
-                "execution_result": {
-                    "status": "error",
-                    "mode": "mcp",
-                    "tool": tool_name,
-                    "arguments": mcp_args,
-                    "error": str(e),
-                    "executed_at": datetime.now(timezone.utc).isoformat()
-                }
+    }
+
+
+def _mcp_execution_error(state, tool_name, mcp_args, error):
+    return {
+        "final_decision": {
+            **_final_decision(state),
+            "execution_result": {
+                "status": "error",
+                "mode": "mcp",
+                "tool": tool_name,
+                "arguments": mcp_args,
+                "error": str(error),
+                "executed_at": datetime.now(timezone.utc).isoformat()
             }
         }
+    }
 
 
 def _resolve_path(state, path: str):
@@ -234,50 +441,61 @@ def _resolve_path(state, path: str):
 
 def _invoke_mcp_tool(tool_name: str, args: dict):
     """
-    Invokes an MCP tool by connecting to the appropriate MCP server.
-    Uses proper MCP client-server architecture via stdio protocol.
+    Invokes an MCP tool on the appropriate MCP server.
+    Borrows an initialized session from the shared MCP connection pool.
     """
+    from app.mcp import get_mcp_pool
+    from app.policy.mcp_bindings import server_tool_name
+
+    service = _mcp_service(tool_name)
+    result = get_mcp_pool().call_tool(service, server_tool_name(tool_name), {"args": args})
+    return _mcp_content(result)
+
+
+async def _ainvoke_mcp_tool(tool_name: str, args: dict):
+    """
+    Async variant of _invoke_mcp_tool().
+    """
+    from app.mcp import get_mcp_pool
+    from app.policy.mcp_bindings import server_tool_name
+
+    service = _mcp_service(tool_name)
+    result = await get_mcp_pool().acall_tool(service, server_tool_name(tool_name), {"args": args})
+    return _mcp_content(result)
+
+
+def _mcp_service(tool_name: str) -> str:
     # Parse tool name (format: "service.method")
     if "." not in tool_name:
         raise ValueError(f"Invalid tool name format: {tool_name}")
     
     service, method = tool_name.split(".", 1)
     
-    # Import MCP client and 
-    # config
-    from app.mcp import MCPClient, get_server_path
+    from app.mcp import get_server_path
     
     # Get server path for the service
     try:
-        server_path = get_server_path(service)
+        get_server_path(service)
     except (ValueError, FileNotFoundError) as e:
         raise ValueError(f"MCP server not found for service '{service}': {e}")
-    
-    # Run async MCP invocation
-    return asyncio.run(_async_invoke_mcp_tool(server_path, tool_name, args))
 
+    return service
+
+
+def _mcp_content(result):
+    # Tool errors (e.g. an unknown tool name) come back as a result, not
+    # an exception; report them as a failed execution
+    if getattr(result, "isError", False):
+        raise RuntimeError(_mcp_error_text(result))
+    # Extract content from MCP result
+    if hasattr(result, 'content'):
+        return result.content
+    return result
 
-async def _async_invoke_mcp_tool(server_path: str, tool_name: str, args: dict):
-    """
-    Async helper to invoke MCP tool through client-server connection.
-    """
-    client = MCPClient()
-    
-    try:
-        # Connect to MCP server
-        await client.connect(server_path)
-        
-        # Call the tool
-        result = await client.call_tool(tool_name, args)
-        
-        # Extract content from MCP result
-        if hasattr(result, 'content'):
-            return result.content
-        return result
-        
-    finally:
-        # Always disconnect
-        await client.disconnect()
+
+def _mcp_error_text(result) -> str:
+    texts = [getattr(c, "text", "") for c in getattr(result, "content", None) or []]
+    return "; ".join(t for t in texts if t) or "MCP tool returned an error"
 
 
 def safe_fallback(state):
@@ -288,27 +506,122 @@ def safe_fallback(state):
         "final_decision": state["validation_result"].final_decision
     }
 
-def reasoning_node(state: GraphState):
-    agent = ReasoningAgent(llm=get_llm())
+def reasoning_node(state: GraphState, config: RunnableConfig = None):
+    from app.agents.reasoning_agent import ReasoningAgent
+
+    agent = ReasoningAgent(llm=get_llm(), cache=_llm_cache(config))
 
-    semantic = agent.reason(
-        policy_summary=state["policy_summary"],
-        email=state["email"],
-        context=state["context"],
-    )
+    try:
+        semantic = agent.reason(
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        )
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    # The semantic decision is loosely structured; any mention of
+    # compose_email is enough to start drafting while structure runs
+    _speculate_draft(state, config, _mentions_compose(semantic))
 
     return {"semantic_decision": semantic}
 
 
+async def areasoning_node(state: GraphState, config: RunnableConfig = None):
+    from app.agents.reasoning_agent import ReasoningAgent
+
+    agent = ReasoningAgent(llm=get_llm(), cache=_llm_cache(config))
+
+    try:
+        semantic = await agent.areason(
+            policy_summary=_policy_summary(state),
+            email=state["email"],
+            context=state["context"],
+        )
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+    _speculate_draft(state, config, _mentions_compose(semantic), use_async=True)
+
+    return {"semantic_decision": semantic}
+
+
+def _mentions_compose(semantic) -> bool:
+    return "compose_email" in json.dumps(semantic, default=str)
+
+
+def _interrupt(payload, config: RunnableConfig):
+    # interrupt() reads the run config from a contextvar that Python < 3.11
+    # does not propagate into nodes of a graph driven by ainvoke()/astream()
+    with set_config_context(config) as ctx:
+        return ctx.run(interrupt, payload)
+
+
 def _hash_snapshot(snapshot: dict) -> str:
     canonical = json.dumps(snapshot, sort_keys=True)
     return hashlib.sha256(canonical.encode()).hexdigest()
 
 
-def compose_reply_content(state: GraphState):
+def compose_reply_content(state: GraphState, config: RunnableConfig = None):
+    """
+    Generates a draft reply, streaming it as it is generated
+    (see app/graph/drafts.py).
+    """
+    if not _needs_draft(state):
+        get_speculative_drafts().discard(_thread_id(config))
+        return {}
+
+    prompt = _compose_prompt(state)
+    speculative = get_speculative_drafts().claim(_thread_id(config), prompt)
+    chunks = speculative.chunks() if speculative else stream_llm(get_llm(), prompt, role=REASONING)
+
+    try:
+        with _draft_publisher(state, config) as draft:
+            for chunk in chunks:
+                draft.add(chunk)
+            reply_body = draft.finish()
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+
+    return _with_draft(state, reply_body)
+
+
+async def acompose_reply_content(state: GraphState, config: RunnableConfig = None):
     """
-    Generates a draft reply 
+    Async variant of compose_reply_content().
     """
+    if not _needs_draft(state):
+        get_speculative_drafts().discard(_thread_id(config))
+        return {}
+
+    prompt = _compose_prompt(state)
+    speculative = get_speculative_drafts().claim(_thread_id(config), prompt)
+    chunks = speculative.chunks() if speculative else astream_llm(get_llm(), prompt, role=REASONING)
+
+    try:
+        async with _draft_publisher(state, config) as draft:
+            async for chunk in chunks:
+                await draft.aadd(chunk)
+            reply_body = await draft.afinish()
+    except StageDeadlineExceeded as e:
+        return _deadline_exceeded(state, config, e)
+
+    return _with_draft(state, reply_body)
+
+
+def _draft_publisher(state, config):
+    from app.graph.drafts import DraftPublisher
+
+    # Only runs that will pause for a reviewer publish to the approval index
+    return DraftPublisher(config, publish=_requires_confirmation(state))
+
+
+def _thread_id(config):
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def _needs_draft(state) -> bool:
+    # Rejected decisions end in fallback, which discards the draft
+    if state["validation_result"].status == "rejected":
+        return False
 
     decision = state["validation_result"].final_decision
 
@@ -317,40 +630,39 @@ def compose_reply_content(state: GraphState):
 
     # Only compose if compose_email action is present
     if "compose_email" not in action_types:
-        return state
+        return False
     
     # Skip if already composed (e.g., on resume)
     if decision.get("email_body"):
-        return state
+        return False
 
-    email = state["email"]
+    return True
+
+
+def _compose_prompt(state) -> str:
+    email = json.dumps(bounded_email(state["email"], model_name(get_llm())), default=str)
+    context = json.dumps(state["context"], default=str)
+    return f"Compose a reply to the following email: {email} using the following context: {context} and policy summary: {_policy_summary(state).serialized}"
+
+
+def _with_draft(state, reply_body: str):
+    decision = state["validation_result"].final_decision
 
-    # Call LLM and extract text content from AIMessage
-    llm_response = get_llm().invoke(
-        f"Compose a reply to the following email: {email} using the following context: {state['context']} and policy summary: {state['policy_summary']}"
-    )
-    
-    # Extract just the text content from the AIMessage
-    reply_body = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
-    
     return {
-        **state,
         "final_decision": {
             **decision,
             "email_body": reply_body
         }
     }
 
-        
-    
 
-def confirm_interrupt(state: GraphState) -> GraphState:
+def confirm_interrupt(state: GraphState, config: RunnableConfig) -> GraphState:
     """
     Human-in-the-loop confirmation using LangGraph interrupt().
     Aligned with GraphState, CompiledPolicy, and ValidationResult.
     """
 
-    policy = state["policy"]
+    policy = _policy(state)
     decision = state["validation_result"].final_decision
     validation = state["validation_result"]
 
@@ -374,6 +686,7 @@ def confirm_interrupt(state: GraphState) -> GraphState:
         "policy_ref": {
             "domain": policy.domain,
             "version": policy.version,
+            "source_hash": policy.source_hash,
             "autonomy": policy.autonomy.level,
         },
         "decision": {
@@ -407,6 +720,7 @@ def confirm_interrupt(state: GraphState) -> GraphState:
             "risk_level": decision["risk_level"],
             "urgency": decision["urgency"],
             "confidence": decision.get("confidence"),
+            "draft": (state.get("final_decision") or {}).get("email_body"),
         },
         "decision_snapshot": decision_snapshot,
 
@@ -416,8 +730,17 @@ def confirm_interrupt(state: GraphState) -> GraphState:
         }
     }
 
+    # Index the pending confirmation so reviewers can list / bulk-resume it
+    thread_id = config["configurable"]["thread_id"]
+    approvals = get_approval_store()
+    approvals.upsert(thread_id, interrupt_payload, email=state["email"])
+    # Reloads while paused must not evict the policy the resume resolves
+    get_policy_cache().pin(thread_id, policy.ref)
+
     # Call interrupt and capture the resume value
-    resume_value = interrupt(interrupt_payload)
+    resume_value = _interrupt(interrupt_payload, config)
+    approvals.resolve(thread_id)
+    get_policy_cache().unpin(thread_id)
     
     # -----------------
     # Update state with human approval
@@ -431,5 +754,5 @@ def confirm_interrupt(state: GraphState) -> GraphState:
             updated_context = {**state.get("context", {}), "human_approval": human_approval}
             return {"context": updated_context}
 
-    return state
+    return {}
 
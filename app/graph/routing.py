@@ -1,3 +1,38 @@
+def route_after_preclassify(state):
+    """
+    Pre-classified decisions go straight to validation; everything
+    else takes the LLM decision path.
+    """
+    if state.get("decision_path") == "preclassified":
+        return "validate"
+    return "decide"
+
+
+def route_after_fused_decision(state):
+    """
+    Fused decisions go straight to validation; failed ones take
+    the two-stage reason -> structure path, unless the stage ran
+    out of time.
+    """
+    if state.get("deadline_exceeded"):
+        return "fallback"
+    if state.get("decision_path") == "fused":
+        return "validate"
+    return "reason"
+
+
+def route_after_reasoning(state):
+    if state.get("deadline_exceeded"):
+        return "fallback"
+    return "structure"
+
+
+def route_after_structuring(state):
+    if state.get("deadline_exceeded"):
+        return "fallback"
+    return "validate"
+
+
 def route_after_confirmation_gate(state):
 
     """
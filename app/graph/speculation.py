@@ -0,0 +1,232 @@
+"""
+Speculative reply drafting.
+
+When enabled, the reply starts streaming as soon as the decision proposes
+compose_email: after reason if the semantic decision mentions it (so the
+draft overlaps the structure LLM call), else after structure. structure
+cancels the draft if its decision does not propose compose_email, and
+compose cancels it if the decision was rejected; otherwise compose
+consumes the speculative chunks instead of calling the LLM itself.
+
+Enable per run with config={"configurable": {"speculative_compose": True}},
+or for every run with EMAIL_AGENT_SPECULATIVE_COMPOSE=1.
+
+Drafts are kept in a process-local registry keyed by thread_id. A run
+resumed in another process simply composes normally.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, AsyncIterator, Iterator, Optional, Union
+
+from app.api.ai_service_tool import REASONING, get_llm
+from app.api.llm_call import astream_llm, stream_llm
+from app.metrics import current_node, get_metrics
+
+SPECULATIVE_COMPOSE_ENV = "EMAIL_AGENT_SPECULATIVE_COMPOSE"
+SPECULATIVE_COMPOSE_WORKERS = int(os.getenv("SPECULATIVE_COMPOSE_WORKERS", "16"))
+SPECULATIVE_COMPOSE_MAX_PENDING = int(os.getenv("SPECULATIVE_COMPOSE_MAX_PENDING", "1024"))
+
+_DONE = object()
+
+
+def speculative_compose_enabled(config) -> bool:
+    configurable = (config or {}).get("configurable") or {}
+    if "speculative_compose" in configurable:
+        return bool(configurable["speculative_compose"])
+    return os.getenv(SPECULATIVE_COMPOSE_ENV, "0") not in ("0", "false", "False", "")
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class SpeculativeDraft:
+    """A reply streamed on a worker thread; chunks are buffered until compose reads them."""
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self._chunks: "queue.Queue[Any]" = queue.Queue()
+        self._cancelled = threading.Event()
+        self._future = None
+
+    def start(self, executor: ThreadPoolExecutor) -> None:
+        # Run in a copy of the node's context, relabelled for LLM metrics
+        self._future = executor.submit(copy_context().run, self._produce)
+
+    def _produce(self) -> None:
+        current_node.set("compose")
+        stream = stream_llm(get_llm(), self.prompt, role=REASONING)
+        try:
+            for chunk in stream:
+                if self._cancelled.is_set():
+                    break
+                self._chunks.put(chunk)
+        except BaseException as e:
+            self._chunks.put(_Failed(e))
+        finally:
+            stream.close()
+            self._chunks.put(_DONE)
+
+    def chunks(self) -> Iterator[Any]:
+        """Every chunk, as it arrives; re-raises a failed LLM call."""
+        while True:
+            item = self._chunks.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+
+class ASpeculativeDraft:
+    """Async variant of SpeculativeDraft, streamed by a task on the run's event loop."""
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self._chunks: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        # The task copies the node's context; _produce relabels it
+        self._task = asyncio.get_running_loop().create_task(self._produce())
+
+    async def _produce(self) -> None:
+        current_node.set("compose")
+        try:
+            async for chunk in astream_llm(get_llm(), self.prompt, role=REASONING):
+                self._chunks.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            self._chunks.put_nowait(_Failed(e))
+        finally:
+            self._chunks.put_nowait(_DONE)
+
+    async def chunks(self) -> AsyncIterator[Any]:
+        while True:
+            item = await self._chunks.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+Draft = Union[SpeculativeDraft, ASpeculativeDraft]
+
+
+class SpeculativeDrafts:
+    """
+    Drafts started by structure, by thread_id, until compose claims them.
+    Bounded: the oldest unclaimed drafts (e.g. of runs that failed in
+    between) are cancelled.
+    """
+
+    def __init__(self, capacity: int = SPECULATIVE_COMPOSE_MAX_PENDING):
+        self.capacity = capacity
+        self._drafts: "OrderedDict[str, Draft]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self, thread_id: str, prompt: str) -> None:
+        """Starts drafting `prompt`, unless that draft is already running."""
+        if self._running(thread_id, prompt):
+            return
+        draft = SpeculativeDraft(prompt)
+        draft.start(self._workers())
+        self._put(thread_id, draft)
+
+    def astart(self, thread_id: str, prompt: str) -> None:
+        if self._running(thread_id, prompt):
+            return
+        draft = ASpeculativeDraft(prompt)
+        draft.start()
+        self._put(thread_id, draft)
+
+    def claim(self, thread_id: Optional[str], prompt: str) -> Optional[Draft]:
+        """
+        The draft started for `thread_id`, if it was drafted from `prompt`.
+        A draft for another prompt is cancelled.
+        """
+        draft = self._pop(thread_id)
+        if draft is None:
+            return None
+        if draft.prompt != prompt:
+            self._cancel(draft, "stale")
+            return None
+        get_metrics().inc("compose_speculations_total", outcome="used")
+        return draft
+
+    def discard(self, thread_id: Optional[str]) -> None:
+        draft = self._pop(thread_id)
+        if draft is not None:
+            self._cancel(draft, "discarded")
+
+    def _running(self, thread_id: str, prompt: str) -> bool:
+        with self._lock:
+            draft = self._drafts.get(thread_id)
+        return draft is not None and draft.prompt == prompt
+
+    def _put(self, thread_id: str, draft: Draft) -> None:
+        get_metrics().inc("compose_speculations_total", outcome="started")
+        evicted = []
+        with self._lock:
+            previous = self._drafts.pop(thread_id, None)
+            if previous is not None:
+                evicted.append(previous)
+            self._drafts[thread_id] = draft
+            while len(self._drafts) > self.capacity:
+                evicted.append(self._drafts.popitem(last=False)[1])
+        for old in evicted:
+            self._cancel(old, "evicted")
+
+    def _pop(self, thread_id: Optional[str]) -> Optional[Draft]:
+        if thread_id is None:
+            return None
+        with self._lock:
+            return self._drafts.pop(thread_id, None)
+
+    @staticmethod
+    def _cancel(draft: Draft, outcome: str) -> None:
+        draft.cancel()
+        get_metrics().inc("compose_speculations_total", outcome=outcome)
+
+    def _workers(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=SPECULATIVE_COMPOSE_WORKERS,
+                        thread_name_prefix="speculative-compose",
+                    )
+        return self._executor
+
+
+_default_drafts: Optional[SpeculativeDrafts] = None
+_default_drafts_lock = threading.Lock()
+
+
+def get_speculative_drafts() -> SpeculativeDrafts:
+    """Returns the process-wide SpeculativeDrafts registry."""
+    global _default_drafts
+    if _default_drafts is None:
+        with _default_drafts_lock:
+            if _default_drafts is None:
+                _default_drafts = SpeculativeDrafts()
+    return _default_drafts
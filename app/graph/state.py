@@ -1,5 +1,5 @@
 from typing import TypedDict, Dict, Any
-from app.policy.models import CompiledPolicy
+from app.policy.models import PolicyRef
 from app.validator.result import ValidationResult
 
 
@@ -9,12 +9,19 @@ class GraphState(TypedDict):
 
     context: Dict[str, Any]
 
-    policy: CompiledPolicy
-    policy_summary: Dict[str, Any]
+    # Resolved via PolicyCache.resolve(); the compiled policy and its
+    # summary are never checkpointed
+    policy_ref: PolicyRef
 
     semantic_decision: Dict[str, Any]     
     decision_output: Any
 
+    # "preclassified" | "two_stage" | "fused" | "fused_fallback"
+    decision_path: str
+
     validation_result: ValidationResult
 
+    # The LLM stage that ran past its deadline (see app/api/deadlines.py)
+    deadline_exceeded: str
+
     final_decision: Dict[str, Any]
@@ -1,8 +1,6 @@
+import functools
 import sys
-from langgraph.checkpoint.memory import MemorySaver
 sys.path.append(".")
-from app.graph.dag import build_graph
-from langgraph.types import Command
 
 
 def format_workflow_result(result):
@@ -93,7 +91,12 @@ def format_workflow_result(result):
     print("="*80 + "\n")
 
 
-graph = build_graph()
+@functools.lru_cache(maxsize=None)
+def get_graph():
+    """Compiles the graph on first use, not at import."""
+    from app.graph.dag import build_graph
+    return build_graph()
+
 
 TEST_EMAILS = {}
 
@@ -112,40 +115,48 @@ TEST_EMAILS["investor_follow_up"] = {
     "attachments": []
 }
 
-config = {"configurable":{"thread_id":"thread-101"}}
-email_payload = TEST_EMAILS["investor_follow_up"]
-## Streaming each node output
-
-for node in graph.stream(
-    input={
-    "email": email_payload,
-    "domain": "founder_inbox",
-},
-stream_mode="updates",
-config = config):
-    print(node)
-
-# # Display formatted result
-format_workflow_result(node)
-
-resumed_result = graph.invoke(Command(resume={
-            "context": {
-                "human_approval": {
-                    "approval": "approved",
-                    "comment": "Looks good"
+
+def main():
+    from langgraph.types import Command
+
+    graph = get_graph()
+
+    config = {"configurable":{"thread_id":"thread-101"}}
+    email_payload = TEST_EMAILS["investor_follow_up"]
+    ## Streaming each node output
+
+    for node in graph.stream(
+        input={
+        "email": email_payload,
+        "domain": "founder_inbox",
+    },
+    stream_mode="updates",
+    config = config):
+        print(node)
+
+    # # Display formatted result
+    format_workflow_result(node)
+
+    resumed_result = graph.invoke(Command(resume={
+                "context": {
+                    "human_approval": {
+                        "approval": "approved",
+                        "comment": "Looks good"
+                    }
                 }
             }
-        }
-    ), config=config)
+        ), config=config)
 
-print("\n" + "="*80)
-print("🔄 RESUMED WORKFLOW AFTER HUMAN APPROVAL")
-print("="*80)
-print(f"Resumed result keys: {resumed_result.keys()}")
-print(f"Final decision: {resumed_result.get('final_decision')}")
-print("="*80 + "\n")
+    print("\n" + "="*80)
+    print("🔄 RESUMED WORKFLOW AFTER HUMAN APPROVAL")
+    print("="*80)
+    print(f"Resumed result keys: {resumed_result.keys()}")
+    print(f"Final decision: {resumed_result.get('final_decision')}")
+    print("="*80 + "\n")
 
-# Display formatted result
-format_workflow_result(resumed_result)
+    # Display formatted result
+    format_workflow_result(resumed_result)
 
 
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 # MCP Client Package
 from .client import MCPClient
 from .config import MCP_SERVERS, get_server_path
+from .pool import MCPConnectionPool, get_mcp_pool
 
-__all__ = ["MCPClient", "MCP_SERVERS", "get_server_path"]
+__all__ = [
+    "MCPClient",
+    "MCPConnectionPool",
+    "MCP_SERVERS",
+    "get_mcp_pool",
+    "get_server_path",
+]
@@ -5,6 +5,7 @@ Provides a simple interface to connect to MCP servers and invoke tools.
 """
 
 import asyncio
+import time
 from typing import Optional, Dict, Any
 from contextlib import AsyncExitStack
 
@@ -21,6 +22,10 @@ class MCPClient:
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
         self.connected_server: Optional[str] = None
+        # Set by connect(): seconds to start the server process, and to
+        # complete the initialize handshake (which waits out server startup)
+        self.spawn_seconds: Optional[float] = None
+        self.initialize_seconds: Optional[float] = None
     
     async def connect(self, server_script_path: str):
         """
@@ -46,10 +51,12 @@ class MCPClient:
         )
         
         # Connect via stdio
+        started = time.perf_counter()
         stdio_transport = await self.exit_stack.enter_async_context(
             stdio_client(server_params)
         )
         self.stdio, self.write = stdio_transport
+        self.spawn_seconds = time.perf_counter() - started
         
         # Create session
         self.session = await self.exit_stack.enter_async_context(
@@ -57,7 +64,9 @@ class MCPClient:
         )
         
         # Initialize session
+        started = time.perf_counter()
         await self.session.initialize()
+        self.initialize_seconds = time.perf_counter() - started
         
         self.connected_server = server_script_path
     
@@ -91,6 +100,13 @@ class MCPClient:
         result = await self.session.call_tool(tool_name, arguments)
         return result
     
+    async def ping(self):
+        """Round-trips a ping to check the session is still alive."""
+        if not self.session:
+            raise RuntimeError("Not connected to any MCP server")
+        
+        await self.session.send_ping()
+    
     async def disconnect(self):
         """Disconnect from the MCP server."""
         await self.exit_stack.aclose()
@@ -16,12 +16,23 @@ MCP_SERVERS = {
     # "calendar": os.path.join(MCP_SERVERS_DIR, "calendar_mcp_server", "server.py"),
 }
 
+# Connection pool settings (see app/mcp/pool.py)
+MCP_POOL_MAX_SIZE = int(os.getenv("MCP_POOL_MAX_SIZE", "4"))
+MCP_POOL_IDLE_TIMEOUT = float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "300"))
+MCP_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
 def get_server_path(service: str) -> str:
-    """Get the absolute path to an MCP server script."""
+    """
+    Get the absolute path to an MCP server script.
+    MCP_SERVER_<SERVICE> (e.g. MCP_SERVER_GMAIL) overrides the default,
+    e.g. to point at a local fake server for benchmarks.
+    """
     if service not in MCP_SERVERS:
         raise ValueError(f"Unknown MCP service: {service}")
     
-    path = os.path.abspath(MCP_SERVERS[service])
+    path = os.path.abspath(
+        os.getenv(f"MCP_SERVER_{service.upper()}") or MCP_SERVERS[service]
+    )
     
     if not os.path.exists(path):
         raise FileNotFoundError(f"MCP server not found: {path}")
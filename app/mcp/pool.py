@@ -0,0 +1,337 @@
+"""
+MCP Connection Pool
+
+Keeps initialized MCPClient sessions alive across tool calls instead of
+spawning a fresh server process per action.
+
+All connections live on one background event loop. Each connection is
+owned by its own task, because the stdio transport must be opened and
+closed from the same task.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from mcp import McpError
+
+from app.metrics import get_metrics
+
+from .client import MCPClient
+from .config import (
+    MCP_POOL_HEALTH_CHECK_INTERVAL,
+    MCP_POOL_IDLE_TIMEOUT,
+    MCP_POOL_MAX_SIZE,
+    get_server_path,
+)
+
+
+class _PooledConnection:
+    """
+    One live MCP session, owned by a dedicated task on the pool loop.
+    """
+
+    def __init__(self, service: str, server_path: str):
+        self.service = service
+        self.server_path = server_path
+        self.client: Optional[MCPClient] = None
+        self.error: Optional[BaseException] = None
+        self.last_used = time.monotonic()
+
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    async def close(self):
+        self._closing.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        client = MCPClient()
+        try:
+            await client.connect(self.server_path)
+        except BaseException as e:
+            self.error = e
+            self._ready.set()
+            await client.disconnect()
+            return
+
+        self.client = client
+        self._ready.set()
+        try:
+            await self._closing.wait()
+        finally:
+            await client.disconnect()
+
+
+class MCPConnectionPool:
+    """
+    Per-service pool of initialized MCP sessions.
+
+    - Sessions are created lazily, up to `max_size` per service
+    - Sessions idle longer than `health_check_interval` are pinged
+      before being handed out; dead ones are replaced
+    - Sessions idle longer than `idle_timeout` are closed
+    - A session whose transport fails mid-call is discarded, never reused
+
+    Records mcp_spawn_seconds / mcp_initialize_seconds per new session and
+    mcp_acquire_seconds / mcp_call_seconds per call (see app/metrics).
+    """
+
+    def __init__(
+        self,
+        max_size: int = MCP_POOL_MAX_SIZE,
+        idle_timeout: float = MCP_POOL_IDLE_TIMEOUT,
+        health_check_interval: float = MCP_POOL_HEALTH_CHECK_INTERVAL,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Only touched from the pool loop
+        self._idle: Dict[str, List[_PooledConnection]] = defaultdict(list)
+        self._size: Dict[str, int] = defaultdict(int)
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    # ─────────────────────────────
+    # Public API
+    # ─────────────────────────────
+    def call_tool(self, service: str, tool_name: str, args: Dict[str, Any]) -> Any:
+        """
+        Blocking tool call; must not be used from the pool loop itself.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._call_tool(service, tool_name, args), self._ensure_loop()
+        )
+        return future.result()
+
+    async def acall_tool(self, service: str, tool_name: str, args: Dict[str, Any]) -> Any:
+        """
+        Awaitable tool call, usable from any event loop.
+        """
+        loop = self._ensure_loop()
+        coro = self._call_tool(service, tool_name, args)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+            "open": dict(self._size),
+            "idle": {service: len(conns) for service, conns in self._idle.items()},
+        }
+
+    def close(self):
+        """Closes every session and stops the pool loop."""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._close_all(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # ─────────────────────────────
+    # Loop management
+    # ─────────────────────────────
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="mcp-pool", daemon=True
+                )
+                thread.start()
+                self._thread = thread
+                self._loop = loop
+        return self._loop
+
+    def _condition(self, service: str) -> asyncio.Condition:
+        if service not in self._conditions:
+            self._conditions[service] = asyncio.Condition()
+        return self._conditions[service]
+
+    # ─────────────────────────────
+    # Borrow / return
+    # ─────────────────────────────
+    async def _call_tool(self, service: str, tool_name: str, args: Dict[str, Any]) -> Any:
+        metrics = get_metrics()
+        started = time.perf_counter()
+        conn = await self._acquire(service)
+        acquired = time.perf_counter()
+        metrics.observe("mcp_acquire_seconds", acquired - started, service=service)
+
+        try:
+            result = await conn.client.call_tool(tool_name, args)
+        except McpError as e:
+            # Protocol-level tool error: the session itself is still fine
+            self._record_call(metrics, service, tool_name, acquired, e)
+            await self._release(conn)
+            raise
+        except BaseException as e:
+            self._record_call(metrics, service, tool_name, acquired, e)
+            await self._release(conn, broken=True)
+            raise
+
+        self._record_call(metrics, service, tool_name, acquired)
+        await self._release(conn)
+        return result
+
+    @staticmethod
+    def _record_call(metrics, service, tool_name, started, error=None):
+        labels = {"service": service, "tool": tool_name}
+        metrics.observe("mcp_call_seconds", time.perf_counter() - started, **labels)
+        metrics.inc("mcp_calls_total", **labels)
+        if error is not None:
+            metrics.inc("mcp_errors_total", error=type(error).__name__, **labels)
+
+    async def _acquire(self, service: str) -> _PooledConnection:
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+        cond = self._condition(service)
+        while True:
+            async with cond:
+                while not self._idle[service] and self._size[service] >= self.max_size:
+                    await cond.wait()
+
+                conn = self._idle[service].pop() if self._idle[service] else None
+                if conn is None:
+                    self._size[service] += 1
+
+            if conn is None:
+                return await self._open(service)
+
+            if await self._healthy(conn):
+                self.reused += 1
+                return conn
+
+            await self._release(conn, broken=True)
+
+    async def _release(self, conn: _PooledConnection, broken: bool = False):
+        cond = self._condition(conn.service)
+
+        if broken:
+            self.discarded += 1
+            await conn.close()
+            async with cond:
+                self._size[conn.service] -= 1
+                cond.notify()
+            return
+
+        conn.last_used = time.monotonic()
+        async with cond:
+            self._idle[conn.service].append(conn)
+            cond.notify()
+
+    async def _open(self, service: str) -> _PooledConnection:
+        try:
+            conn = _PooledConnection(service, get_server_path(service))
+            await conn.open()
+        except BaseException:
+            cond = self._condition(service)
+            async with cond:
+                self._size[service] -= 1
+                cond.notify()
+            raise
+
+        self.created += 1
+        metrics = get_metrics()
+        metrics.observe("mcp_spawn_seconds", conn.client.spawn_seconds, service=service)
+        metrics.observe("mcp_initialize_seconds", conn.client.initialize_seconds, service=service)
+        return conn
+
+    async def _healthy(self, conn: _PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            await asyncio.wait_for(conn.client.ping(), timeout=5.0)
+            return True
+        except Exception:
+            return False
+
+    # ─────────────────────────────
+    # Eviction / shutdown
+    # ─────────────────────────────
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(max(1.0, min(self.idle_timeout / 2, 30.0)))
+            now = time.monotonic()
+
+            for service in list(self._idle):
+                cond = self._condition(service)
+                async with cond:
+                    expired = [
+                        c for c in self._idle[service]
+                        if now - c.last_used >= self.idle_timeout
+                    ]
+                    self._idle[service] = [
+                        c for c in self._idle[service] if c not in expired
+                    ]
+                    self._size[service] -= len(expired)
+                    cond.notify(len(expired))
+
+                for conn in expired:
+                    await conn.close()
+
+    async def _close_all(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+
+        for service, conns in self._idle.items():
+            for conn in conns:
+                await conn.close()
+            self._size[service] -= len(conns)
+        self._idle.clear()
+
+
+_default_pool: Optional[MCPConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_mcp_pool() -> MCPConnectionPool:
+    """Returns the process-wide MCPConnectionPool."""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = MCPConnectionPool()
+                atexit.register(_default_pool.close)
+    return _default_pool
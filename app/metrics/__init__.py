@@ -0,0 +1,17 @@
+# Metrics Package
+from .instrument import current_node, instrument_node
+from .registry import METRICS_ENV, Metrics, configure_metrics, get_metrics
+from .sinks import InMemorySink, JsonlSink, MetricsSink, PrometheusTextfileSink
+
+__all__ = [
+    "InMemorySink",
+    "JsonlSink",
+    "METRICS_ENV",
+    "Metrics",
+    "MetricsSink",
+    "PrometheusTextfileSink",
+    "configure_metrics",
+    "current_node",
+    "get_metrics",
+    "instrument_node",
+]
@@ -0,0 +1,141 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .registry import Metrics, get_metrics
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+
+# Graph node currently executing in this context; LLM metrics use it as a
+# label and app/api/deadlines.py picks the stage's deadline by it
+current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+
+
+class _RetryTracker:
+    """
+    Remembers recently failed task attempts by checkpoint namespace.
+    LangGraph re-runs a retried task with the same namespace, so a later
+    attempt with a remembered namespace is a retry.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._failed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def failed(self, task: Optional[str]) -> None:
+        if not task:
+            return
+        with self._lock:
+            self._failed[task] = None
+            while len(self._failed) > self.capacity:
+                self._failed.popitem(last=False)
+
+    def is_retry(self, task: Optional[str]) -> bool:
+        if not task:
+            return False
+        with self._lock:
+            if task not in self._failed:
+                return False
+            del self._failed[task]
+            return True
+
+
+_retries = _RetryTracker()
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """
+    Wraps a graph node to record, per node:
+    - node_wall_seconds / node_cpu_seconds (histograms)
+    - node_attempts_total, node_retries_total, node_failures_total{error}
+
+    CPU time is per thread; for coroutine nodes it also counts other tasks
+    that ran on the loop while the node was suspended. Interrupts are
+    control flow, not failures. The wrapper always accepts `config` and
+    forwards it only if `fn` does. current_node is set even while metrics
+    are disabled.
+    """
+    # Graph building already loaded LangGraph; importing it here keeps
+    # app.metrics itself light for the MCP pool and LLM helpers
+    from langgraph.errors import GraphBubbleUp
+
+    accepts_config = "config" in inspect.signature(fn).parameters
+
+    if asyncio.iscoroutinefunction(fn):
+        async def wrapper(state, config: "RunnableConfig" = None):
+            args = (state, config) if accepts_config else (state,)
+            metrics = get_metrics()
+            if not metrics.enabled:
+                token = current_node.set(name)
+                try:
+                    return await fn(*args)
+                finally:
+                    current_node.reset(token)
+
+            token, started = _start(metrics, name, config)
+            try:
+                return await fn(*args)
+            except GraphBubbleUp:
+                raise
+            except BaseException as e:
+                _fail(metrics, name, config, e)
+                raise
+            finally:
+                _finish(metrics, name, token, started)
+    else:
+        def wrapper(state, config: "RunnableConfig" = None):
+            args = (state, config) if accepts_config else (state,)
+            metrics = get_metrics()
+            if not metrics.enabled:
+                token = current_node.set(name)
+                try:
+                    return fn(*args)
+                finally:
+                    current_node.reset(token)
+
+            token, started = _start(metrics, name, config)
+            try:
+                return fn(*args)
+            except GraphBubbleUp:
+                raise
+            except BaseException as e:
+                _fail(metrics, name, config, e)
+                raise
+            finally:
+                _finish(metrics, name, token, started)
+
+    functools.update_wrapper(wrapper, fn)
+    # LangGraph must inspect the wrapper's signature (which takes config),
+    # not follow __wrapped__ to the node's own
+    del wrapper.__wrapped__
+    return wrapper
+
+
+def _task(config: Optional["RunnableConfig"]) -> Optional[str]:
+    return ((config or {}).get("configurable") or {}).get("checkpoint_ns")
+
+
+def _start(metrics: Metrics, name: str, config) -> tuple:
+    metrics.inc("node_attempts_total", node=name)
+    if _retries.is_retry(_task(config)):
+        metrics.inc("node_retries_total", node=name)
+    return current_node.set(name), (time.perf_counter(), time.thread_time())
+
+
+def _fail(metrics: Metrics, name: str, config, error: BaseException) -> None:
+    metrics.inc("node_failures_total", node=name, error=type(error).__name__)
+    _retries.failed(_task(config))
+
+
+def _finish(metrics: Metrics, name: str, token, started) -> None:
+    wall, cpu = started
+    metrics.observe("node_wall_seconds", time.perf_counter() - wall, node=name)
+    metrics.observe("node_cpu_seconds", time.thread_time() - cpu, node=name)
+    current_node.reset(token)
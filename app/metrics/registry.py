@@ -0,0 +1,97 @@
+import atexit
+import os
+import threading
+from typing import Iterable, List, Optional
+
+from .sinks import COUNTER, HISTOGRAM, JsonlSink, MetricsSink, PrometheusTextfileSink
+
+# Comma-separated sinks, e.g.
+#   EMAIL_AGENT_METRICS=prometheus:/var/lib/node_exporter/email_agent.prom,jsonl:metrics.jsonl
+METRICS_ENV = "EMAIL_AGENT_METRICS"
+METRICS_INTERVAL = float(os.getenv("EMAIL_AGENT_METRICS_INTERVAL", "15"))
+
+
+class Metrics:
+    """
+    Fans samples out to the configured sinks.
+
+    With no sinks `enabled` is False and instrumentation skips all
+    timing and label work, so it is safe to leave wired in everywhere.
+    """
+
+    def __init__(self, sinks: Optional[Iterable[MetricsSink]] = None):
+        self.sinks: List[MetricsSink] = list(sinks or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        self._record(COUNTER, name, value, labels)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        self._record(HISTOGRAM, name, value, labels)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def _record(self, kind, name, value, labels) -> None:
+        if not self.sinks:
+            return
+        labels = {k: str(v) for k, v in labels.items() if v is not None}
+        for sink in self.sinks:
+            sink.record(kind, name, value, labels)
+
+
+def sinks_from_env(spec: Optional[str] = None) -> List[MetricsSink]:
+    """Parses EMAIL_AGENT_METRICS ("kind:path,..."); kinds: prometheus, jsonl."""
+    spec = os.getenv(METRICS_ENV, "") if spec is None else spec
+    sinks: List[MetricsSink] = []
+
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, path = entry.partition(":")
+        if kind == "prometheus" and path:
+            sinks.append(PrometheusTextfileSink(path, interval=METRICS_INTERVAL))
+        elif kind == "jsonl" and path:
+            sinks.append(JsonlSink(path))
+        else:
+            raise ValueError(f"Invalid {METRICS_ENV} entry: {entry!r}")
+
+    return sinks
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Returns the process-wide Metrics, configured from EMAIL_AGENT_METRICS."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics(sinks_from_env())
+                atexit.register(_flush_at_exit)
+    return _metrics
+
+
+def configure_metrics(*sinks: MetricsSink) -> Metrics:
+    """
+    Replaces the process-wide sinks (e.g. an InMemorySink in tests).
+    Call with no arguments to disable metrics.
+    """
+    metrics = get_metrics()
+    with _metrics_lock:
+        metrics.flush()
+        metrics.sinks = list(sinks)
+    return metrics
+
+
+def _flush_at_exit():
+    if _metrics is not None:
+        _metrics.close()
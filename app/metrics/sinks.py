@@ -0,0 +1,241 @@
+"""
+Metric sinks.
+
+Every sink receives the same stream of samples via record():
+- kind:   "counter" (value is an increment) or "histogram" (an observation)
+- name:   metric name without namespace, e.g. "node_wall_seconds"
+- labels: small dict of string labels
+
+Sinks must be thread-safe and cheap on record(); anything slow
+(file writes) happens in flush() or at most every `interval` seconds.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+
+# Seconds; tokens and other non-latency values are counters
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsSink:
+    """Base class; subclasses override record() and optionally flush()."""
+
+    def record(self, kind: str, name: str, value: float, labels: Dict[str, str]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+@dataclass(frozen=True)
+class Sample:
+    kind: str
+    name: str
+    value: float
+    labels: Dict[str, str]
+    timestamp: float
+
+
+class InMemorySink(MetricsSink):
+    """Keeps every sample in a list. Meant for tests and benchmarks."""
+
+    def __init__(self):
+        self.samples: List[Sample] = []
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, value, labels):
+        sample = Sample(kind, name, value, labels, time.time())
+        with self._lock:
+            self.samples.append(sample)
+
+    def values(self, name: str, **labels) -> List[float]:
+        """Values of `name` whose labels include `labels`."""
+        with self._lock:
+            samples = list(self.samples)
+        return [
+            s.value for s in samples
+            if s.name == name and all(s.labels.get(k) == v for k, v in labels.items())
+        ]
+
+    def total(self, name: str, **labels) -> float:
+        return sum(self.values(name, **labels))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.samples.clear()
+
+
+class JsonlSink(MetricsSink):
+    """
+    Appends one JSON object per sample to `path`. Lines are buffered and
+    written every `buffer_size` samples and on flush().
+    """
+
+    def __init__(self, path: str, buffer_size: int = 512):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, kind, name, value, labels):
+        line = json.dumps({
+            "ts": round(time.time(), 6),
+            "kind": kind,
+            "name": name,
+            "value": value,
+            "labels": labels,
+        })
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) < self.buffer_size:
+                return
+            lines, self._buffer = self._buffer, []
+            self._write(lines)
+
+    def flush(self):
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            self._write(lines)
+
+    def _write(self, lines: List[str]) -> None:
+        # Called with the lock held so lines from different flushes keep order
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class PrometheusTextfileSink(MetricsSink):
+    """
+    Aggregates samples in memory and writes them in the Prometheus text
+    exposition format to `path`, for node_exporter's textfile collector.
+
+    The file is rewritten atomically at most every `interval` seconds
+    while samples arrive, and on flush().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "email_agent",
+        interval: float = 15.0,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.interval = interval
+        self.buckets = tuple(sorted(buckets))
+
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+        self._last_write = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, kind, name, value, labels):
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            if kind == HISTOGRAM:
+                series = self._histograms.setdefault(name, {})
+                hist = series.get(key)
+                if hist is None:
+                    hist = series[key] = _Histogram(len(self.buckets))
+                index = bisect_left(self.buckets, value)
+                if index < len(self.buckets):
+                    hist.counts[index] += 1
+                hist.sum += value
+                hist.count += 1
+            else:
+                series = self._counters.setdefault(name, {})
+                series[key] = series.get(key, 0.0) + value
+
+            if time.monotonic() - self._last_write < self.interval:
+                return
+            text = self._render()
+
+        self._write(text)
+
+    def flush(self):
+        with self._lock:
+            text = self._render()
+        self._write(text)
+
+    def render(self) -> str:
+        with self._lock:
+            return self._render()
+
+    def _render(self) -> str:
+        self._last_write = time.monotonic()
+        lines = []
+
+        for name, series in sorted(self._counters.items()):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in series.items():
+                lines.append(f"{metric}{_labels(key)} {_number(value)}")
+
+        for name, series in sorted(self._histograms.items()):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for key, hist in series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_labels(key, le=_number(bound))} {cumulative}")
+                lines.append(f"{metric}_bucket{_labels(key, le='+Inf')} {hist.count}")
+                lines.append(f"{metric}_sum{_labels(key)} {_number(hist.sum)}")
+                lines.append(f"{metric}_count{_labels(key)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _write(self, text: str) -> None:
+        # Atomic replace so the collector never reads a partial file
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+
+def _labels(key: LabelKey, le: Optional[str] = None) -> str:
+    pairs = list(key) + ([("le", le)] if le is not None else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
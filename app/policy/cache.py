@@ -0,0 +1,238 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from .compiler import PolicyCompiler
+from .exceptions import StalePolicyError
+from .loader import PolicyLoader
+from .models import CompiledPolicy, PolicyRef
+
+POLICY_CACHE_MAX_VERSIONS = int(os.getenv("POLICY_CACHE_MAX_VERSIONS", "32"))
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    fingerprint: Tuple[Tuple[str, int, int], ...]
+    content_hash: str
+    policy: CompiledPolicy
+
+
+class PolicyCache:
+    """
+    Process-wide cache of compiled policies.
+
+    Entries are keyed by domain and the content hash of the domain's
+    policy files. Every lookup stats the files (mtime + size); the files
+    are only re-read when that fingerprint changes, and only re-compiled
+    when their content hash changes. Safe to share between threads.
+
+    Versions compiled by this process stay resolvable by PolicyRef, so
+    runs that started before a reload keep their original policy: the
+    `max_versions` most recently used ones, plus every version pinned by a
+    run paused for confirmation (pin()/unpin()). Objects derived from a
+    version (see derived()) live and die with it.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[PolicyLoader] = None,
+        compiler: Optional[PolicyCompiler] = None,
+        max_versions: int = POLICY_CACHE_MAX_VERSIONS,
+    ):
+        self.loader = loader or PolicyLoader()
+        self.compiler = compiler or PolicyCompiler()
+        self.max_versions = max_versions
+
+        self._entries: Dict[str, _CacheEntry] = {}
+        # LRU of compiled versions by (domain, content hash)
+        self._versions: "OrderedDict[Tuple[str, str], CompiledPolicy]" = OrderedDict()
+        # run thread_id -> version it is paused on; never evicted
+        self._pins: Dict[str, Tuple[str, str]] = {}
+        # version -> name -> object built from it by derived()
+        self._derived: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._domain_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, domain: str) -> CompiledPolicy:
+        fingerprint = self._fingerprint(domain)
+
+        entry = self._entries.get(domain)
+        if entry is not None and entry.fingerprint == fingerprint:
+            with self._lock:
+                self.hits += 1
+            return entry.policy
+
+        # Serialize (re)loads per domain so concurrent runs compile once
+        with self._domain_lock(domain):
+            entry = self._entries.get(domain)
+            if entry is not None and entry.fingerprint == fingerprint:
+                with self._lock:
+                    self.hits += 1
+                return entry.policy
+
+            raw_files = self.loader.read_domain_files(domain)
+            content_hash = self._content_hash(raw_files)
+
+            if entry is not None and entry.content_hash == content_hash:
+                # Touched but unchanged (e.g. checkout, editor save)
+                self._entries[domain] = replace(entry, fingerprint=fingerprint)
+                with self._lock:
+                    self.hits += 1
+                return entry.policy
+
+            policy = self.compiler.compile(self.loader.parse(raw_files))
+            policy = replace(policy, source_hash=content_hash)
+
+            self._entries[domain] = _CacheEntry(
+                fingerprint=fingerprint,
+                content_hash=content_hash,
+                policy=policy,
+            )
+            with self._lock:
+                self._versions[(domain, content_hash)] = policy
+                self._versions.move_to_end((domain, content_hash))
+                self._evict()
+                self.misses += 1
+                if entry is not None:
+                    self.reloads += 1
+
+            return policy
+
+    def resolve(self, ref: PolicyRef) -> CompiledPolicy:
+        """
+        Returns the exact policy version a PolicyRef was taken from.
+
+        After a restart (or once evicted) only the version currently on
+        disk can be rebuilt; a ref to any other version raises
+        StalePolicyError.
+        """
+        key = (ref.domain, ref.source_hash)
+        with self._lock:
+            policy = self._versions.get(key)
+            if policy is not None:
+                self._versions.move_to_end(key)
+        if policy is not None:
+            return policy
+
+        policy = self.get(ref.domain)
+        if policy.source_hash != ref.source_hash:
+            raise StalePolicyError(
+                f"Policy {ref.domain} {ref.version} ({ref.source_hash[:12]}) "
+                f"is no longer available; current is {policy.version} "
+                f"({policy.source_hash[:12]})"
+            )
+        return policy
+
+    def derived(self, policy: CompiledPolicy, name: str, build: Callable[[CompiledPolicy], T]) -> T:
+        """
+        Returns build(policy), built once per cached policy version.
+
+        Used for summaries, validators and classifiers compiled from a
+        policy, so they are evicted and invalidated with it. Policies this
+        cache didn't compile are built every time.
+        """
+        key = (policy.domain, policy.source_hash)
+        with self._lock:
+            value = self._derived.get(key, {}).get(name)
+        if value is not None:
+            return value
+
+        value = build(policy)
+        with self._lock:
+            if self._versions.get(key) is not policy:
+                entry = self._entries.get(policy.domain)
+                if entry is None or entry.policy is not policy:
+                    return value
+                # The current version, evicted by other domains' versions
+                self._versions[key] = policy
+                self._evict()
+            return self._derived.setdefault(key, {}).setdefault(name, value)
+
+    def pin(self, thread_id: str, ref: PolicyRef) -> None:
+        """Keeps `ref` resolvable until unpin(thread_id), e.g. while a run is paused."""
+        with self._lock:
+            self._pins[thread_id] = (ref.domain, ref.source_hash)
+
+    def unpin(self, thread_id: str) -> None:
+        with self._lock:
+            if self._pins.pop(thread_id, None) is not None:
+                self._evict()
+
+    def invalidate(self, domain: Optional[str] = None) -> None:
+        """Forces a reload from disk; pinned versions stay resolvable."""
+        with self._lock:
+            pinned = set(self._pins.values())
+            if domain is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(domain, None)
+            for key in [key for key in self._versions if key not in pinned]:
+                if domain is None or key[0] == domain:
+                    self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "entries": len(self._entries),
+                "versions": len(self._versions),
+                "pinned": len(set(self._pins.values())),
+                "derived": sum(len(objects) for objects in self._derived.values()),
+            }
+
+    def _evict(self) -> None:
+        # Called with the lock held; pinned versions don't count
+        pinned = set(self._pins.values())
+        unpinned = [key for key in self._versions if key not in pinned]
+        for key in unpinned[: max(0, len(unpinned) - self.max_versions)]:
+            self._drop(key)
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        del self._versions[key]
+        self._derived.pop(key, None)
+
+    def _domain_lock(self, domain: str) -> threading.Lock:
+        with self._lock:
+            return self._domain_locks.setdefault(domain, threading.Lock())
+
+    def _fingerprint(self, domain: str) -> Tuple[Tuple[str, int, int], ...]:
+        fingerprint = []
+        for key, path in self.loader.domain_files(domain).items():
+            stat = path.stat()
+            fingerprint.append((key, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    @staticmethod
+    def _content_hash(raw_files: Dict[str, bytes]) -> str:
+        digest = hashlib.sha256()
+        for key in sorted(raw_files):
+            digest.update(key.encode())
+            digest.update(b"\0")
+            digest.update(raw_files[key])
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+
+_default_cache: Optional[PolicyCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_policy_cache() -> PolicyCache:
+    """Returns the process-wide PolicyCache."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = PolicyCache()
+    return _default_cache
@@ -12,11 +12,15 @@ class PolicyCompiler:
         decisions = raw["decisions"]["decisions"]
         actions = self._bind_mcp_tools(raw["actions"]["actions"])
         risk_rules = raw["risk_rules"]
+        preclassifier = (raw.get("preclassifier") or {}).get("preclassifier", {})
+        scheduling = (raw.get("scheduling") or {}).get("scheduling", {})
 
 
         autonomy_level = autonomy.get("level", "manual_only") if autonomy else "manual_only"
         
         self._validate_references(categories, decisions, actions)
+        self._validate_preclassifier(preclassifier, categories, decisions)
+        self._validate_scheduling(scheduling)
 
         return CompiledPolicy(
             domain=policy["domain"],
@@ -32,7 +36,9 @@ class PolicyCompiler:
             risk_constraints=risk_rules["risk_constraints"],
 
             global_rules=policy["global_rules"],
-            default_fallback_decision=policy["default_fallback_decision"]
+            default_fallback_decision=policy["default_fallback_decision"],
+            preclassifier=preclassifier,
+            scheduling=scheduling,
         )
 
     def _validate_references(self, categories, decisions, actions):
@@ -52,6 +58,42 @@ class PolicyCompiler:
                         f"Decision '{decision}' references unknown action '{action}'"
                     )
 
+    def _validate_preclassifier(self, preclassifier, categories, decisions):
+        # Pre-classifier rules may only emit decisions the policy allows
+        for name, rule in preclassifier.get("rules", {}).items():
+            category = rule.get("category")
+            decision = rule.get("decision")
+
+            if category not in categories:
+                raise PolicyValidationError(
+                    f"Pre-classifier rule '{name}' references unknown category '{category}'"
+                )
+
+            if decision not in categories[category]["allowed_decisions"]:
+                raise PolicyValidationError(
+                    f"Pre-classifier rule '{name}' emits decision '{decision}' "
+                    f"not allowed for category '{category}'"
+                )
+
+            for action in rule.get("proposed_actions", []):
+                if action not in decisions[decision]["allowed_actions"]:
+                    raise PolicyValidationError(
+                        f"Pre-classifier rule '{name}' proposes action '{action}' "
+                        f"not allowed for decision '{decision}'"
+                    )
+
+    def _validate_scheduling(self, scheduling):
+        # Every class needs a positive weight, or WFQ could starve it
+        for name, cfg in scheduling.get("classes", {}).items():
+            if not float(cfg.get("weight", 1)) > 0:
+                raise PolicyValidationError(
+                    f"Scheduling class '{name}' must have a positive weight"
+                )
+            if float(cfg.get("max_wait_s", 1)) <= 0:
+                raise PolicyValidationError(
+                    f"Scheduling class '{name}' must have a positive max_wait_s"
+                )
+
     def _bind_mcp_tools(self, actions: dict) -> dict:
         compiled = {}
 
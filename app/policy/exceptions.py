@@ -1,2 +1,6 @@
 class PolicyValidationError(Exception):
     """Raised when policy files are inconsistent or invalid"""
+
+
+class StalePolicyError(Exception):
+    """Raised when a PolicyRef points at a policy version that is no longer available"""
@@ -4,27 +4,50 @@ from typing import Dict
 
 
 class PolicyLoader:
+    POLICY_FILES = {
+        "policy": "policy.yaml",
+        "categories": "categories.yaml",
+        "decisions": "decisions.yaml",
+        "actions": "actions.yaml",
+        "risk_rules": "risk_rules.yaml"
+    }
+
+    # Loaded only when present in the domain directory
+    OPTIONAL_POLICY_FILES = {
+        "preclassifier": "preclassifier.yaml",
+        "scheduling": "scheduling.yaml",
+    }
+
     def __init__(self, base_path: str = "policies"):
         self.base_path = Path(base_path)
 
-    def load_domain_policy(self, domain: str) -> Dict[str, dict]:
+    def domain_files(self, domain: str) -> Dict[str, Path]:
         domain_path = self.base_path / domain
 
         if not domain_path.exists():
             raise FileNotFoundError(f"Policy domain not found: {domain}")
 
         files = {
-            "policy": "policy.yaml",
-            "categories": "categories.yaml",
-            "decisions": "decisions.yaml",
-            "actions": "actions.yaml",
-            "risk_rules": "risk_rules.yaml"
+            key: domain_path / filename
+            for key, filename in self.POLICY_FILES.items()
+        }
+        for key, filename in self.OPTIONAL_POLICY_FILES.items():
+            if (domain_path / filename).exists():
+                files[key] = domain_path / filename
+
+        return files
+
+    def read_domain_files(self, domain: str) -> Dict[str, bytes]:
+        return {
+            key: path.read_bytes()
+            for key, path in self.domain_files(domain).items()
         }
 
-        loaded = {}
-        for key, filename in files.items():
-            path = domain_path / filename
-            with open(path, "r", encoding="utf-8") as f:
-                loaded[key] = yaml.safe_load(f)
+    def parse(self, raw_files: Dict[str, bytes]) -> Dict[str, dict]:
+        return {
+            key: yaml.safe_load(data.decode("utf-8"))
+            for key, data in raw_files.items()
+        }
 
-        return loaded
+    def load_domain_policy(self, domain: str) -> Dict[str, dict]:
+        return self.parse(self.read_domain_files(domain))
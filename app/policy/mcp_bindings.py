@@ -24,3 +24,12 @@ MCP_ACTION_BINDINGS = {
         }
     }
 }
+
+
+def server_tool_name(tool: str) -> str:
+    """
+    The MCP server tool a binding's "service.method" calls. Servers register
+    it as service_method and take its arguments as one `args` model (see
+    mcp_servers/gmail_mcp_server/server.py).
+    """
+    return tool.replace(".", "_", 1)
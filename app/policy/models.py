@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Any
 
 
@@ -24,3 +24,27 @@ class CompiledPolicy:
 
     global_rules: Dict[str, Any]
     default_fallback_decision: str
+
+    # Optional deterministic pre-classification rules (preclassifier.yaml)
+    preclassifier: Dict[str, Any] = field(default_factory=dict)
+
+    # Optional batch priority classes and pre-score signals (scheduling.yaml)
+    scheduling: Dict[str, Any] = field(default_factory=dict)
+
+    # sha256 of the source YAML files (set by PolicyCache)
+    source_hash: str = ""
+
+    @property
+    def ref(self) -> "PolicyRef":
+        return PolicyRef(self.domain, self.version, self.source_hash)
+
+
+@dataclass(frozen=True)
+class PolicyRef:
+    """
+    Small, checkpoint-friendly handle to a compiled policy version.
+    Resolved back to the CompiledPolicy through PolicyCache.resolve().
+    """
+    domain: str
+    version: str
+    source_hash: str
@@ -1,7 +1,28 @@
+import json
+from dataclasses import dataclass
 from typing import Dict, Any
+from app.policy.cache import get_policy_cache
 from app.policy.models import CompiledPolicy
 
 
+@dataclass(frozen=True)
+class PolicySummary:
+    """
+    Immutable, pre-serialized PolicySummarizer output for one policy version.
+    """
+    domain: str
+    version: str
+    source_hash: str
+
+    # json.dumps() of the summary dict, spliced into prompts as-is
+    serialized: str
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        # Fresh copy on every access; the shared summary never mutates
+        return json.loads(self.serialized)
+
+
 class PolicySummarizer:
     """
     Deterministically projects CompiledPolicy into
@@ -53,3 +74,22 @@ class PolicySummarizer:
             decision: cfg.get("requires_confirmation", False)
             for decision, cfg in policy.decisions.items()
         }
+
+
+def get_policy_summary(policy: CompiledPolicy) -> PolicySummary:
+    """
+    Returns the memoized PolicySummary for a policy version.
+
+    Kept on the PolicyCache version, so an edited policy that keeps its
+    version string still gets a fresh summary.
+    """
+    return get_policy_cache().derived(policy, "summary", _summarize)
+
+
+def _summarize(policy: CompiledPolicy) -> PolicySummary:
+    return PolicySummary(
+        domain=policy.domain,
+        version=policy.version,
+        source_hash=policy.source_hash,
+        serialized=json.dumps(PolicySummarizer().summarize(policy)),
+    )
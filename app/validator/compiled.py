@@ -0,0 +1,206 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+from app.policy.cache import get_policy_cache
+from app.policy.models import CompiledPolicy
+from app.validator.exceptions import DecisionValidationError
+from app.validator.result import ValidationResult
+
+REQUIRED_FIELDS: Tuple[str, ...] = (
+    "schema_version",
+    "domain",
+    "intent",
+    "category",
+    "urgency",
+    "risk_level",
+    "decision",
+    "proposed_actions",
+    "needs_confirmation",
+    "confidence",
+    "reasoning_summary",
+)
+
+HARD_FAILURES: FrozenSet[str] = frozenset({
+    "DOMAIN_MISMATCH",
+    "UNKNOWN_CATEGORY",
+    "DECISION_NOT_ALLOWED_FOR_CATEGORY",
+    "ACTION_NOT_ALLOWED_FOR_DECISION",
+})
+
+
+class CompiledValidator:
+    """
+    DecisionValidator rules pre-compiled for one CompiledPolicy.
+
+    Lookup tables are built once:
+    - category -> frozenset of allowed decisions
+    - decision -> frozenset of allowed actions
+    - risk -> bitmask of allowed urgencies
+    - frozenset of decisions requiring confirmation
+
+    Results are identical to the rule-by-rule checks in rules.py.
+    """
+
+    def __init__(self, policy: CompiledPolicy):
+        self.domain = policy.domain
+        self.default_fallback_decision = policy.default_fallback_decision
+
+        self.category_decisions: Dict[str, FrozenSet[str]] = {
+            category: frozenset(cfg.get("allowed_decisions", []))
+            for category, cfg in policy.categories.items()
+        }
+        self.decision_actions: Dict[str, FrozenSet[str]] = {
+            decision: frozenset(cfg.get("allowed_actions", []))
+            for decision, cfg in policy.decisions.items()
+        }
+        self.confirmation_decisions: FrozenSet[str] = frozenset(
+            decision for decision, cfg in policy.decisions.items()
+            if cfg.get("requires_confirmation", False)
+        )
+        self.external_confirmation = bool(
+            policy.global_rules.get("external_communication_requires_confirmation")
+        )
+
+        urgencies = list(policy.urgency_levels)
+        for cfg in policy.risk_urgency_matrix.values():
+            urgencies.extend(u for u in cfg.get("allowed_urgency", []) if u not in urgencies)
+        self.urgency_bits: Dict[str, int] = {u: 1 << i for i, u in enumerate(urgencies)}
+
+        self.risk_urgency_mask: Dict[str, int] = {}
+        for risk, cfg in policy.risk_urgency_matrix.items():
+            mask = 0
+            for urgency in cfg.get("allowed_urgency", []):
+                mask |= self.urgency_bits[urgency]
+            self.risk_urgency_mask[risk] = mask
+
+    def validate(self, decision_output: Any) -> ValidationResult:
+        decision_output = _as_dict(decision_output)
+        violations = self.violations(decision_output)
+
+        if not violations:
+            return ValidationResult(
+                status="approved",
+                final_decision=dict(decision_output),
+                violations=[],
+            )
+
+        if not HARD_FAILURES.isdisjoint(violations):
+            return ValidationResult(
+                status="rejected",
+                final_decision=self.fallback(),
+                violations=violations,
+                notes="Validator rejected unsafe or invalid decision",
+            )
+
+        return ValidationResult(
+            status="downgraded",
+            final_decision=self.downgrade(decision_output),
+            violations=violations,
+            notes="Decision downgraded due to policy safety rules",
+        )
+
+    def validate_many(self, decisions: Iterable[Any]) -> List[ValidationResult]:
+        """
+        Validates a batch (e.g. a historical decision log). Structurally
+        invalid entries (missing fields, wrongly typed values) are rejected
+        with SCHEMA_INVALID instead of raising.
+        """
+        results = []
+        for decision_output in decisions:
+            try:
+                results.append(self.validate(decision_output))
+            except (DecisionValidationError, KeyError, TypeError, AttributeError) as e:
+                results.append(ValidationResult(
+                    status="rejected",
+                    final_decision=self.fallback(),
+                    violations=["SCHEMA_INVALID"],
+                    notes=str(e),
+                ))
+        return results
+
+    def violations(self, decision_output: Dict[str, Any]) -> List[str]:
+        # Layer 1: schema integrity (raises)
+        for field in REQUIRED_FIELDS:
+            if field not in decision_output:
+                raise DecisionValidationError(f"Missing required field: {field}")
+
+        if decision_output["schema_version"] != "v1":
+            raise DecisionValidationError("Unsupported schema version")
+
+        violations: List[str] = []
+
+        # Layer 2: domain & category
+        if decision_output["domain"] != self.domain:
+            violations.append("DOMAIN_MISMATCH")
+
+        category = decision_output["category"]
+        decision = decision_output["decision"]
+
+        allowed_decisions = self.category_decisions.get(category)
+        if allowed_decisions is None:
+            violations.append("UNKNOWN_CATEGORY")
+        elif decision not in allowed_decisions:
+            violations.append("DECISION_NOT_ALLOWED_FOR_CATEGORY")
+
+        # Layer 3: risk & urgency coherence
+        mask = self.risk_urgency_mask.get(decision_output["risk_level"], 0)
+        if not mask & self.urgency_bits.get(decision_output["urgency"], 0):
+            violations.append("RISK_URGENCY_MISMATCH")
+
+        # Layer 4: action safety
+        allowed_actions = self.decision_actions.get(decision, frozenset())
+        if not all(a["action_type"] in allowed_actions for a in decision_output["proposed_actions"]):
+            violations.append("ACTION_NOT_ALLOWED_FOR_DECISION")
+
+        if (
+            self.external_confirmation
+            and decision in self.confirmation_decisions
+            and not decision_output["needs_confirmation"]
+        ):
+            violations.append("CONFIRMATION_REQUIRED")
+
+        # Layer 5: reasoning quality
+        if len(decision_output["reasoning_summary"].strip()) < 20:
+            violations.append("WEAK_REASONING")
+
+        return violations
+
+    def fallback(self) -> Dict[str, Any]:
+        return {
+            "schema_version": "v1",
+            "domain": self.domain,
+            "intent": "Manual review required",
+            "category": "internal",
+            "urgency": "can_wait",
+            "risk_level": "low",
+            "decision": self.default_fallback_decision,
+            "proposed_actions": [],
+            "needs_confirmation": False,
+            "confidence": 0.0,
+            "reasoning_summary": "Validator blocked the original decision due to policy violations.",
+            "action": None  # No action for fallback
+        }
+
+    @staticmethod
+    def downgrade(decision_output: Dict[str, Any]) -> Dict[str, Any]:
+        downgraded = dict(decision_output)
+        downgraded["decision"] = "draft_reply"
+        downgraded["needs_confirmation"] = True
+        downgraded["confidence"] = min(decision_output["confidence"], 0.5)
+        downgraded["reasoning_summary"] += " (Decision downgraded by validator.)"
+        return downgraded
+
+
+def _as_dict(decision_output: Any) -> Dict[str, Any]:
+    if isinstance(decision_output, dict):
+        return decision_output
+    # Pydantic v2, then v1
+    if hasattr(decision_output, "model_dump"):
+        return decision_output.model_dump()
+    if hasattr(decision_output, "dict"):
+        return decision_output.dict()
+    return decision_output
+
+
+def get_compiled_validator(policy: CompiledPolicy) -> CompiledValidator:
+    """Returns the CompiledValidator for a policy version, compiling it once."""
+    return get_policy_cache().derived(policy, "validator", CompiledValidator)
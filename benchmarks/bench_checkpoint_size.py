@@ -0,0 +1,153 @@
+"""
+Checkpoint footprint benchmark.
+
+Runs the graph up to the confirmation interrupt for a batch of emails
+(fake LLM clients, no credentials needed), checkpointing every superstep
+into an in-memory SqliteCheckpointSaver with full history, and reports
+per email:
+
+- bytes written to checkpoints, channel blobs and pending writes
+- the largest channels by stored bytes
+- time spent serializing checkpoint data
+
+Usage:
+    python -m benchmarks.bench_checkpoint_size -n 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(".")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.agents.schemas import UniversalDecisionSchemaV1
+
+EMAIL = {
+    "from": "partner@vcfirm.com",
+    "to": "founder@startup.com",
+    "subject": "Following up on our last discussion",
+    "body": "Let me know if you've had a chance to think about next steps.",
+    "thread_id": "thread-101",
+    "attachments": [],
+}
+
+DECISION = {
+    "domain": "founder_inbox",
+    "intent": "Investor follow-up",
+    "category": "investor",
+    "urgency": "same_day",
+    "risk_level": "high",
+    "action": "compose_email",
+    "decision": "draft_reply",
+    "proposed_actions": [
+        {"action_type": "compose_email", "description": "Draft a reply", "target": "email"}
+    ],
+    "needs_confirmation": True,
+    "confidence": 0.9,
+    "reasoning_summary": "Investor follow-up warrants a drafted reply.",
+}
+
+
+class _FakeStructured:
+    def invoke(self, input, *args, **kwargs):
+        return {
+            "raw": AIMessage(content=""),
+            "parsed": UniversalDecisionSchemaV1(**DECISION),
+            "parsing_error": None,
+        }
+
+
+class _FakeChatModel:
+    model_name = "bench-fake"
+
+    def invoke(self, input, *args, **kwargs):
+        return AIMessage(content=json.dumps(DECISION))
+
+    def stream(self, input, *args, **kwargs):
+        yield AIMessage(content="Thanks for following up, happy to talk next week.")
+
+    def with_structured_output(self, *args, **kwargs):
+        return _FakeStructured()
+
+
+class _TimedSerializer(JsonPlusSerializer):
+    def __init__(self):
+        super().__init__()
+        self.dumps_s = 0.0
+
+    def dumps_typed(self, obj):
+        started = time.perf_counter()
+        try:
+            return super().dumps_typed(obj)
+        finally:
+            self.dumps_s += time.perf_counter() - started
+
+
+def _footprint(saver) -> dict:
+    db = saver._db
+    channels = defaultdict(int)
+    for channel, size in db.execute(
+        "SELECT channel, SUM(LENGTH(blob)) FROM blobs GROUP BY channel"
+    ):
+        channels[channel] = size or 0
+
+    return {
+        "checkpoints": db.execute("SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints").fetchone()[0] or 0,
+        "blobs": sum(channels.values()),
+        "writes": db.execute("SELECT SUM(LENGTH(blob)) FROM writes").fetchone()[0] or 0,
+        "channels": dict(channels),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--emails", type=int, default=50)
+    parser.add_argument("--top", type=int, default=6, help="Largest channels to list")
+    args = parser.parse_args(argv)
+
+    from app.api.ai_service_tool import REASONING, STRUCTURED, get_llm_registry
+    from app.graph.checkpoint import SqliteCheckpointSaver
+    from app.graph.dag import build_graph
+
+    registry = get_llm_registry()
+    registry.register(REASONING, _FakeChatModel())
+    registry.register(STRUCTURED, _FakeChatModel())
+
+    serde = _TimedSerializer()
+    saver = SqliteCheckpointSaver(":memory:", keep_history=True, serde=serde)
+    graph = build_graph(checkpointer=saver)
+
+    started = time.perf_counter()
+    for i in range(args.emails):
+        graph.invoke(
+            {"email": EMAIL, "domain": "founder_inbox"},
+            config={"configurable": {"thread_id": f"bench-{i}"}},
+        )
+    elapsed = time.perf_counter() - started
+
+    n = args.emails
+    footprint = _footprint(saver)
+    total = footprint["checkpoints"] + footprint["blobs"] + footprint["writes"]
+    steps = saver.stats()["checkpoints"] / n
+
+    print(f"emails={n}  supersteps/email={steps:.1f}  run={elapsed / n * 1000:.2f}ms/email")
+    print(
+        f"bytes/email: total={total / n:,.0f}  checkpoints={footprint['checkpoints'] / n:,.0f}  "
+        f"blobs={footprint['blobs'] / n:,.0f}  writes={footprint['writes'] / n:,.0f}"
+    )
+    print(f"serialization: {serde.dumps_s / n * 1000:.3f}ms/email")
+
+    print("largest channels (bytes/email):")
+    for channel, size in sorted(footprint["channels"].items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {channel:>20}: {size / n:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
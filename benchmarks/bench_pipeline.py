@@ -0,0 +1,392 @@
+"""
+End-to-end pipeline benchmark, fully offline.
+
+Runs a synthetic corpus (benchmarks/corpus.py) through the real graph
+with ScriptedChatModel standing in for Groq and fake_gmail_server.py for
+Gmail (benchmarks/fakes.py). Paused runs are approved and resumed, so
+compose and MCP execution are exercised too.
+
+Reports per-node p50/p95/p99 latency, end-to-end email latency,
+emails/s and peak RSS for:
+- single: one email at a time
+- batch:  BatchRunner + BulkResumer with bounded concurrency
+
+Results can be stored as a baseline and later checked against it.
+
+Usage:
+    python -m benchmarks.bench_pipeline -n 200 --latency-ms 40 --jitter-ms 15
+    python -m benchmarks.bench_pipeline --mode batch -c 32 --async
+    python -m benchmarks.bench_pipeline --save-baseline
+    python -m benchmarks.bench_pipeline --check --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import functools
+import io
+import json
+import os
+import resource
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+sys.path.append(".")
+
+from benchmarks.corpus import generate
+from benchmarks.fakes import install_fakes
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_pipeline.json")
+
+# nodes.py function -> graph node name
+NODE_FUNCTIONS = {
+    "ingest_email": "ingest",
+    "enrich_context": "enrich",
+    "load_policy": "load_policy",
+    "summarize_policy": "summarize_policy",
+    "preclassify_node": "preclassify",
+    "reasoning_node": "reason",
+    "areasoning_node": "reason",
+    "structure_node": "structure",
+    "astructure_node": "structure",
+    "fused_decision_node": "fused_decide",
+    "afused_decision_node": "fused_decide",
+    "validate_decision": "validate",
+    "confirmation_gate": "confirm_gate",
+    "compose_reply_content": "compose",
+    "acompose_reply_content": "compose",
+    "confirm_interrupt": "confirm_interrupt",
+    "execute_action": "execute",
+    "aexecute_action": "execute",
+    "safe_fallback": "fallback",
+}
+
+APPROVAL = {"context": {"human_approval": {"approval": "approved", "comment": "bench"}}}
+
+
+def _timed(label: str, fn, timings: Dict[str, List[float]]):
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                timings[label].append((time.perf_counter() - started) * 1000)
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[label].append((time.perf_counter() - started) * 1000)
+    return wrapper
+
+
+def _counted(fn, executions: Counter):
+    # Tallies execution_result statuses, so a broken tool binding shows up
+    # as errors instead of as a fast execute node
+    def count(update):
+        result = ((update or {}).get("final_decision") or {}).get("execution_result") or {}
+        executions[result.get("status", "none")] += 1
+        return update
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return count(await fn(*args, **kwargs))
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return count(fn(*args, **kwargs))
+    return wrapper
+
+
+def _instrument(timings: Dict[str, List[float]], executions: Counter):
+    # Must run before build_graph(), which binds the node functions
+    from app.graph import nodes
+
+    for name, label in NODE_FUNCTIONS.items():
+        fn = _timed(label, getattr(nodes, name), timings)
+        if label == "execute":
+            fn = _counted(fn, executions)
+        setattr(nodes, name, fn)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ─────────────────────────────
+# Scenarios
+# ─────────────────────────────
+def run_single(graph, emails: List[Dict[str, Any]], use_async: bool) -> List[float]:
+    from langgraph.types import Command
+
+    async def arun_one(config, email):
+        state = await graph.ainvoke({"email": email, "domain": "founder_inbox"}, config)
+        if state.get("__interrupt__"):
+            await graph.ainvoke(Command(resume=APPROVAL), config)
+
+    latencies = []
+    for i, email in enumerate(emails):
+        config = {"configurable": {"thread_id": f"single-{i}"}}
+        started = time.perf_counter()
+        if use_async:
+            asyncio.run(arun_one(config, email))
+        else:
+            state = graph.invoke({"email": email, "domain": "founder_inbox"}, config)
+            if state.get("__interrupt__"):
+                graph.invoke(Command(resume=APPROVAL), config)
+        latencies.append((time.perf_counter() - started) * 1000)
+        graph.checkpointer.delete_thread(config["configurable"]["thread_id"])
+    return latencies
+
+
+def run_batch(graph, emails: List[Dict[str, Any]], concurrency: int, use_async: bool) -> List[float]:
+    from app.execution.batch import BatchRunner
+    from app.execution.resume import BulkResumer
+
+    source = io.StringIO("".join(json.dumps(e) + "\n" for e in emails))
+    sink = io.StringIO()
+
+    runner = BatchRunner(graph=graph, concurrency=concurrency)
+    if use_async:
+        asyncio.run(runner.arun(source, sink))
+    else:
+        runner.run(source, sink)
+
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    pending = [r["thread_id"] for r in records if r["status"] == "awaiting_confirmation"]
+
+    resumer = BulkResumer(graph=graph, concurrency=concurrency)
+    if use_async:
+        resumed = asyncio.run(resumer.aresume(pending, "approved", "bench"))
+    else:
+        resumed = resumer.resume(pending, "approved", "bench")
+
+    # Per-email latency = first pass + resume (when paused)
+    resume_s = {r["thread_id"]: r.get("elapsed_s", 0.0) for r in resumed}
+    return [
+        (r.get("elapsed_s", 0.0) + resume_s.get(r["thread_id"], 0.0)) * 1000
+        for r in records
+    ]
+
+
+def run_scenario(name, args, emails) -> Dict[str, Any]:
+    from app.graph.dag import build_graph
+    from langgraph.checkpoint.memory import MemorySaver
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    executions: Counter = Counter()
+    _instrument(timings, executions)
+    graph = build_graph(use_async=args.use_async, checkpointer=MemorySaver())
+
+    started = time.perf_counter()
+    if name == "single":
+        latencies = run_single(graph, emails, args.use_async)
+    else:
+        latencies = run_batch(graph, emails, args.concurrency, args.use_async)
+    elapsed = time.perf_counter() - started
+
+    _restore()
+    return {
+        "emails": len(emails),
+        "emails_per_s": round(len(emails) / elapsed, 2),
+        "email_ms": percentiles(latencies),
+        "nodes": {label: percentiles(samples) for label, samples in sorted(timings.items())},
+        "executions": dict(sorted(executions.items())),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _restore():
+    from app.graph import nodes
+
+    for name in NODE_FUNCTIONS:
+        fn = getattr(nodes, name)
+        while hasattr(fn, "__wrapped__"):
+            fn = fn.__wrapped__
+        setattr(nodes, name, fn)
+
+
+def unserved_bindings() -> List[str]:
+    """
+    Action bindings (app/policy/mcp_bindings.py) whose tool the service's
+    MCP server doesn't expose; executing them would fail.
+    """
+    from app.mcp import MCP_SERVERS, MCPClient, get_server_path
+    from app.policy.mcp_bindings import MCP_ACTION_BINDINGS, server_tool_name
+
+    async def served_tools(path):
+        client = MCPClient()
+        try:
+            await client.connect(path)
+            return {tool.name for tool in await client.list_tools()}
+        finally:
+            await client.disconnect()
+
+    served: Dict[str, set] = {}
+    unserved = []
+    for action, binding in sorted(MCP_ACTION_BINDINGS.items()):
+        service = binding["tool"].split(".", 1)[0]
+        if service not in MCP_SERVERS:
+            unserved.append(f"{action}: no MCP server for '{service}'")
+            continue
+        if service not in served:
+            served[service] = asyncio.run(served_tools(get_server_path(service)))
+        tool = server_tool_name(binding["tool"])
+        if tool not in served[service]:
+            unserved.append(f"{action}: {binding['tool']} ({tool}) not served by '{service}'")
+    return unserved
+
+
+# ─────────────────────────────
+# Reporting / baselines
+# ─────────────────────────────
+def print_report(name: str, result: Dict[str, Any]):
+    e = result["email_ms"]
+    print(
+        f"[{name}] {result['emails']} emails  {result['emails_per_s']:.2f} emails/s  "
+        f"email p50={e['p50']:.1f}ms p95={e['p95']:.1f}ms p99={e['p99']:.1f}ms  "
+        f"peak_rss={result['peak_rss_mb']}MB"
+    )
+    if result["executions"]:
+        print("  executions: " + "  ".join(f"{k}={v}" for k, v in result["executions"].items()))
+    print(f"  {'node':>18} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for label, p in result["nodes"].items():
+        print(f"  {label:>18} {p['count']:>6} {p['p50']:>8.2f}ms {p['p95']:>8.2f}ms {p['p99']:>8.2f}ms")
+
+
+def check_regressions(document, baseline, tolerance: float, min_ms: float = 5.0) -> List[str]:
+    """
+    Compares a run's document with a stored baseline. Throughput may not drop,
+    and p95 latency / peak RSS may not grow, by more than `tolerance`.
+    Latency differences under `min_ms` are ignored as noise. Failed MCP
+    executions, and bindings unserved since the baseline, are always
+    reported.
+    """
+    problems = [
+        f"unserved binding {binding}"
+        for binding in document.get("unserved_bindings", [])
+        if binding not in baseline.get("unserved_bindings", [])
+    ]
+    for name, result in document["results"].items():
+        # A failing MCP call is fast; its latency says nothing
+        errors = result.get("executions", {}).get("error", 0)
+        if errors:
+            problems.append(f"{name}: {errors} MCP executions failed")
+
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+
+        if result["emails_per_s"] < base["emails_per_s"] * (1 - tolerance):
+            problems.append(
+                f"{name}: throughput {result['emails_per_s']} < baseline {base['emails_per_s']}"
+            )
+
+        # Under concurrency node latency is mostly queueing, so batch runs
+        # are judged end to end and nodes only in the single run
+        latencies = {"email": (result["email_ms"], base["email_ms"])}
+        if name == "single":
+            for label, p in result["nodes"].items():
+                if label in base["nodes"]:
+                    latencies[label] = (p, base["nodes"][label])
+
+        for label, (p, base_p) in latencies.items():
+            if p["p95"] > base_p["p95"] * (1 + tolerance) and p["p95"] - base_p["p95"] > min_ms:
+                problems.append(f"{name}: {label} p95 {p['p95']}ms > baseline {base_p['p95']}ms")
+
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{name}: peak RSS {result['peak_rss_mb']}MB > baseline {base['peak_rss_mb']}MB")
+
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--emails", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake LLM latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--gmail-latency-ms", type=float, default=5.0)
+    parser.add_argument("--mode", choices=["single", "batch", "both"], default="both")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the median is reported")
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on regression vs. baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Ignore p95 growth below this")
+    parser.add_argument("--json", dest="json_out", help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    install_fakes(args.latency_ms, args.jitter_ms, args.seed, args.gmail_latency_ms)
+    emails = list(generate(args.emails, args.seed))
+
+    unserved = unserved_bindings()
+    for binding in unserved:
+        print(f"warning: unserved binding {binding}", file=sys.stderr)
+
+    modes = ["single", "batch"] if args.mode == "both" else [args.mode]
+    results = {}
+    for name in modes:
+        # Warm imports, caches and the pooled MCP servers this mode needs
+        run_scenario(name, args, emails[: max(10, 2 * args.concurrency)])
+        # Keep the median run by throughput to damp scheduler noise
+        runs = sorted(
+            (run_scenario(name, args, emails) for _ in range(args.repeat)),
+            key=lambda r: r["emails_per_s"],
+        )
+        results[name] = runs[len(runs) // 2]
+        print_report(name, results[name])
+
+    params = {k: getattr(args, k) for k in (
+        "emails", "seed", "latency_ms", "jitter_ms", "gmail_latency_ms", "concurrency", "use_async", "repeat",
+    )}
+    document = {"params": params, "unserved_bindings": unserved, "results": results}
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print(f"warning: baseline params differ: {baseline.get('params')}", file=sys.stderr)
+
+        problems = check_regressions(document, baseline, args.tolerance, args.min_ms)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Local fake of mcp_servers/gmail_mcp_server/server.py for benchmarks.
+
+Exposes exactly the same tools with the same argument models, answers
+without touching Gmail, and sleeps FAKE_GMAIL_LATENCY_MS per call
+(default 0).
+"""
+
+import os
+import time
+import uuid
+
+from fastmcp import FastMCP
+from pydantic import BaseModel
+
+LATENCY_S = float(os.getenv("FAKE_GMAIL_LATENCY_MS", "0")) / 1000
+
+mcp = FastMCP("fake-gmail-mcp-server")
+
+
+class SendEmailArgs(BaseModel):
+    to: str
+    subject: str
+    body: str
+
+class ReplyThreadArgs(BaseModel):
+    thread_id: str
+    body: str
+
+class ArchiveThreadArgs(BaseModel):
+    thread_id: str
+
+class MarkReadArgs(BaseModel):
+    thread_id: str
+
+
+def _simulate():
+    if LATENCY_S:
+        time.sleep(LATENCY_S)
+    return uuid.uuid4().hex[:16]
+
+
+@mcp.tool()
+def gmail_send_email(args: SendEmailArgs):
+    """
+    Send an email via Gmail.
+    """
+    return {"status": "sent", "message_id": _simulate()}
+
+@mcp.tool()
+def gmail_reply_thread(args: ReplyThreadArgs):
+    """
+    Reply to a thread via Gmail.
+    """
+    return {"status": "replied", "message_id": _simulate()}
+
+@mcp.tool()
+def gmail_archive_thread(args: ArchiveThreadArgs):
+    """
+    Archive a thread via Gmail.
+    """
+    _simulate()
+    return {"status": "archived", "thread_id": args.thread_id}
+
+@mcp.tool()
+def gmail_mark_read(args: MarkReadArgs):
+    """
+    Mark a thread as read via Gmail.
+    """
+    _simulate()
+    return {"status": "marked as read", "thread_id": args.thread_id}
+
+
+if __name__ == "__main__":
+    mcp.run(show_banner=False)
@@ -0,0 +1,241 @@
+"""
+Offline stand-ins for Groq and Gmail, used by the benchmarks.
+
+ScriptedChatModel replaces ChatGroq for ReasoningAgent, SchemaAgent,
+FusedDecisionAgent and compose: it picks a scripted decision from
+keywords in the email and sleeps for a configurable latency (+/- jitter).
+install_fakes() registers it in the LLM client registry and points the
+gmail MCP service at fake_gmail_server.py.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.agents.schemas import UniversalDecisionSchemaV1
+
+FAKE_GMAIL_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_gmail_server.py")
+
+
+def _decision(category, decision, urgency, risk_level, action, needs_confirmation, summary):
+    return {
+        "domain": "founder_inbox",
+        "intent": f"{category} mail",
+        "category": category,
+        "urgency": urgency,
+        "risk_level": risk_level,
+        "action": action or "",
+        "decision": decision,
+        "proposed_actions": (
+            [{"action_type": action, "description": summary, "target": "email"}]
+            if action else []
+        ),
+        "needs_confirmation": needs_confirmation,
+        "confidence": 0.9,
+        "reasoning_summary": summary,
+    }
+
+
+# First matching pattern wins; matched against the email subject + body
+SCRIPT: List[Tuple[re.Pattern, Dict[str, Any]]] = [
+    (re.compile(r"term sheet|fundrais|investor update|valuation", re.I), _decision(
+        "investor", "draft_reply", "same_day", "high", "compose_email", True,
+        "Investor follow-up about the round warrants a drafted reply.",
+    )),
+    (re.compile(r"subpoena|cease and desist|contract|nda\b", re.I), _decision(
+        "legal", "flag_for_review", "same_day", "high", "add_label", False,
+        "Legal matter that must be reviewed by the founder directly.",
+    )),
+    (re.compile(r"refund|outage|cannot log in|billing", re.I), _decision(
+        "customer", "ask_clarification", "same_day", "medium", "compose_email", True,
+        "Customer issue needs more detail before it can be resolved.",
+    )),
+    (re.compile(r"standup|offsite|all-hands|retro", re.I), _decision(
+        "internal", "ignore", "can_wait", "low", None, False,
+        "Routine internal update that needs no action from the founder.",
+    )),
+]
+
+DEFAULT_DECISION = _decision(
+    "follow_up", "ignore", "can_wait", "low", None, False,
+    "Low-priority follow-up with nothing to act on right now.",
+)
+
+DRAFT = (
+    "Hi,\n\nThanks for reaching out. I've read through your note and will "
+    "get back to you with details shortly.\n\nBest,\nFounder"
+)
+
+
+class _ScriptedStructured:
+    def __init__(self, model: "ScriptedChatModel"):
+        self.model = model
+
+    def invoke(self, input, *args, **kwargs):
+        self.model._sleep()
+        return self._result(input)
+
+    async def ainvoke(self, input, *args, **kwargs):
+        await self.model._asleep()
+        return self._result(input)
+
+    def _result(self, input):
+        raw = self.model._reply(input)
+        return {
+            "raw": raw,
+            "parsed": UniversalDecisionSchemaV1(**json.loads(raw.content)),
+            "parsing_error": None,
+        }
+
+
+class ScriptedChatModel:
+    """
+    Deterministic chat model with simulated latency.
+
+    Latency per call is latency_ms +/- uniform jitter_ms, drawn from a
+    seeded RNG; streamed replies spread it over `stream_chunks` chunks.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "scripted-fake",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 0,
+        stream_chunks: int = 8,
+    ):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunks = stream_chunks
+
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.calls = 0
+
+    # ─────────────────────────────
+    # Chat model surface used by the agents
+    # ─────────────────────────────
+    def invoke(self, input, *args, **kwargs) -> AIMessage:
+        self._sleep()
+        return self._reply(input)
+
+    async def ainvoke(self, input, *args, **kwargs) -> AIMessage:
+        await self._asleep()
+        return self._reply(input)
+
+    def stream(self, input, *args, **kwargs) -> Iterator[AIMessageChunk]:
+        delay = self._delay() / self.stream_chunks
+        for chunk in self._chunks(self._reply(input).content):
+            time.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+
+    async def astream(self, input, *args, **kwargs):
+        delay = self._delay() / self.stream_chunks
+        for chunk in self._chunks(self._reply(input).content):
+            await asyncio.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+
+    def with_structured_output(self, *args, **kwargs) -> _ScriptedStructured:
+        return _ScriptedStructured(self)
+
+    # ─────────────────────────────
+    # Script
+    # ─────────────────────────────
+    def decide(self, input) -> Dict[str, Any]:
+        text = _email_text(input)
+        for pattern, decision in SCRIPT:
+            if pattern.search(text):
+                return decision
+        return DEFAULT_DECISION
+
+    def _reply(self, input) -> AIMessage:
+        self.calls += 1
+        prompt = _flatten(input)
+        # Compose prompts are plain strings; agent prompts carry a JSON payload
+        content = DRAFT if prompt.startswith("Compose a reply") else json.dumps(self.decide(input))
+        tokens_in, tokens_out = len(prompt) // 4, len(content) // 4
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": tokens_in,
+                "output_tokens": tokens_out,
+                "total_tokens": tokens_in + tokens_out,
+            },
+        )
+
+    def _chunks(self, content: str) -> List[str]:
+        size = max(1, -(-len(content) // self.stream_chunks))
+        return [content[i:i + size] for i in range(0, len(content), size)]
+
+    def _delay(self) -> float:
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _sleep(self):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+    async def _asleep(self):
+        await asyncio.sleep(self._delay())
+
+
+def _flatten(input) -> str:
+    if isinstance(input, str):
+        return input
+    if isinstance(input, dict):
+        return str(input.get("content", ""))
+    if isinstance(input, (list, tuple)):
+        return "\n".join(_flatten(item) for item in input)
+    return str(getattr(input, "content", input))
+
+
+def _email_text(input) -> str:
+    # Only the email itself, never the system prompt or policy summary
+    prompt = _flatten(input)
+    texts = []
+    for part in prompt.split("\n"):
+        try:
+            payload = json.loads(part)
+        except ValueError:
+            continue
+        email = payload.get("email") if isinstance(payload, dict) else None
+        if isinstance(email, dict):
+            texts.append(f"{email.get('subject', '')}\n{email.get('body', '')}")
+    return "\n".join(texts) or prompt
+
+
+def install_fakes(
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    seed: int = 0,
+    gmail_latency_ms: Optional[float] = None,
+) -> ScriptedChatModel:
+    """
+    Registers ScriptedChatModel for both LLM roles and routes the gmail
+    MCP service to the fake server. Disables the LLM response cache so
+    every call pays the simulated latency.
+    """
+    from app.api import llm_cache
+    from app.api.ai_service_tool import REASONING, STRUCTURED, get_llm_registry
+
+    llm_cache.LLM_CACHE_ENABLED = False
+    os.environ["MCP_SERVER_GMAIL"] = FAKE_GMAIL_SERVER
+    os.environ.setdefault("FASTMCP_LOG_LEVEL", "WARNING")
+    if gmail_latency_ms is not None:
+        os.environ["FAKE_GMAIL_LATENCY_MS"] = str(gmail_latency_ms)
+
+    model = ScriptedChatModel(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed)
+    registry = get_llm_registry()
+    registry.register(REASONING, model)
+    registry.register(STRUCTURED, model)
+    return model
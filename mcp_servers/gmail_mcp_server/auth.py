@@ -8,7 +8,6 @@ SCOPES = [
     "https://www.googleapis.com/auth/gmail.modify",
 ]
 cred_path = os.path.join(os.path.dirname(__file__), "credentials.json")
-print(cred_path)
 def get_credentials():
     creds = None
 
@@ -4,7 +4,17 @@ from gmail_client import GmailClient
 
 
 mcp = FastMCP("gmail-mcp-server")
-gmail_client = GmailClient()
+_gmail_client = None
+
+
+def get_gmail_client() -> GmailClient:
+    # Authenticate on first tool call rather than at import, so the MCP
+    # handshake stays fast; pooled servers then reuse the client.
+    global _gmail_client
+    if _gmail_client is None:
+        _gmail_client = GmailClient()
+    return _gmail_client
+
 
 class SendEmailArgs(BaseModel):
     to: str
@@ -26,7 +36,7 @@ def gmail_send_email(args: SendEmailArgs):
     """
     Send an email via Gmail.
     """
-    result = gmail_client.send_email(
+    result = get_gmail_client().send_email(
         to=args.to,
         subject=args.subject,
         body=args.body
@@ -41,7 +51,7 @@ def gmail_reply_thread(args: ReplyThreadArgs):
     """
     Reply to a thread via Gmail.
     """
-    result = gmail_client.reply_thread(
+    result = get_gmail_client().reply_thread(
         thread_id=args.thread_id,
         body=args.body
     )
@@ -55,7 +65,7 @@ def gmail_archive_thread(args: ArchiveThreadArgs):
     """
     Archive a thread via Gmail.
     """
-    result = gmail_client.archive_thread(
+    result = get_gmail_client().archive_thread(
         thread_id=args.thread_id
     )
     return {
@@ -68,7 +78,7 @@ def gmail_mark_read(args: MarkReadArgs):
     """
     Mark a thread as read via Gmail.
     """
-    result = gmail_client.mark_read(
+    result = get_gmail_client().mark_read(
         thread_id=args.thread_id
     )
     return {
@@ -0,0 +1,178 @@
+"""
+SqliteCheckpointSaver: round trips, delta channel blobs, compaction,
+list() ordering, and a run paused at confirm_interrupt resuming from a
+reopened store.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+
+from langgraph.checkpoint.base import create_checkpoint, empty_checkpoint
+
+from app.graph.checkpoint import SqliteCheckpointSaver
+
+EMAIL = {
+    "message_id": "ck-1",
+    "thread_id": "gmail-ck-1",
+    "subject": "Term sheet",
+    "body": "Can you confirm the valuation before we wire?",
+    "from": "partner@a16z.com",
+}
+REJECT = {"context": {"human_approval": {"approval": "rejected", "comment": "test"}}}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.sqlite")
+
+
+def _config(thread_id="t1", checkpoint_id=None):
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _put(saver, config, previous, values, changed, step):
+    """Writes the next checkpoint, bumping the versions of `changed` channels."""
+    versions = dict(previous["channel_versions"])
+    for channel in changed:
+        versions[channel] = saver.get_next_version(versions.get(channel), None)
+    checkpoint = create_checkpoint(previous, None, step)
+    checkpoint["channel_values"] = values
+    checkpoint["channel_versions"] = versions
+    new_versions = {channel: versions[channel] for channel in changed}
+    return saver.put(config, checkpoint, {"source": "loop", "step": step}, new_versions), checkpoint
+
+
+# ─────────────────────────────
+# Store
+# ─────────────────────────────
+def test_put_get_tuple_round_trip(db_path):
+    saver = SqliteCheckpointSaver(db_path)
+    values = {"email": EMAIL, "domain": "founder_inbox"}
+    config, _ = _put(saver, _config(), empty_checkpoint(), values, ["email", "domain"], 0)
+
+    saved = saver.get_tuple(_config())
+    assert saved.config == config
+    assert saved.checkpoint["channel_values"] == values
+    assert saved.metadata["step"] == 0
+    assert saved.parent_config is None
+
+    # Same result for the explicit id, and from a reopened file
+    assert saver.get_tuple(config).checkpoint == saved.checkpoint
+    saver.close()
+    assert SqliteCheckpointSaver(db_path).get_tuple(_config()).checkpoint == saved.checkpoint
+
+
+def test_unchanged_channels_are_stored_once(db_path):
+    saver = SqliteCheckpointSaver(db_path, keep_history=True)
+    config, first = _put(saver, _config(), empty_checkpoint(), {"email": EMAIL, "step": 1}, ["email", "step"], 0)
+    config, second = _put(saver, config, first, {"email": EMAIL, "step": 2}, ["step"], 1)
+
+    # email is carried by the version written in the first superstep
+    assert saver.stats()["blobs"] == 3
+    latest = saver.get_tuple(_config())
+    assert latest.checkpoint["channel_values"] == {"email": EMAIL, "step": 2}
+    assert latest.parent_config["configurable"]["checkpoint_id"] == first["id"]
+
+
+def test_list_is_newest_first(db_path):
+    saver = SqliteCheckpointSaver(db_path, keep_history=True)
+    config, checkpoint = _config(), empty_checkpoint()
+    ids = []
+    for step in range(4):
+        config, checkpoint = _put(saver, config, checkpoint, {"step": step}, ["step"], step)
+        ids.append(checkpoint["id"])
+
+    listed = [t.config["configurable"]["checkpoint_id"] for t in saver.list(_config())]
+    assert listed == ids[::-1]
+
+    assert [t.checkpoint["channel_values"]["step"] for t in saver.list(_config(), limit=2)] == [3, 2]
+    before = _config(checkpoint_id=ids[2])
+    assert [t.config["configurable"]["checkpoint_id"] for t in saver.list(_config(), before=before)] == ids[1::-1]
+    assert [t.metadata["step"] for t in saver.list(None, filter={"step": 1})] == [1]
+
+    async def alisted():
+        return [t.config["configurable"]["checkpoint_id"] async for t in saver.alist(_config())]
+
+    assert asyncio.run(alisted()) == listed
+
+
+def test_compaction_keeps_latest_checkpoint_and_its_blobs(db_path):
+    saver = SqliteCheckpointSaver(db_path)
+    config, checkpoint = _config(), empty_checkpoint()
+    config, checkpoint = _put(saver, config, checkpoint, {"email": EMAIL, "step": 0}, ["email", "step"], 0)
+    for step in range(1, 4):
+        config, checkpoint = _put(saver, config, checkpoint, {"email": EMAIL, "step": step}, ["step"], step)
+
+    stats = saver.stats()
+    assert (stats["checkpoints"], stats["blobs"]) == (1, 2)
+    assert saver.get_tuple(_config()).checkpoint["channel_values"] == {"email": EMAIL, "step": 3}
+
+
+def test_late_writes_for_compacted_checkpoints_are_skipped(db_path):
+    saver = SqliteCheckpointSaver(db_path)
+    old_config, checkpoint = _put(saver, _config(), empty_checkpoint(), {"step": 0}, ["step"], 0)
+    new_config, _ = _put(saver, old_config, checkpoint, {"step": 1}, ["step"], 1)
+
+    saver.put_writes(old_config, [("step", 5)], task_id="late")
+    saver.put_writes(new_config, [("step", 2)], task_id="current")
+
+    assert saver.stats()["writes"] == 1
+    assert saver.get_tuple(_config()).pending_writes == [("current", "step", 2)]
+
+
+def test_prune_history(db_path):
+    saver = SqliteCheckpointSaver(db_path, keep_history=True)
+    config, checkpoint = _config(), empty_checkpoint()
+    for step in range(3):
+        config, checkpoint = _put(saver, config, checkpoint, {"step": step}, ["step"], step)
+    assert saver.stats()["checkpoints"] == 3
+
+    saver.prune()
+    assert saver.stats()["checkpoints"] == 1
+    assert saver.get_tuple(_config()).checkpoint["channel_values"] == {"step": 2}
+
+
+# ─────────────────────────────
+# Graph: pause at confirm_interrupt, restart, resume
+# ─────────────────────────────
+@pytest.fixture(scope="module")
+def fake_llm():
+    from benchmarks.fakes import install_fakes
+
+    install_fakes()
+
+
+@pytest.mark.parametrize("keep_history", [False, True])
+def test_paused_run_resumes_from_reopened_store(fake_llm, db_path, keep_history):
+    from langgraph.types import Command
+
+    from app.graph.dag import build_graph
+
+    config = {"configurable": {"thread_id": "paused"}}
+    saver = SqliteCheckpointSaver(db_path, keep_history=keep_history)
+    state = build_graph(checkpointer=saver).invoke({"email": EMAIL, "domain": "founder_inbox"}, config)
+    assert state.get("__interrupt__")
+    saver.close()
+
+    # A new process: the interrupt is still pending on the latest checkpoint
+    saver = SqliteCheckpointSaver(db_path, keep_history=keep_history)
+    if keep_history:
+        saver.prune()
+    assert saver.stats()["checkpoints"] == 1
+    paused = saver.get_tuple(config)
+    assert any(channel == "__interrupt__" for _, channel, _ in paused.pending_writes)
+
+    graph = build_graph(checkpointer=saver)
+    assert graph.get_state(config).next == ("confirm_interrupt",)
+
+    state = graph.invoke(Command(resume=REJECT), config)
+    assert state["context"]["human_approval"]["approval"] == "rejected"
+    assert not graph.get_state(config).next
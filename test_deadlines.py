@@ -0,0 +1,89 @@
+"""
+Stage deadlines must bound the provider, not the client-side rate limiter:
+waiting for a lease doesn't count, a slow request does.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.getcwd())
+
+from langchain_core.messages import AIMessage
+
+from app.api import deadlines
+from app.api.deadlines import StageDeadlineExceeded
+from app.api.llm_call import ainvoke_llm, invoke_llm
+from app.api.rate_limit import configure_rate_limits
+from app.metrics import current_node
+
+
+class FakeModel:
+    def __init__(self, model_name: str, latency: float = 0.01):
+        self.model_name = model_name
+        self.latency = latency
+
+    def invoke(self, input):
+        time.sleep(self.latency)
+        return AIMessage(content="ok")
+
+    async def ainvoke(self, input):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+@pytest.fixture
+def reason_stage(monkeypatch):
+    monkeypatch.setattr(deadlines, "LLM_STAGE_DEADLINES", {"reason": 0.3})
+    monkeypatch.setattr(deadlines, "LLM_HEDGED_STAGES", set())
+    token = current_node.set("reason")
+    yield
+    current_node.reset(token)
+
+
+def _paced(model: str):
+    # 2 requests/s, with the minute's burst already spent
+    limiter = configure_rate_limits(model, {"rpm": 120})
+    for _ in range(120):
+        limiter.acquire("x").release()
+    return limiter
+
+
+def test_rate_limiter_wait_does_not_count(reason_stage):
+    llm = FakeModel("paced-sync")
+    _paced(llm.model_name)
+
+    started = time.perf_counter()
+    for _ in range(2):
+        assert invoke_llm(llm, "hello", "reasoning").content == "ok"
+
+    # Each call waited ~0.5s for the limiter, longer than the deadline
+    assert time.perf_counter() - started >= 0.9
+
+
+def test_rate_limiter_wait_does_not_count_async(reason_stage):
+    llm = FakeModel("paced-async")
+    _paced(llm.model_name)
+
+    async def run():
+        return await asyncio.gather(*(ainvoke_llm(llm, "hello", "reasoning") for _ in range(2)))
+
+    started = time.perf_counter()
+    assert [r.content for r in asyncio.run(run())] == ["ok", "ok"]
+    assert time.perf_counter() - started >= 0.9
+
+
+def test_slow_provider_exceeds_deadline(reason_stage):
+    llm = FakeModel("slow-provider", latency=1.0)
+    configure_rate_limits(llm.model_name, {})
+
+    started = time.perf_counter()
+    with pytest.raises(StageDeadlineExceeded):
+        invoke_llm(llm, "hello", "reasoning")
+    assert time.perf_counter() - started < 0.8
+
+    with pytest.raises(StageDeadlineExceeded):
+        asyncio.run(ainvoke_llm(llm, "hello", "reasoning"))
@@ -0,0 +1,99 @@
+"""
+Draft previews published while compose streams: kept when the draft
+completes, discarded when the stream fails or runs past its deadline.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+
+from app.api.deadlines import StageDeadlineExceeded
+from app.graph import drafts, nodes
+from app.graph.approvals import get_approval_store
+from app.graph.drafts import DraftPublisher
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture(autouse=True)
+def publish_every_chunk(monkeypatch):
+    # Outside a graph run there is no custom stream to write to
+    monkeypatch.setattr(drafts, "_write_custom", lambda chunk: None)
+    monkeypatch.setattr(drafts, "DRAFT_PUBLISH_INTERVAL", 0.0)
+
+
+def _chunks(fail_after=None):
+    for i, chunk in enumerate(["Dear ", "Ana, ", "thanks."]):
+        if i == fail_after:
+            raise StageDeadlineExceeded("compose", 1.0)
+        yield chunk
+
+
+# ─────────────────────────────
+# DraftPublisher
+# ─────────────────────────────
+def test_complete_draft_is_kept():
+    with DraftPublisher(_config("draft-ok"), publish=True) as draft:
+        for chunk in _chunks():
+            draft.add(chunk)
+        assert draft.finish() == "Dear Ana, thanks."
+
+    assert get_approval_store().get_draft("draft-ok") == ("Dear Ana, thanks.", True)
+
+
+def test_failed_stream_discards_partial_draft():
+    with pytest.raises(StageDeadlineExceeded):
+        with DraftPublisher(_config("draft-failed"), publish=True) as draft:
+            for chunk in _chunks(fail_after=2):
+                draft.add(chunk)
+                assert get_approval_store().get_draft("draft-failed") is not None
+            draft.finish()
+
+    assert get_approval_store().get_draft("draft-failed") is None
+
+
+def test_failed_async_stream_discards_partial_draft():
+    async def compose():
+        async with DraftPublisher(_config("draft-failed-async"), publish=True) as draft:
+            for chunk in _chunks(fail_after=2):
+                await draft.aadd(chunk)
+            await draft.afinish()
+
+    with pytest.raises(StageDeadlineExceeded):
+        asyncio.run(compose())
+    assert get_approval_store().get_draft("draft-failed-async") is None
+
+
+# ─────────────────────────────
+# compose node: deadline -> fallback
+# ─────────────────────────────
+def test_compose_deadline_leaves_no_preview(monkeypatch):
+    from benchmarks.fakes import install_fakes
+    from app.policy.cache import get_policy_cache
+    from app.validator.result import ValidationResult
+
+    install_fakes()
+    monkeypatch.setattr(nodes, "stream_llm", lambda *args, **kwargs: _chunks(fail_after=2))
+
+    decision = {
+        "decision": "draft_reply",
+        "needs_confirmation": True,
+        "proposed_actions": [{"action_type": "compose_email", "description": "Reply", "target": "email"}],
+    }
+    state = {
+        "email": {"message_id": "m1", "subject": "Intro", "body": "Hi", "from": "ana@example.com"},
+        "context": {},
+        "policy_ref": get_policy_cache().get("founder_inbox").ref,
+        "validation_result": ValidationResult(status="approved", final_decision=decision, violations=[]),
+    }
+
+    update = nodes.compose_reply_content(state, _config("compose-deadline"))
+
+    assert update["validation_result"].violations == ["DEADLINE_EXCEEDED"]
+    assert get_approval_store().get_draft("compose-deadline") is None
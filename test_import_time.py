@@ -0,0 +1,69 @@
+"""
+Startup budget for the graph and CLI entry points.
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+Its cumulative import time must stay within budget, and heavy modules
+that are only needed on first use must not be loaded yet.
+Set IMPORT_TIME_BUDGET_SCALE (e.g. 2) on slow machines.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCALE = float(os.getenv("IMPORT_TIME_BUDGET_SCALE", "1"))
+
+# module -> (budget in ms, modules it must not import)
+BUDGETS = {
+    "app.main": (150, [
+        "langgraph", "app.graph.dag",
+    ]),
+    "app.execution.resume": (400, [
+        "langgraph", "app.graph.dag",
+    ]),
+    "app.graph.dag": (2500, [
+        "IPython",
+        "dotenv",
+        "langchain_groq",
+        "mcp",
+        "app.agents.reasoning_agent",
+        "app.agents.schema_agent",
+        "app.agents.fused_agent",
+    ]),
+}
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in microseconds per module imported by `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_import_time(module):
+    budget_ms, deferred = BUDGETS[module]
+    times = import_times(module)
+
+    loaded = [m for m in deferred if m in times]
+    assert not loaded, f"{module} imports {loaded} at import time"
+
+    elapsed_ms = times[module] / 1000
+    assert elapsed_ms <= budget_ms * SCALE, (
+        f"importing {module} took {elapsed_ms:.0f}ms (budget {budget_ms * SCALE:.0f}ms)"
+    )
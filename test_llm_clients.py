@@ -0,0 +1,83 @@
+"""
+LLMClientRegistry: per-loop async HTTP clients are closed with their loop
+(aclose_loop) or on reset().
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+
+from app.api import ai_service_tool
+from app.api.ai_service_tool import (
+    REASONING,
+    STRUCTURED,
+    LLMClientRegistry,
+    LLMSettings,
+    closing_llm_clients,
+)
+
+SETTINGS = LLMSettings(
+    model="test-model",
+    api_key="test-key",
+    max_connections=4,
+    max_keepalive_connections=2,
+    keepalive_expiry=5.0,
+    request_timeout=5.0,
+    max_retries=0,
+)
+
+
+@pytest.fixture
+def registry():
+    registry = LLMClientRegistry({REASONING: SETTINGS, STRUCTURED: SETTINGS})
+    yield registry
+    registry.reset()
+
+
+def _async_clients(registry):
+    return [c for clients in registry._loop_http_clients.values() for c in clients]
+
+
+def test_aclose_loop_closes_that_loops_clients(registry):
+    async def run():
+        first = registry.get(REASONING)
+        registry.get(STRUCTURED)
+        assert registry.get(REASONING) is first
+        clients = _async_clients(registry)
+        await registry.aclose_loop()
+        return clients
+
+    clients = asyncio.run(run())
+    assert len(clients) == 2
+    assert all(c.is_closed for c in clients)
+    assert not _async_clients(registry)
+
+
+def test_closing_llm_clients_wraps_asyncio_run(registry, monkeypatch):
+    monkeypatch.setattr(ai_service_tool, "_registry", registry)
+
+    async def run():
+        registry.get(REASONING)
+        return _async_clients(registry)
+
+    clients = asyncio.run(closing_llm_clients(run()))
+    assert clients and all(c.is_closed for c in clients)
+
+
+def test_reset_closes_clients_of_idle_loops(registry):
+    async def build():
+        registry.get(REASONING)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(build())
+        clients = _async_clients(registry)
+
+        registry.reset()
+        assert clients and all(c.is_closed for c in clients)
+    finally:
+        loop.close()
@@ -0,0 +1,132 @@
+"""
+PolicyCache version retention: resolve() across reloads, LRU eviction,
+pins held by paused runs, the StalePolicyError path, and objects
+derived from a version.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+
+from app.policy.cache import PolicyCache
+from app.policy.exceptions import StalePolicyError
+from app.policy.loader import PolicyLoader
+
+DOMAIN = "founder_inbox"
+
+
+@pytest.fixture
+def policies(tmp_path):
+    shutil.copytree(os.path.join("policies", DOMAIN), tmp_path / DOMAIN)
+    return tmp_path
+
+
+def _reload(policies, cache, n):
+    """Edits the policy on disk and compiles the new version."""
+    with open(policies / DOMAIN / "policy.yaml", "a", encoding="utf-8") as f:
+        f.write(f"\n# revision {n}\n")
+    return cache.get(DOMAIN).ref
+
+
+def _cache(policies, max_versions=2):
+    return PolicyCache(loader=PolicyLoader(str(policies)), max_versions=max_versions)
+
+
+def test_resolve_across_reloads(policies):
+    cache = _cache(policies)
+    first = cache.get(DOMAIN).ref
+    second = _reload(policies, cache, 1)
+
+    assert first.source_hash != second.source_hash
+    assert cache.resolve(first).source_hash == first.source_hash
+    assert cache.resolve(second).source_hash == second.source_hash
+
+
+def test_evicted_version_is_stale(policies):
+    cache = _cache(policies, max_versions=2)
+    refs = [cache.get(DOMAIN).ref] + [_reload(policies, cache, n) for n in range(1, 3)]
+
+    assert cache.stats()["versions"] == 2
+    with pytest.raises(StalePolicyError):
+        cache.resolve(refs[0])
+    # Still cached, and the current version
+    assert cache.resolve(refs[1]).source_hash == refs[1].source_hash
+    assert cache.resolve(refs[2]).source_hash == refs[2].source_hash
+
+
+def test_resolve_refreshes_lru_order(policies):
+    cache = _cache(policies, max_versions=2)
+    first = cache.get(DOMAIN).ref
+    _reload(policies, cache, 1)
+
+    cache.resolve(first)
+    _reload(policies, cache, 2)
+    assert cache.resolve(first).source_hash == first.source_hash
+
+
+def test_pinned_version_survives_eviction(policies):
+    cache = _cache(policies, max_versions=1)
+    paused = cache.get(DOMAIN).ref
+    cache.pin("paused-run", paused)
+
+    for n in range(1, 5):
+        _reload(policies, cache, n)
+    cache.invalidate(DOMAIN)
+    assert cache.resolve(paused).source_hash == paused.source_hash
+    assert cache.stats()["pinned"] == 1
+
+    # Unpinned, it is an ordinary LRU entry again
+    cache.unpin("paused-run")
+    _reload(policies, cache, 5)
+    assert cache.stats()["versions"] == 1
+    with pytest.raises(StalePolicyError):
+        cache.resolve(paused)
+
+
+def test_only_current_version_survives_restart(policies):
+    cache = _cache(policies)
+    old = cache.get(DOMAIN).ref
+    current = _reload(policies, cache, 1)
+
+    restarted = _cache(policies)
+    assert restarted.resolve(current).source_hash == current.source_hash
+    with pytest.raises(StalePolicyError):
+        restarted.resolve(old)
+
+
+def test_derived_objects_follow_their_version(policies):
+    cache = _cache(policies, max_versions=1)
+    builds = []
+
+    def build(policy):
+        builds.append(policy.source_hash)
+        return object()
+
+    first = cache.get(DOMAIN)
+    validator = cache.derived(first, "validator", build)
+    assert cache.derived(first, "validator", build) is validator
+    assert cache.stats()["derived"] == 1
+
+    # Evicted with its version
+    _reload(policies, cache, 1)
+    assert cache.stats()["derived"] == 0
+
+    # Dropped by invalidate(), rebuilt for the recompiled version
+    current = cache.get(DOMAIN)
+    cache.derived(current, "validator", build)
+    cache.invalidate(DOMAIN)
+    assert cache.stats()["derived"] == 0
+    cache.derived(cache.get(DOMAIN), "validator", build)
+    assert len(builds) == 3
+
+
+def test_derived_not_kept_for_foreign_policies(policies):
+    cache = _cache(policies)
+    foreign = _cache(policies).get(DOMAIN)
+
+    assert cache.derived(foreign, "validator", lambda policy: object()) is not None
+    assert cache.stats()["derived"] == 0
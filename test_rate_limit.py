@@ -0,0 +1,208 @@
+"""
+RateLimiter pacing, AIMD concurrency and retry classification, on a fake
+clock; and how 429 backoff composes with stage deadlines.
+"""
+
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.append(os.getcwd())
+
+from app.api import deadlines, rate_limit
+from app.api.deadlines import StageDeadlineExceeded
+from app.api.llm_call import invoke_llm
+from app.api.rate_limit import (
+    LLM_TRANSIENT_MAX_RETRIES,
+    RateLimiter,
+    RateLimits,
+    TokenBucket,
+    configure_rate_limits,
+    rate_limit_retry_after,
+    transient_error,
+)
+from app.metrics import current_node
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+class APIConnectionError(Exception):
+    """Named like the groq/openai SDK error, which carries no status."""
+
+
+# ─────────────────────────────
+# Token buckets
+# ─────────────────────────────
+def test_token_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(per_minute=60)
+
+    for _ in range(60):
+        assert bucket.reserve(1, clock.now) == 0.0
+    # Empty: the next unit is a second away, the one after two
+    assert bucket.reserve(1, clock.now) == pytest.approx(1.0)
+    assert bucket.reserve(1, clock.now) == pytest.approx(2.0)
+
+    clock.sleep(10)
+    assert bucket.reserve(1, clock.now) == 0.0
+
+
+def test_token_bucket_caps_refill_at_one_minute(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.reserve(60, clock.now)
+
+    clock.sleep(3600)
+    for _ in range(60):
+        assert bucket.reserve(1, clock.now) == 0.0
+    assert bucket.reserve(1, clock.now) > 0
+
+
+def test_acquire_sleeps_for_the_request_bucket(clock):
+    limiter = RateLimiter("bucket-model", RateLimits(rpm=60))
+    started = clock.now
+    for _ in range(61):
+        limiter.acquire("x").succeeded()
+    assert clock.now - started == pytest.approx(1.0)
+
+
+# ─────────────────────────────
+# AIMD concurrency
+# ─────────────────────────────
+def test_success_increases_limit_up_to_max(clock):
+    limiter = RateLimiter("aimd-up", RateLimits(initial_concurrency=4, max_concurrency=5))
+
+    for _ in range(4):
+        limiter.acquire("x").succeeded()
+    assert limiter.limit == pytest.approx(5.0, abs=0.1)
+
+    for _ in range(20):
+        limiter.acquire("x").succeeded()
+    assert limiter.limit == 5.0
+
+
+def test_429_halves_limit_once_per_burst(clock):
+    limiter = RateLimiter("aimd-down", RateLimits(initial_concurrency=8))
+    burst = [limiter.acquire("x") for _ in range(4)]
+
+    clock.sleep(1)
+    burst[0].failed(StatusError(429), attempt=0)
+    assert limiter.limit == 4.0
+
+    # Sent before the decrease: part of the burst it already answered
+    burst[1].failed(StatusError(429), attempt=0)
+    assert limiter.limit == 4.0
+
+    clock.sleep(1)
+    limiter.acquire("x").failed(StatusError(429), attempt=0)
+    assert limiter.limit == 2.0
+
+
+def test_unbounded_until_first_429(clock):
+    limiter = RateLimiter("aimd-unbounded", RateLimits(max_concurrency=64))
+    leases = [limiter.acquire("x") for _ in range(20)]
+    assert not limiter.saturated()
+
+    clock.sleep(1)
+    leases[0].failed(StatusError(429), attempt=0)
+    # Halves the 20 calls that were in flight
+    assert limiter.limit == 10.0
+
+
+# ─────────────────────────────
+# Retry classification
+# ─────────────────────────────
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (StatusError(500), True),
+        (StatusError(503), True),
+        (StatusError(408), True),
+        (StatusError(400), False),
+        (StatusError(401), False),
+        (StatusError(429), False),
+        (APIConnectionError("reset"), True),
+        (httpx.ConnectError("refused"), True),
+        (httpx.ReadTimeout("slow"), True),
+        (ValueError("bad output"), False),
+    ],
+)
+def test_transient_error(error, transient):
+    assert transient_error(error) is transient
+
+
+def test_retry_after_headers():
+    assert rate_limit_retry_after(StatusError(503)) is None
+    assert rate_limit_retry_after(StatusError(429)) == 0.0
+    assert rate_limit_retry_after(StatusError(429, {"retry-after": "7"})) == 7.0
+    assert rate_limit_retry_after(StatusError(429, {"retry-after": "2m30s"})) == 150.0
+
+
+def test_transient_errors_are_retried_a_bounded_number_of_times(clock):
+    limiter = RateLimiter("transient-model", RateLimits())
+
+    for attempt in range(LLM_TRANSIENT_MAX_RETRIES):
+        assert limiter.acquire("x").failed(StatusError(502), attempt) is not None
+    assert limiter.acquire("x").failed(StatusError(502), LLM_TRANSIENT_MAX_RETRIES) is None
+    assert limiter.acquire("x").failed(StatusError(400), 0) is None
+
+
+# ─────────────────────────────
+# Backoff under stage deadlines
+# ─────────────────────────────
+class RateLimitedModel:
+    model_name = "always-429"
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def invoke(self, input):
+        self.calls += 1
+        raise StatusError(429, {"retry-after": str(self.retry_after)})
+
+
+def test_backoff_past_deadline_fails_fast(monkeypatch):
+    monkeypatch.setattr(deadlines, "LLM_STAGE_DEADLINES", {"reason": 2})
+    monkeypatch.setattr(deadlines, "LLM_HEDGED_STAGES", set())
+    llm = RateLimitedModel(retry_after=30)
+    configure_rate_limits(llm.model_name, {})
+
+    token = current_node.set("reason")
+    try:
+        started = time.perf_counter()
+        with pytest.raises(StageDeadlineExceeded):
+            invoke_llm(llm, "hello", "reasoning")
+    finally:
+        current_node.reset(token)
+
+    # No 30s sleep, no retry
+    assert time.perf_counter() - started < 1.0
+    assert llm.calls == 1
@@ -0,0 +1,123 @@
+import itertools
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from app.policy.cache import get_policy_cache
+from app.validator.compiled import CompiledValidator, HARD_FAILURES, REQUIRED_FIELDS
+from app.validator.rules import (
+    actions_allowed_for_decision,
+    check_risk_urgency_coherence,
+    decision_allowed_for_category,
+    decision_requires_confirmation,
+)
+
+
+def reference_validate(decision_output, policy):
+    """The rule-by-rule checks of rules.py, as DecisionValidator applied them."""
+    for field in REQUIRED_FIELDS:
+        if field not in decision_output:
+            raise AssertionError(f"Missing required field: {field}")
+
+    violations = []
+    category = decision_output["category"]
+    decision = decision_output["decision"]
+
+    if decision_output["domain"] != policy.domain:
+        violations.append("DOMAIN_MISMATCH")
+    if category not in policy.categories:
+        violations.append("UNKNOWN_CATEGORY")
+    elif not decision_allowed_for_category(category, decision, policy.categories):
+        violations.append("DECISION_NOT_ALLOWED_FOR_CATEGORY")
+
+    if not check_risk_urgency_coherence(
+        decision_output["risk_level"], decision_output["urgency"], policy.risk_urgency_matrix
+    ):
+        violations.append("RISK_URGENCY_MISMATCH")
+
+    action_types = [a["action_type"] for a in decision_output["proposed_actions"]]
+    if not actions_allowed_for_decision(decision, action_types, policy.decisions):
+        violations.append("ACTION_NOT_ALLOWED_FOR_DECISION")
+
+    if (
+        policy.global_rules.get("external_communication_requires_confirmation")
+        and decision_requires_confirmation(decision, policy.decisions)
+        and not decision_output["needs_confirmation"]
+    ):
+        violations.append("CONFIRMATION_REQUIRED")
+
+    if len(decision_output["reasoning_summary"].strip()) < 20:
+        violations.append("WEAK_REASONING")
+
+    if not violations:
+        return "approved", violations
+    if any(v in HARD_FAILURES for v in violations):
+        return "rejected", violations
+    return "downgraded", violations
+
+
+def _decisions(policy):
+    categories = list(policy.categories) + ["not_a_category"]
+    decisions = list(policy.decisions)
+    action_sets = [[]] + [[action] for action in policy.actions]
+
+    for domain, category, decision, risk, urgency, actions, confirmed, reasoning in itertools.product(
+        [policy.domain, "other_domain"],
+        categories,
+        decisions,
+        policy.risk_levels,
+        policy.urgency_levels,
+        action_sets,
+        [True, False],
+        ["Too short.", "A sufficiently detailed reasoning summary."],
+    ):
+        yield {
+            "schema_version": "v1",
+            "domain": domain,
+            "intent": "test",
+            "category": category,
+            "urgency": urgency,
+            "risk_level": risk,
+            "decision": decision,
+            "proposed_actions": [
+                {"action_type": a, "description": "test", "target": "email"} for a in actions
+            ],
+            "needs_confirmation": confirmed,
+            "confidence": 0.9,
+            "reasoning_summary": reasoning,
+        }
+
+
+def test_compiled_validator_matches_rules():
+    policy = get_policy_cache().get("founder_inbox")
+    validator = CompiledValidator(policy)
+
+    checked = 0
+    for decision_output in _decisions(policy):
+        result = validator.validate(decision_output)
+        status, violations = reference_validate(decision_output, policy)
+        assert (result.status, result.violations) == (status, violations), decision_output
+        checked += 1
+
+    assert checked > 10_000
+
+
+def test_validate_many_rejects_malformed_entries():
+    policy = get_policy_cache().get("founder_inbox")
+    validator = CompiledValidator(policy)
+    valid = next(_decisions(policy))
+
+    malformed = [
+        {**valid, "proposed_actions": [{"description": "no action_type"}]},
+        {**valid, "reasoning_summary": 42},
+        {**valid, "decision": ["ignore"]},
+        {k: v for k, v in valid.items() if k != "urgency"},
+        None,
+    ]
+    results = validator.validate_many([valid] + malformed)
+
+    assert results[0].status != "rejected" or "SCHEMA_INVALID" not in results[0].violations
+    for result in results[1:]:
+        assert result.status == "rejected"
+        assert result.violations == ["SCHEMA_INVALID"]